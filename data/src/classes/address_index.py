@@ -0,0 +1,190 @@
+import re
+from functools import cached_property
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+STREET_SUFFIXES = [
+    "st",
+    "ave",
+    "rd",
+    "blvd",
+    "pl",
+    "ln",
+    "pky",
+    "pkwy",
+    "dr",
+    "ct",
+    "way",
+    "ter",
+    "hwy",
+    "pike",
+    "sq",
+    "cir",
+]
+
+# Spelled-out street suffixes, as abbreviated in STREET_SUFFIXES
+SPELLED_OUT_SUFFIXES = {
+    "street": "st",
+    "avenue": "ave",
+    "road": "rd",
+    "boulevard": "blvd",
+    "place": "pl",
+    "lane": "ln",
+    "parkway": "pkwy",
+    "drive": "dr",
+    "court": "ct",
+    "terrace": "ter",
+    "highway": "hwy",
+    "square": "sq",
+    "circle": "cir",
+}
+
+# A street address is its number and the words up to the street suffix
+STREET_ADDRESS = rf"\d\S*(?:\s\S+)+?\s(?:{'|'.join(STREET_SUFFIXES)})"
+
+# The street address of a line. Words before the number (e.g. "attn" or "c/o") and
+# whatever follows the suffix on the same line (a suite, floor or room) are dropped.
+STREET_PATTERN = rf"^(?:\D*\s)?({STREET_ADDRESS})\b.*$"
+
+
+def normalize_addresses(addresses: pd.Series) -> pd.Series:
+    """
+    Addresses lowercased, without punctuation, with single spaces between words and with
+    street suffixes abbreviated ("1600 Arch Street" becomes "1600 arch st").
+    """
+    addresses = (
+        addresses.astype("string[pyarrow]")
+        .str.lower()
+        .str.replace(r"[.#']", "", regex=True)
+        .str.replace(r"[^\S ]|\s{2,}", " ", regex=True)
+    )
+    for spelled_out, abbreviation in SPELLED_OUT_SUFFIXES.items():
+        addresses = addresses.str.replace(
+            rf"\b{spelled_out}\b", abbreviation, regex=True
+        )
+    return addresses
+
+
+def address_lines(addresses: pd.Series) -> pd.Series:
+    """
+    The comma-separated lines of normalized addresses as their canonical keys: the line
+    without surrounding whitespace, and for street addresses only the street number and
+    street name.
+
+    Args:
+        addresses (Series): Normalized addresses (see normalize_addresses).
+
+    Returns:
+        Series: The key of each non-empty line, indexed by the position of its address.
+    """
+    lines = pc.split_pattern(pa.array(addresses, type=pa.string()), ",")
+    keys = pd.Series(
+        pc.list_flatten(lines),
+        index=pc.list_parent_indices(lines).to_numpy(),
+        dtype="string[pyarrow]",
+    )
+    keys = keys.str.strip().str.replace(STREET_PATTERN, r"\1", regex=True)
+    return keys[keys.notna() & (keys != "")]
+
+
+def address_keys(address: str) -> List[str]:
+    """
+    The lookup keys of a single address, one per comma-separated line.
+    """
+    return list(address_lines(normalize_addresses(pd.Series([address]))))
+
+
+class AddressIndex:
+    """
+    An index of an address column (e.g. standardized_mailing_address) for matching it
+    against known addresses with hash lookups instead of substring scans of every row.
+
+    The column is factorized once, so each distinct address is only normalized once, and
+    every line of an address gets a canonical key (see address_lines). A known address
+    matches the addresses that have all of its keys, where a street address key must be
+    equal and any other key must appear as whole words in a line. So "1234 market st"
+    matches "1234 market st ste 700, philadelphia pa, 19107", "office of general counsel"
+    matches "attn office of general counsel, 1515 arch st" and
+    "po box 3362, harrisburg pa, 17105" only matches that box in Harrisburg.
+
+    Attributes:
+        codes (ndarray): For each row, the position of its address in `addresses`, or -1 if
+            the address is missing. Rows with the same address share a code, so the codes
+            can be used to group rows by owner.
+        addresses (Index): The distinct addresses of the column.
+    """
+
+    def __init__(self, addresses: pd.Series):
+        self.index = addresses.index
+        self.codes, self.addresses = pd.factorize(addresses)
+
+    @cached_property
+    def _keys(self) -> pd.Series:
+        # Built on the first lookup, so grouping by the codes alone doesn't pay for it
+        return address_lines(normalize_addresses(pd.Series(self.addresses)))
+
+    def _match(self, known_addresses: Iterable[str]) -> List[np.ndarray]:
+        """
+        For each known address, whether each distinct address matches it. All the known
+        addresses are looked up in a single pass over the keys.
+        """
+        wanted = [frozenset(address_keys(address)) for address in known_addresses]
+        all_wanted = frozenset().union(*wanted)
+        street_keys = {key for key in all_wanted if re.fullmatch(STREET_ADDRESS, key)}
+
+        # Street addresses are looked up by key; other lines, like "office of general
+        # counsel", match the lines that contain them as whole words
+        hits = [self._keys[self._keys.isin(street_keys)]]
+        for key in all_wanted - street_keys:
+            contains = self._keys.str.contains(rf"\b{re.escape(key)}\b", regex=True)
+            hits.append(pd.Series(key, index=self._keys.index[contains.to_numpy(bool)]))
+        keys_by_address = pd.concat(hits).groupby(level=0).agg(frozenset)
+
+        matches = []
+        for keys in wanted:
+            matched = np.zeros(len(self.addresses), dtype=bool)
+            if keys:
+                has_keys = keys_by_address.map(keys.issubset).to_numpy(bool)
+                matched[keys_by_address.index[has_keys]] = True
+            matches.append(matched)
+        return matches
+
+    def _rows(self, values: np.ndarray, missing: Any) -> np.ndarray:
+        # The value of each row's address; code -1 picks the appended value for missing ones
+        return np.append(values, np.array([missing], dtype=values.dtype))[self.codes]
+
+    def matches(self, known_addresses: Iterable[str]) -> np.ndarray:
+        """
+        Whether each row's address matches any of the known addresses.
+
+        Args:
+            known_addresses (Iterable[str]): Full or partial addresses, e.g. "1600 arch st".
+
+        Returns:
+            ndarray: A boolean mask aligned with the indexed column.
+        """
+        matched = np.zeros(len(self.addresses), dtype=bool)
+        for address_matched in self._match(known_addresses):
+            matched |= address_matched
+        return self._rows(matched, False)
+
+    def lookup(self, table: Dict[str, Any]) -> pd.Series:
+        """
+        Look up each row's address in a table of known addresses. When an address matches
+        several entries, the last one wins, as if the entries were assigned in order.
+
+        Args:
+            table (Dict[str, Any]): Values keyed by full or partial addresses.
+
+        Returns:
+            Series: The value of each row, or None for rows matching no entry, aligned with
+                the indexed column.
+        """
+        values = np.full(len(self.addresses), None, dtype=object)
+        for value, matched in zip(table.values(), self._match(table.keys())):
+            values[matched] = value
+        return pd.Series(self._rows(values, None), index=self.index)
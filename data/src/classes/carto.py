@@ -0,0 +1,323 @@
+import functools
+import glob
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Tuple
+
+import geopandas as gpd
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import shapely
+from tqdm import tqdm
+
+from src.classes import http_client
+from src.config.config import get_logger
+
+# Carto data loader
+CARTO_SQL_URL = "https://phl.carto.com/api/v2/sql"
+
+# Bounds and targets for adapting the number of rows requested per keyset page
+CARTO_MIN_CHUNK_SIZE = 5000
+CARTO_MAX_CHUNK_SIZE = 250000
+CARTO_TARGET_SECONDS = 15
+CARTO_MAX_PAYLOAD_BYTES = 150 * 1024 * 1024
+
+
+def load_carto_data(
+    queries: List[str],
+    input_crs: str,
+    wkb_geom_field: str | None = "the_geom",
+    max_workers: int = os.cpu_count(),
+    chunk_size: int = 100000,
+):
+    """
+    Load the results of Carto SQL queries into memory.
+
+    The queries are split into parts (see split_carto_queries) that are fetched concurrently
+    and combined in query and id order, so the result doesn't depend on which request
+    finishes first.
+    """
+    parts = split_carto_queries(queries, chunk_size)
+
+    def fetch_part(part: Callable[[], Iterator[List[dict]]]) -> gpd.GeoDataFrame:
+        rows = [row for page in part() for row in page]
+        return carto_rows_to_gdf(rows, input_crs, wkb_geom_field)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(fetch_part, part) for part in parts]
+        gdfs = [
+            future.result()
+            for future in tqdm(
+                futures, total=len(futures), desc="Processing Carto chunks"
+            )
+        ]
+
+    gdfs = [gdf for gdf in gdfs if not gdf.empty]
+    if not gdfs:
+        return gpd.GeoDataFrame()
+    return pd.concat(gdfs, ignore_index=True)
+
+
+def stream_carto_data(
+    queries: List[str],
+    input_crs: str,
+    output_path: str,
+    wkb_geom_field: str | None = "the_geom",
+    process_chunk: Callable[[gpd.GeoDataFrame], gpd.GeoDataFrame] | None = None,
+    max_workers: int = os.cpu_count(),
+    chunk_size: int = 100000,
+) -> int:
+    """
+    Fetch the results of Carto SQL queries straight into a parquet file, one page at a time.
+
+    Each page is decoded, passed through `process_chunk` and written to its own part file as
+    soon as it arrives, so only the pages being worked on are held in memory. The parts are
+    then copied into `output_path` one row group at a time, in query and id order, under a
+    schema that reconciles pages whose inferred column types differ (e.g. a column that is
+    all null in one page).
+
+    Args:
+        queries (List[str]): The Carto SQL queries.
+        input_crs (str): The CRS of the query geometries.
+        output_path (str): The parquet file to write.
+        wkb_geom_field (str | None): The hex-encoded WKB geometry column, or None to build
+            points from the x and y columns.
+        process_chunk (Callable): Applied to each page before it is written.
+        max_workers (int): The number of parts fetched at the same time.
+        chunk_size (int): The approximate number of rows per part.
+
+    Returns:
+        int: The number of rows fetched from Carto, before `process_chunk`.
+    """
+    parts = split_carto_queries(queries, chunk_size)
+    parts_directory = f"{output_path}.parts"
+    os.makedirs(parts_directory, exist_ok=True)
+
+    def fetch_part(index: int, part: Callable[[], Iterator[List[dict]]]) -> int:
+        row_count = 0
+        for page_index, page in enumerate(part()):
+            row_count += len(page)
+            gdf = carto_rows_to_gdf(page, input_crs, wkb_geom_field)
+            if gdf.empty:
+                continue
+            if process_chunk:
+                gdf = process_chunk(gdf)
+            gdf.to_parquet(
+                os.path.join(parts_directory, f"{index:06d}_{page_index:06d}.parquet"),
+                index=False,
+            )
+        return row_count
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(fetch_part, index, part)
+                for index, part in enumerate(parts)
+            ]
+            row_count = sum(
+                future.result()
+                for future in tqdm(
+                    futures, total=len(futures), desc="Streaming Carto chunks"
+                )
+            )
+
+        part_paths = sorted(glob.glob(os.path.join(parts_directory, "*.parquet")))
+        if part_paths:
+            schemas = [pq.read_schema(path) for path in part_paths]
+            schema = pa.unify_schemas(schemas, promote_options="permissive")
+            schema = schema.with_metadata(merge_geoparquet_metadata(schemas))
+            # Written next to the output and moved into place once complete, so a reader never
+            # sees a partially written file
+            temp_path = f"{output_path}.tmp"
+            with pq.ParquetWriter(temp_path, schema) as writer:
+                for path in part_paths:
+                    writer.write_table(
+                        pq.read_table(path)
+                        .select(schema.names)
+                        .cast(schema)
+                        .replace_schema_metadata(schema.metadata)
+                    )
+            os.replace(temp_path, output_path)
+    finally:
+        shutil.rmtree(parts_directory, ignore_errors=True)
+
+    return row_count
+
+
+def merge_geoparquet_metadata(schemas: List[pa.Schema]) -> dict:
+    """
+    Combine the GeoParquet metadata of parquet files written separately into metadata for a
+    single file holding all their rows: the geometry types are merged and the per-file
+    bounding boxes are dropped.
+    """
+    metadata = dict(schemas[0].metadata or {})
+    if b"geo" not in metadata:
+        return metadata
+
+    geo = json.loads(metadata[b"geo"])
+    for column, column_metadata in geo["columns"].items():
+        column_metadata.pop("bbox", None)
+        column_metadata["geometry_types"] = sorted(
+            {
+                geometry_type
+                for schema in schemas
+                for geometry_type in json.loads(schema.metadata[b"geo"])["columns"][
+                    column
+                ]["geometry_types"]
+            }
+        )
+    metadata[b"geo"] = json.dumps(geo).encode("utf-8")
+    return metadata
+
+
+def split_carto_queries(
+    queries: List[str], chunk_size: int = 100000
+) -> List[Callable[[], Iterator[List[dict]]]]:
+    """
+    Split Carto SQL queries into parts of about `chunk_size` rows that can be fetched
+    independently, in result order. Each part is a function returning an iterator over
+    pages of rows.
+
+    Queries that select cartodb_id are split into cartodb_id ranges, each read with keyset
+    pagination. Other queries fall back to LIMIT/OFFSET paging.
+    """
+    parts = []
+    for query in queries:
+        id_range = get_carto_id_range(query)
+        if id_range is None:
+            total_rows = get_carto_total_rows(query)
+            for offset in range(0, total_rows, chunk_size):
+                parts.append(
+                    functools.partial(iter_carto_offset_page, query, offset, chunk_size)
+                )
+            continue
+
+        min_id, max_id, total_rows = id_range
+        if total_rows == 0:
+            continue
+        num_ranges = -(-total_rows // chunk_size)
+        step = -(-(max_id - min_id + 1) // num_ranges)
+        for after_id in range(min_id - 1, max_id, step):
+            parts.append(
+                functools.partial(
+                    iter_carto_keyset_pages,
+                    query,
+                    after_id,
+                    min(after_id + step, max_id),
+                    chunk_size,
+                )
+            )
+    return parts
+
+
+def carto_rows_to_gdf(
+    rows: List[dict], input_crs: str, wkb_geom_field: str | None = "the_geom"
+) -> gpd.GeoDataFrame:
+    if not rows:
+        return gpd.GeoDataFrame()
+    df = pd.DataFrame(rows)
+    geometry = (
+        shapely.from_wkb(df[wkb_geom_field].to_numpy())
+        if wkb_geom_field
+        else gpd.points_from_xy(df.x, df.y)
+    )
+    return gpd.GeoDataFrame(df, geometry=geometry, crs=input_crs)
+
+
+def iter_carto_offset_page(
+    query: str, offset: int, chunk_size: int = 100000
+) -> Iterator[List[dict]]:
+    chunk_query = f"{query} LIMIT {chunk_size} OFFSET {offset}"
+    response = http_client.get(CARTO_SQL_URL, params={"q": chunk_query})
+    response.raise_for_status()
+    yield response.json().get("rows", [])
+
+
+def iter_carto_keyset_pages(
+    query: str, after_id: int, max_id: int, chunk_size: int = 100000
+) -> Iterator[List[dict]]:
+    """
+    Fetch the rows of a query with after_id < cartodb_id <= max_id, one keyset page at a time.
+    The page size adapts to how long each response took and how large it was.
+    """
+    performance_logger = get_logger("performance")
+    last_id = after_id
+
+    while last_id < max_id:
+        page_query = (
+            f"SELECT * FROM ({query}) AS page "
+            f"WHERE cartodb_id > {last_id} AND cartodb_id <= {max_id} "
+            f"ORDER BY cartodb_id LIMIT {chunk_size}"
+        )
+        request_start = time.time()
+        response = http_client.get(CARTO_SQL_URL, params={"q": page_query})
+        response.raise_for_status()
+        elapsed = time.time() - request_start
+
+        page = response.json().get("rows", [])
+        if page:
+            yield page
+        if len(page) < chunk_size:
+            break
+
+        last_id = page[-1]["cartodb_id"]
+        next_chunk_size = adapt_carto_chunk_size(
+            chunk_size, elapsed, len(response.content)
+        )
+        if next_chunk_size != chunk_size:
+            performance_logger.info(
+                f"Carto page of {chunk_size} rows took {elapsed:.2f}s "
+                f"({len(response.content) / 1024 / 1024:.1f} MB), "
+                f"next page size {next_chunk_size}"
+            )
+        chunk_size = next_chunk_size
+
+
+def adapt_carto_chunk_size(chunk_size: int, elapsed: float, payload_bytes: int) -> int:
+    """
+    Halve the page size when a response was slow or large, and double it when it was fast
+    and small, within CARTO_MIN_CHUNK_SIZE and CARTO_MAX_CHUNK_SIZE.
+    """
+    if elapsed > CARTO_TARGET_SECONDS or payload_bytes > CARTO_MAX_PAYLOAD_BYTES:
+        chunk_size //= 2
+    elif (
+        elapsed < CARTO_TARGET_SECONDS / 4
+        and payload_bytes < CARTO_MAX_PAYLOAD_BYTES / 4
+    ):
+        chunk_size *= 2
+    return max(CARTO_MIN_CHUNK_SIZE, min(CARTO_MAX_CHUNK_SIZE, chunk_size))
+
+
+def get_carto_total_rows(query):
+    count_query = f"SELECT COUNT(*) as count FROM ({query}) as subquery"
+    response = http_client.get(CARTO_SQL_URL, params={"q": count_query})
+    response.raise_for_status()
+    return response.json()["rows"][0]["count"]
+
+
+def get_carto_id_range(query: str) -> Tuple[int, int, int] | None:
+    """
+    Get the minimum and maximum cartodb_id and the row count of a query.
+
+    Returns:
+        Tuple[int, int, int]: (min_id, max_id, count), or None if the query doesn't select
+        cartodb_id, in which case it can't be paged by key.
+    """
+    range_query = (
+        "SELECT MIN(cartodb_id) AS min_id, MAX(cartodb_id) AS max_id, COUNT(*) AS count "
+        f"FROM ({query}) AS subquery"
+    )
+    response = http_client.get(CARTO_SQL_URL, params={"q": range_query})
+    if response.status_code == 400:
+        # Carto rejects the query when the column doesn't exist
+        return None
+    response.raise_for_status()
+
+    row = response.json()["rows"][0]
+    if not row["count"]:
+        return 0, 0, 0
+    return int(row["min_id"]), int(row["max_id"]), row["count"]
@@ -0,0 +1,74 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, List
+
+import numpy as np
+import pandas as pd
+
+Condition = Callable[[pd.DataFrame], pd.Series]
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    A row of a decision table: rows matching `when` get `then`.
+
+    Attributes:
+        when (Condition): A function of the whole frame returning a boolean mask.
+        then (Any): The value given to the matching rows.
+    """
+
+    when: Condition
+    then: Any
+
+
+@dataclass
+class DecisionTable:
+    """
+    An ordered list of rules evaluated over whole columns at once. Each row gets the value of
+    the first rule it matches, or the default if it matches none, like an if/elif/else chain
+    applied row by row.
+
+    Attributes:
+        rules (List[Rule]): The rules, in order of precedence.
+        default (Any): The value for rows that match no rule.
+        dtype (Any): The dtype of the resulting column. Defaults to object.
+    """
+
+    rules: List[Rule]
+    default: Any
+    dtype: Any = field(default=object)
+
+    def evaluate(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Evaluate the table against a frame.
+
+        Args:
+            df (DataFrame): The frame whose columns the rule conditions reference.
+
+        Returns:
+            Series: The value of each row, aligned with the frame's index.
+        """
+        conditions = [
+            np.asarray(rule.when(df), dtype=bool).reshape(len(df))
+            for rule in self.rules
+        ]
+        choices = [np.full(len(df), rule.then, dtype=object) for rule in self.rules]
+        values = np.select(
+            conditions, choices, default=np.full(len(df), self.default, dtype=object)
+        )
+        return pd.Series(values, index=df.index).astype(self.dtype)
+
+
+def numeric(series: pd.Series) -> pd.Series:
+    """
+    A column as floats, with values that aren't numbers as NaN, so that comparisons with
+    them are false like comparisons with NaN in row-wise code.
+    """
+    return pd.to_numeric(series, errors="coerce")
+
+
+def flag(series: pd.Series) -> pd.Series:
+    """
+    A boolean column with missing values as False.
+    """
+    return series.where(series.notna(), False).astype(bool)
@@ -0,0 +1,371 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import geopandas as gpd
+import pandas as pd
+import requests
+from esridump.dumper import EsriDumper
+from esridump.errors import EsriDownloadError
+from esridump.esri2geojson import esri2geojson
+
+from src.classes import http_client
+from src.config.config import esri_max_workers, get_logger
+
+# Esri data loader
+ESRI_MAX_PAGE_SIZE = 2000
+
+# How many times a page is requested before a short page is treated as an error
+ESRI_PAGE_ATTEMPTS = 3
+
+
+def esri_request(
+    url: str, params: dict, error_message: str, method: str = "GET"
+) -> dict:
+    """
+    Send a request to an Esri REST endpoint and return its JSON, raising EsriDownloadError
+    for the errors Esri reports in the body of a 200 response.
+    """
+    params = {**params, "f": "json"}
+    if method == "POST":
+        response = http_client.post(url, data=params)
+    else:
+        response = http_client.get(url, params=params)
+    response.raise_for_status()
+
+    data = response.json()
+    if data.get("error"):
+        raise EsriDownloadError(f"{error_message}: {data['error'].get('message')}")
+    return data
+
+
+def get_esri_object_id_pages(
+    url: str, extra_query_args: dict | None = None
+) -> List[List[int]]:
+    """
+    Query the object IDs of a layer's features once and split them into pages no larger than
+    the layer's maxRecordCount, each of which can be fetched independently.
+    """
+    metadata = esri_request(url, {}, "Could not retrieve layer metadata")
+    page_size = min(ESRI_MAX_PAGE_SIZE, metadata.get("maxRecordCount") or 1000)
+
+    id_args = {"where": "1=1", **(extra_query_args or {}), "returnIdsOnly": "true"}
+    id_data = esri_request(
+        f"{url}/query", id_args, "Could not retrieve object IDs", method="POST"
+    )
+    if "objectIds" not in id_data:
+        raise EsriDownloadError("Server doesn't support returnIdsOnly")
+
+    object_ids = sorted(id_data["objectIds"] or [])
+    return [
+        object_ids[start : start + page_size]
+        for start in range(0, len(object_ids), page_size)
+    ]
+
+
+def fetch_esri_page(
+    url: str, object_ids: List[int], extra_query_args: dict | None = None
+) -> List[dict]:
+    """
+    Fetch the features with the given object IDs as GeoJSON features in EPSG:4326. A page
+    with fewer features than requested is requested again, and raises EsriDownloadError if
+    it is still short after ESRI_PAGE_ATTEMPTS requests, rather than leaving the layer
+    partial.
+    """
+    page_args = {
+        **(extra_query_args or {}),
+        "objectIds": ",".join(map(str, object_ids)),
+        "outFields": "*",
+        "returnGeometry": "true",
+        "outSR": "4326",
+        "geometryPrecision": 7,
+    }
+    for attempt in range(1, ESRI_PAGE_ATTEMPTS + 1):
+        data = esri_request(
+            f"{url}/query",
+            page_args,
+            "Could not retrieve this chunk of objects",
+            method="POST",
+        )
+        features = data.get("features", [])
+        if len(features) == len(object_ids):
+            return [esri2geojson(feature) for feature in features]
+        get_logger("geometry_debug").warning(
+            f"Requested {len(object_ids)} features from {url}, got {len(features)} "
+            f"(attempt {attempt}/{ESRI_PAGE_ATTEMPTS})"
+        )
+
+    raise EsriDownloadError(
+        f"Requested {len(object_ids)} features from {url}, got {len(features)}"
+    )
+
+
+def dump_esri_features(url: str, extra_query_args: dict | None = None) -> List[dict]:
+    """
+    Fetch all the features of a layer one page at a time with EsriDumper, for services that
+    can't list their object IDs.
+    """
+    dumper_kwargs = {
+        "url": url,
+        "pause_seconds": 1,
+        "requests_to_pause": 10,
+        "max_page_size": ESRI_MAX_PAGE_SIZE,
+    }
+    # Pass extra_query_args as the extra_query_args parameter, not as direct kwargs
+    if extra_query_args:
+        dumper_kwargs["extra_query_args"] = extra_query_args
+
+    return [feature for feature in EsriDumper(**dumper_kwargs)]
+
+
+def fetch_esri_features(
+    esri_urls: List[str],
+    extra_query_args: dict | None = None,
+    max_workers: int = esri_max_workers,
+) -> List[List[dict]]:
+    """
+    Fetch the features of several Esri layers concurrently.
+
+    The object IDs of each layer are listed once and split into pages, and the pages of all
+    the layers are fetched by one pool of workers, so a large layer doesn't hold up the
+    others. The number of requests in flight to each host is capped by the shared HTTP
+    session. Layers whose object IDs can't be listed, or with a page that stays short of
+    its object IDs, fall back to EsriDumper.
+
+    Returns:
+        List[List[dict]]: The GeoJSON features of each layer, in the order of `esri_urls`,
+        with each layer's features in object ID order.
+    """
+    geometry_logger = get_logger("geometry_debug")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        page_plans = {
+            url: executor.submit(get_esri_object_id_pages, url, extra_query_args)
+            for url in esri_urls
+        }
+
+        page_futures = {}
+        paged_urls = set()
+        for url, plan in page_plans.items():
+            try:
+                pages = plan.result()
+                geometry_logger.info(f"Fetching {len(pages)} pages from {url}")
+                page_futures[url] = [
+                    executor.submit(fetch_esri_page, url, page, extra_query_args)
+                    for page in pages
+                ]
+                paged_urls.add(url)
+            except (EsriDownloadError, requests.RequestException) as e:
+                geometry_logger.warning(
+                    f"Could not list object IDs of {url} ({e}), falling back to EsriDumper"
+                )
+                page_futures[url] = [
+                    executor.submit(dump_esri_features, url, extra_query_args)
+                ]
+
+        features_by_url = []
+        for url in esri_urls:
+            try:
+                pages = [future.result() for future in page_futures[url]]
+            except EsriDownloadError as e:
+                if url not in paged_urls:
+                    raise
+                geometry_logger.warning(
+                    f"Could not fetch every page of {url} ({e}), falling back to EsriDumper"
+                )
+                pages = [dump_esri_features(url, extra_query_args)]
+            features_by_url.append([feature for page in pages for feature in page])
+        return features_by_url
+
+
+def load_esri_data(esri_urls: List[str], input_crs: str, extra_query_args: dict = None):
+    """
+    Load data from Esri REST URLs and add a parcel_type column based on the URL.
+
+    Args:
+        esri_rest_urls (list[str]): List of Esri REST URLs to fetch data from.
+        input_crs (str): CRS of the source data.
+        extra_query_args (dict): Additional query parameters to pass to the ESRI service.
+    Returns:
+        GeoDataFrame: Combined GeoDataFrame with data from all URLs.
+    """
+    geometry_logger = get_logger("geometry_debug")
+    gdfs = []
+
+    geometry_logger.info("Fetching features from ESRI services...")
+    features_by_url = fetch_esri_features(esri_urls, extra_query_args)
+
+    for url, features in zip(esri_urls, features_by_url):
+        geometry_logger.info(f"Processing ESRI URL: {url}")
+
+        # Determine parcel_type based on URL patterns
+        parcel_type = (
+            "Land"
+            if "Vacant_Indicators_Land" in url
+            else "Building"
+            if "Vacant_Indicators_Bldg" in url
+            else None
+        )
+
+        geometry_logger.info(f"Fetched {len(features)} features from ESRI service")
+
+        if not features:
+            geometry_logger.warning("No features found, skipping this URL")
+            continue  # Skip if no features were found
+
+        geojson_features = {"type": "FeatureCollection", "features": features}
+
+        geometry_logger.info("Creating GeoDataFrame from features...")
+        # Let the service determine its own CRS first
+        gdf = gpd.GeoDataFrame.from_features(geojson_features)
+
+        geometry_logger.info(
+            f"Initial GeoDataFrame CRS: EPSG:{gdf.crs.to_epsg() if gdf.crs else 'None'}"
+        )
+        geometry_logger.info(f"Initial GeoDataFrame shape: {gdf.shape}")
+
+        if not gdf.empty:
+            geometry_logger.info(
+                f"Initial geometry types: {gdf.geometry.geom_type.value_counts().to_dict()}"
+            )
+            geometry_logger.info(f"Initial bounds: {gdf.total_bounds}")
+
+            # Sample coordinates to check if they look like lat/lon or projected
+            geometry_logger.info("Sample coordinates from first 3 features:")
+            for i in range(min(3, len(gdf))):
+                geom = gdf.iloc[i].geometry
+                try:
+                    if geom.geom_type == "Point":
+                        coords = list(geom.coords)[0]
+                    elif geom.geom_type == "Polygon":
+                        coords = list(geom.exterior.coords)[0]
+                    elif geom.geom_type == "MultiPolygon":
+                        # For MultiPolygon, get first coordinate of first polygon's exterior
+                        coords = list(geom.geoms[0].exterior.coords)[0]
+                    elif geom.geom_type in ["LineString", "MultiLineString"]:
+                        coords = list(geom.coords)[0]
+                    else:
+                        coords = "unknown geometry type"
+                    geometry_logger.info(f"  Feature {i}: {coords}")
+
+                    # Check if coordinates look like lat/lon (should be roughly -180 to 180 for x, -90 to 90 for y)
+                    if isinstance(coords, tuple) and len(coords) >= 2:
+                        x, y = coords[0], coords[1]
+                        looks_like_latlon = (-180 <= x <= 180) and (-90 <= y <= 90)
+                        geometry_logger.info(
+                            f"    Coordinates look like lat/lon: {looks_like_latlon} (x: {x}, y: {y})"
+                        )
+                except Exception as e:
+                    geometry_logger.warning(
+                        f"  Feature {i}: Error sampling coordinates: {e}"
+                    )
+                    coords = "error sampling coordinates"
+
+        # If no CRS is set, assume EPSG:4326 (most ESRI services use this)
+        if gdf.crs is None:
+            geometry_logger.warning("No CRS detected, assuming EPSG:4326")
+            gdf.set_crs("EPSG:4326", inplace=True)
+            geometry_logger.info(
+                f"Set CRS to EPSG:4326, new CRS: EPSG:{gdf.crs.to_epsg() if gdf.crs else 'None'}"
+            )
+
+        # Check if coordinates are in lat/lon range but labeled as a projected CRS
+        # This handles the case where data comes in with lat/lon coordinates but is incorrectly labeled
+        if not gdf.empty and gdf.crs and gdf.crs != "EPSG:4326":
+            bounds = gdf.total_bounds
+            x_in_latlon_range = -180 <= bounds[0] <= 180 and -180 <= bounds[2] <= 180
+            y_in_latlon_range = -90 <= bounds[1] <= 90 and -90 <= bounds[3] <= 90
+
+            if x_in_latlon_range and y_in_latlon_range:
+                geometry_logger.warning(
+                    f"Coordinates are in lat/lon range but labeled as {gdf.crs}. "
+                    f"Bounds: {bounds}. Fixing CRS label to EPSG:4326."
+                )
+                gdf.set_crs("EPSG:4326", inplace=True, allow_override=True)
+                geometry_logger.info(
+                    f"Fixed CRS label to EPSG:4326, new CRS: EPSG:{gdf.crs.to_epsg() if gdf.crs else 'None'}"
+                )
+
+        # Now convert to the target CRS
+        if gdf.crs and gdf.crs != input_crs:
+            geometry_logger.info(
+                f"Converting from EPSG:{gdf.crs.to_epsg() if gdf.crs else 'None'} to {input_crs}"
+            )
+            geometry_logger.info(f"Before conversion - bounds: {gdf.total_bounds}")
+
+            # Sample coordinates before conversion
+            geometry_logger.info("Sample coordinates before CRS conversion:")
+            for i in range(min(3, len(gdf))):
+                geom = gdf.iloc[i].geometry
+                try:
+                    if geom.geom_type == "Point":
+                        coords = list(geom.coords)[0]
+                    elif geom.geom_type == "Polygon":
+                        coords = list(geom.exterior.coords)[0]
+                    elif geom.geom_type == "MultiPolygon":
+                        # For MultiPolygon, get first coordinate of first polygon's exterior
+                        coords = list(geom.geoms[0].exterior.coords)[0]
+                    elif geom.geom_type in ["LineString", "MultiLineString"]:
+                        coords = list(geom.coords)[0]
+                    else:
+                        coords = "unknown geometry type"
+                    geometry_logger.info(f"  Feature {i}: {coords}")
+                except Exception as e:
+                    geometry_logger.warning(
+                        f"  Feature {i}: Error sampling coordinates: {e}"
+                    )
+                    coords = "error sampling coordinates"
+
+            gdf = gdf.to_crs(input_crs)
+            geometry_logger.info(
+                f"After conversion - CRS: EPSG:{gdf.crs.to_epsg() if gdf.crs else 'None'}"
+            )
+            geometry_logger.info(f"After conversion - bounds: {gdf.total_bounds}")
+
+            # Sample coordinates after conversion
+            geometry_logger.info("Sample coordinates after CRS conversion:")
+            for i in range(min(3, len(gdf))):
+                geom = gdf.iloc[i].geometry
+                try:
+                    if geom.geom_type == "Point":
+                        coords = list(geom.coords)[0]
+                    elif geom.geom_type == "Polygon":
+                        coords = list(geom.exterior.coords)[0]
+                    elif geom.geom_type == "MultiPolygon":
+                        # For MultiPolygon, get first coordinate of first polygon's exterior
+                        coords = list(geom.geoms[0].exterior.coords)[0]
+                    elif geom.geom_type in ["LineString", "MultiLineString"]:
+                        coords = list(geom.coords)[0]
+                    else:
+                        coords = "unknown geometry type"
+                    geometry_logger.info(f"  Feature {i}: {coords}")
+                except Exception as e:
+                    geometry_logger.warning(
+                        f"  Feature {i}: Error sampling coordinates: {e}"
+                    )
+                    coords = "error sampling coordinates"
+        else:
+            geometry_logger.info(
+                f"CRS already matches target ({input_crs}), no conversion needed"
+            )
+
+        if parcel_type:
+            gdf["parcel_type"] = parcel_type  # Add the parcel_type column
+            geometry_logger.info(f"Added parcel_type: {parcel_type}")
+
+        gdfs.append(gdf)
+        geometry_logger.info(f"Completed processing URL, final shape: {gdf.shape}")
+
+    geometry_logger.info(f"Combining {len(gdfs)} GeoDataFrames...")
+    combined_gdf = pd.concat(gdfs, ignore_index=True)
+    geometry_logger.info(f"Combined GeoDataFrame shape: {combined_gdf.shape}")
+    geometry_logger.info(
+        f"Combined GeoDataFrame CRS: EPSG:{combined_gdf.crs.to_epsg() if combined_gdf.crs else 'None'}"
+    )
+
+    if not combined_gdf.empty:
+        geometry_logger.info(
+            f"Combined geometry types: {combined_gdf.geometry.geom_type.value_counts().to_dict()}"
+        )
+        geometry_logger.info(f"Combined bounds: {combined_gdf.total_bounds}")
+
+    return combined_gdf
@@ -11,6 +11,7 @@ from typing import List
 import geopandas as gpd
 from tqdm import tqdm
 
+from src.classes.source_cache import SourceCacheManifest
 from src.config.config import CACHE_FRACTION, ROOT_DIRECTORY, get_logger
 
 print(f"Root directory is {ROOT_DIRECTORY}")
@@ -64,6 +65,8 @@ class FileManager:
         if not os.path.exists(self.pipeline_cache_directory):
             os.makedirs(self.pipeline_cache_directory)
 
+        self.source_cache = SourceCacheManifest(self.source_cache_directory)
+
     def generate_file_label(self, table_name: str) -> str:
         """
         Generates a file label for a given table name to cache parquet files according to format
@@ -0,0 +1,91 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.config.config import (
+    HTTP_HOST_CONNECTION_LIMITS,
+    http_backoff_factor,
+    http_max_connections_per_host,
+    http_max_retries,
+    http_timeout,
+)
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def _make_adapter(max_connections: int) -> HTTPAdapter:
+    retry = Retry(
+        total=http_max_retries,
+        backoff_factor=http_backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        respect_retry_after_header=True,
+        # The pipeline only POSTs read-only queries (Esri queries too long for a
+        # URL), so those are safe to retry as well
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"},
+        # Hand the last response back once the retries run out, so callers can
+        # inspect its status code or call raise_for_status as usual
+        raise_on_status=False,
+    )
+    # pool_block keeps the number of open connections to each host at
+    # max_connections: threads past the limit wait for a free connection
+    return HTTPAdapter(
+        pool_connections=max(len(HTTP_HOST_CONNECTION_LIMITS), 1) + 8,
+        pool_maxsize=max_connections,
+        pool_block=True,
+        max_retries=retry,
+    )
+
+
+def create_session() -> requests.Session:
+    """
+    Create a session that keeps connections alive between requests, asks for gzip
+    responses and retries connection errors, 429s and 5xx responses with exponential
+    backoff. Connections are capped per host (see HTTP_HOST_CONNECTION_LIMITS).
+    """
+    session = requests.Session()
+    session.headers.update({"Accept-Encoding": "gzip, deflate"})
+
+    default_adapter = _make_adapter(http_max_connections_per_host)
+    session.mount("https://", default_adapter)
+    session.mount("http://", default_adapter)
+    for host, max_connections in HTTP_HOST_CONNECTION_LIMITS.items():
+        adapter = _make_adapter(max_connections)
+        session.mount(f"https://{host}/", adapter)
+        session.mount(f"http://{host}/", adapter)
+
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    The session shared by all loaders and services, created on first use.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """
+    Send a GET request through the shared session, with the default timeouts unless
+    `timeout` is given. Takes the same arguments as requests.get.
+    """
+    kwargs.setdefault("timeout", http_timeout)
+    return get_session().get(url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """
+    Send a POST request through the shared session, with the default timeouts unless
+    `timeout` is given. Takes the same arguments as requests.post.
+    """
+    kwargs.setdefault("timeout", http_timeout)
+    return get_session().post(url, **kwargs)
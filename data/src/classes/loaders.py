@@ -1,22 +1,22 @@
+import hashlib
 import os
 import subprocess
 import time
 from abc import ABC, abstractmethod
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Optional, Tuple
+from typing import List, Optional, Set, Tuple
 
 import geopandas as gpd
-import pandas as pd
-import requests
-from esridump.dumper import EsriDumper
 from google.cloud import storage
-from shapely import wkb
-from tqdm import tqdm
 
 from src.classes.bucket_manager import GCSBucketManager
+from src.classes.carto import load_carto_data, stream_carto_data
+from src.classes.esri import load_esri_data
 from src.classes.file_manager import FileManager, FileType, LoadType
+from src.classes.source_cache import SourceCacheManifest
 from src.config.config import (
+    DEFAULT_SOURCE_CACHE_TTL_HOURS,
     FORCE_RELOAD,
+    SOURCE_CACHE_TTL_HOURS,
     USE_CRS,
     get_logger,
     min_tiles_file_size_in_bytes,
@@ -202,279 +202,6 @@ def generate_pmtiles(
         raise
 
 
-# Esri data loader
-def load_esri_data(esri_urls: List[str], input_crs: str, extra_query_args: dict = None):
-    """
-    Load data from Esri REST URLs and add a parcel_type column based on the URL.
-
-    Args:
-        esri_rest_urls (list[str]): List of Esri REST URLs to fetch data from.
-        input_crs (str): CRS of the source data.
-        extra_query_args (dict): Additional query parameters to pass to the ESRI service.
-    Returns:
-        GeoDataFrame: Combined GeoDataFrame with data from all URLs.
-    """
-    geometry_logger = get_logger("geometry_debug")
-    gdfs = []
-
-    for url in esri_urls:
-        geometry_logger.info(f"Processing ESRI URL: {url}")
-
-        # Determine parcel_type based on URL patterns
-        parcel_type = (
-            "Land"
-            if "Vacant_Indicators_Land" in url
-            else "Building"
-            if "Vacant_Indicators_Bldg" in url
-            else None
-        )
-
-        # Create dumper with query parameters if provided
-        dumper_kwargs = {
-            "url": url,
-            "pause_seconds": 1,
-            "requests_to_pause": 10,
-            "max_page_size": 2000,
-        }
-
-        # Pass extra_query_args as the extra_query_args parameter, not as direct kwargs
-        if extra_query_args:
-            dumper_kwargs["extra_query_args"] = extra_query_args
-
-        geometry_logger.info("Creating EsriDumper...")
-        dumper = EsriDumper(**dumper_kwargs)
-
-        geometry_logger.info("Fetching features from ESRI service...")
-        features = [feature for feature in dumper]
-        geometry_logger.info(f"Fetched {len(features)} features from ESRI service")
-
-        if not features:
-            geometry_logger.warning("No features found, skipping this URL")
-            continue  # Skip if no features were found
-
-        geojson_features = {"type": "FeatureCollection", "features": features}
-
-        geometry_logger.info("Creating GeoDataFrame from features...")
-        # Let the service determine its own CRS first
-        gdf = gpd.GeoDataFrame.from_features(geojson_features)
-
-        geometry_logger.info(
-            f"Initial GeoDataFrame CRS: EPSG:{gdf.crs.to_epsg() if gdf.crs else 'None'}"
-        )
-        geometry_logger.info(f"Initial GeoDataFrame shape: {gdf.shape}")
-
-        if not gdf.empty:
-            geometry_logger.info(
-                f"Initial geometry types: {gdf.geometry.geom_type.value_counts().to_dict()}"
-            )
-            geometry_logger.info(f"Initial bounds: {gdf.total_bounds}")
-
-            # Sample coordinates to check if they look like lat/lon or projected
-            geometry_logger.info("Sample coordinates from first 3 features:")
-            for i in range(min(3, len(gdf))):
-                geom = gdf.iloc[i].geometry
-                try:
-                    if geom.geom_type == "Point":
-                        coords = list(geom.coords)[0]
-                    elif geom.geom_type == "Polygon":
-                        coords = list(geom.exterior.coords)[0]
-                    elif geom.geom_type == "MultiPolygon":
-                        # For MultiPolygon, get first coordinate of first polygon's exterior
-                        coords = list(geom.geoms[0].exterior.coords)[0]
-                    elif geom.geom_type in ["LineString", "MultiLineString"]:
-                        coords = list(geom.coords)[0]
-                    else:
-                        coords = "unknown geometry type"
-                    geometry_logger.info(f"  Feature {i}: {coords}")
-
-                    # Check if coordinates look like lat/lon (should be roughly -180 to 180 for x, -90 to 90 for y)
-                    if isinstance(coords, tuple) and len(coords) >= 2:
-                        x, y = coords[0], coords[1]
-                        looks_like_latlon = (-180 <= x <= 180) and (-90 <= y <= 90)
-                        geometry_logger.info(
-                            f"    Coordinates look like lat/lon: {looks_like_latlon} (x: {x}, y: {y})"
-                        )
-                except Exception as e:
-                    geometry_logger.warning(
-                        f"  Feature {i}: Error sampling coordinates: {e}"
-                    )
-                    coords = "error sampling coordinates"
-
-        # If no CRS is set, assume EPSG:4326 (most ESRI services use this)
-        if gdf.crs is None:
-            geometry_logger.warning("No CRS detected, assuming EPSG:4326")
-            gdf.set_crs("EPSG:4326", inplace=True)
-            geometry_logger.info(
-                f"Set CRS to EPSG:4326, new CRS: EPSG:{gdf.crs.to_epsg() if gdf.crs else 'None'}"
-            )
-
-        # Check if coordinates are in lat/lon range but labeled as a projected CRS
-        # This handles the case where data comes in with lat/lon coordinates but is incorrectly labeled
-        if not gdf.empty and gdf.crs and gdf.crs != "EPSG:4326":
-            bounds = gdf.total_bounds
-            x_in_latlon_range = -180 <= bounds[0] <= 180 and -180 <= bounds[2] <= 180
-            y_in_latlon_range = -90 <= bounds[1] <= 90 and -90 <= bounds[3] <= 90
-
-            if x_in_latlon_range and y_in_latlon_range:
-                geometry_logger.warning(
-                    f"Coordinates are in lat/lon range but labeled as {gdf.crs}. "
-                    f"Bounds: {bounds}. Fixing CRS label to EPSG:4326."
-                )
-                gdf.set_crs("EPSG:4326", inplace=True, allow_override=True)
-                geometry_logger.info(
-                    f"Fixed CRS label to EPSG:4326, new CRS: EPSG:{gdf.crs.to_epsg() if gdf.crs else 'None'}"
-                )
-
-        # Now convert to the target CRS
-        if gdf.crs and gdf.crs != input_crs:
-            geometry_logger.info(
-                f"Converting from EPSG:{gdf.crs.to_epsg() if gdf.crs else 'None'} to {input_crs}"
-            )
-            geometry_logger.info(f"Before conversion - bounds: {gdf.total_bounds}")
-
-            # Sample coordinates before conversion
-            geometry_logger.info("Sample coordinates before CRS conversion:")
-            for i in range(min(3, len(gdf))):
-                geom = gdf.iloc[i].geometry
-                try:
-                    if geom.geom_type == "Point":
-                        coords = list(geom.coords)[0]
-                    elif geom.geom_type == "Polygon":
-                        coords = list(geom.exterior.coords)[0]
-                    elif geom.geom_type == "MultiPolygon":
-                        # For MultiPolygon, get first coordinate of first polygon's exterior
-                        coords = list(geom.geoms[0].exterior.coords)[0]
-                    elif geom.geom_type in ["LineString", "MultiLineString"]:
-                        coords = list(geom.coords)[0]
-                    else:
-                        coords = "unknown geometry type"
-                    geometry_logger.info(f"  Feature {i}: {coords}")
-                except Exception as e:
-                    geometry_logger.warning(
-                        f"  Feature {i}: Error sampling coordinates: {e}"
-                    )
-                    coords = "error sampling coordinates"
-
-            gdf = gdf.to_crs(input_crs)
-            geometry_logger.info(
-                f"After conversion - CRS: EPSG:{gdf.crs.to_epsg() if gdf.crs else 'None'}"
-            )
-            geometry_logger.info(f"After conversion - bounds: {gdf.total_bounds}")
-
-            # Sample coordinates after conversion
-            geometry_logger.info("Sample coordinates after CRS conversion:")
-            for i in range(min(3, len(gdf))):
-                geom = gdf.iloc[i].geometry
-                try:
-                    if geom.geom_type == "Point":
-                        coords = list(geom.coords)[0]
-                    elif geom.geom_type == "Polygon":
-                        coords = list(geom.exterior.coords)[0]
-                    elif geom.geom_type == "MultiPolygon":
-                        # For MultiPolygon, get first coordinate of first polygon's exterior
-                        coords = list(geom.geoms[0].exterior.coords)[0]
-                    elif geom.geom_type in ["LineString", "MultiLineString"]:
-                        coords = list(geom.coords)[0]
-                    else:
-                        coords = "unknown geometry type"
-                    geometry_logger.info(f"  Feature {i}: {coords}")
-                except Exception as e:
-                    geometry_logger.warning(
-                        f"  Feature {i}: Error sampling coordinates: {e}"
-                    )
-                    coords = "error sampling coordinates"
-        else:
-            geometry_logger.info(
-                f"CRS already matches target ({input_crs}), no conversion needed"
-            )
-
-        if parcel_type:
-            gdf["parcel_type"] = parcel_type  # Add the parcel_type column
-            geometry_logger.info(f"Added parcel_type: {parcel_type}")
-
-        gdfs.append(gdf)
-        geometry_logger.info(f"Completed processing URL, final shape: {gdf.shape}")
-
-    geometry_logger.info(f"Combining {len(gdfs)} GeoDataFrames...")
-    combined_gdf = pd.concat(gdfs, ignore_index=True)
-    geometry_logger.info(f"Combined GeoDataFrame shape: {combined_gdf.shape}")
-    geometry_logger.info(
-        f"Combined GeoDataFrame CRS: EPSG:{combined_gdf.crs.to_epsg() if combined_gdf.crs else 'None'}"
-    )
-
-    if not combined_gdf.empty:
-        geometry_logger.info(
-            f"Combined geometry types: {combined_gdf.geometry.geom_type.value_counts().to_dict()}"
-        )
-        geometry_logger.info(f"Combined bounds: {combined_gdf.total_bounds}")
-
-    return combined_gdf
-
-
-# Carto data loader
-def load_carto_data(
-    queries: List[str],
-    input_crs: str,
-    wkb_geom_field: str | None = "the_geom",
-    max_workers: int = os.cpu_count(),
-    chunk_size: int = 100000,
-):
-    gdfs = []
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = []
-        for query in queries:
-            total_rows = get_carto_total_rows(query)
-            for offset in range(0, total_rows, chunk_size):
-                futures.append(
-                    executor.submit(
-                        fetch_carto_chunk,
-                        query,
-                        offset,
-                        input_crs,
-                        wkb_geom_field,
-                        chunk_size,
-                    )
-                )
-        for future in tqdm(
-            as_completed(futures), total=len(futures), desc="Processing Carto chunks"
-        ):
-            gdfs.append(future.result())
-    return pd.concat(gdfs, ignore_index=True)
-
-
-def fetch_carto_chunk(
-    query: str,
-    offset: int,
-    input_crs: str,
-    wkb_geom_field: str | None = "the_geom",
-    chunk_size: int = 100000,
-):
-    chunk_query = f"{query} LIMIT {chunk_size} OFFSET {offset}"
-    response = requests.get(
-        "https://phl.carto.com/api/v2/sql", params={"q": chunk_query}
-    )
-    response.raise_for_status()
-    data = response.json().get("rows", [])
-    if not data:
-        return gpd.GeoDataFrame()
-    df = pd.DataFrame(data)
-    geometry = (
-        wkb.loads(df[wkb_geom_field], hex=True)
-        if wkb_geom_field
-        else gpd.points_from_xy(df.x, df.y)
-    )
-    return gpd.GeoDataFrame(df, geometry=geometry, crs=input_crs)
-
-
-def get_carto_total_rows(query):
-    count_query = f"SELECT COUNT(*) as count FROM ({query}) as subquery"
-    response = requests.get(
-        "https://phl.carto.com/api/v2/sql", params={"q": count_query}
-    )
-    response.raise_for_status()
-    return response.json()["rows"][0]["count"]
-
-
 def google_cloud_bucket(require_write_access: bool = False) -> storage.Bucket | None:
     """
     Initialize a Google Cloud Storage bucket client using Application Default Credentials.
@@ -491,6 +218,10 @@ def google_cloud_bucket(require_write_access: bool = False) -> storage.Bucket |
 
 
 class BaseLoader(ABC):
+    # Cache keys of the data fetched into the source cache during this run (e.g. by the
+    # prefetch stage), which load_or_fetch reads back even when FORCE_RELOAD is set
+    fetched_cache_keys: Set[str] = set()
+
     def __init__(
         self,
         name: str,
@@ -516,14 +247,19 @@ class BaseLoader(ABC):
         start_time = time.time()
         performance_logger.info(f"Starting cache operation for {self.name}...")
 
-        # Save sourced data to a local parquet file in the storage/source_cache directory
-        file_label = self.file_manager.generate_file_label(self.table_name)
+        # Save sourced data to a local parquet file in the storage/source_cache directory,
+        # named after the cache key so that data fetched with other parameters isn't overwritten
+        cache_key = self.cache_key
+        file_label = f"{self.table_name}_{cache_key[:16]}"
         performance_logger.info(f"Generated file label: {file_label}")
 
         cache_start = time.time()
         self.file_manager.save_gdf(
             gdf, file_label, LoadType.SOURCE_CACHE, FileType.PARQUET
         )
+        self.file_manager.source_cache.record(
+            cache_key, self.table_name, f"{file_label}.parquet", gdf
+        )
         cache_time = time.time() - cache_start
 
         total_time = time.time() - start_time
@@ -531,6 +267,53 @@ class BaseLoader(ABC):
             f"Cache operation completed in {total_time:.2f}s (save: {cache_time:.2f}s)"
         )
 
+    def cache_key_params(self) -> dict:
+        """
+        The parameters that determine what data the loader fetches, hashed into its cache key.
+        Subclasses add the parameters of their source, e.g. URLs or queries.
+        """
+        return {
+            "loader": type(self).__name__,
+            "table_name": self.table_name,
+            "cols": self.cols,
+            "input_crs": self.input_crs,
+            "opa_col": self.opa_col,
+        }
+
+    @property
+    def cache_key(self) -> str:
+        return SourceCacheManifest.cache_key(self.cache_key_params())
+
+    @property
+    def cache_ttl_hours(self) -> float:
+        return SOURCE_CACHE_TTL_HOURS.get(
+            self.table_name, DEFAULT_SOURCE_CACHE_TTL_HOURS
+        )
+
+    def _cache_is_usable(self) -> bool:
+        """
+        Whether the source cache holds this loader's data and it is still within its TTL, or
+        was fetched during this run.
+        """
+        cache_logger = get_logger("cache")
+        cache_key = self.cache_key
+
+        if cache_key in BaseLoader.fetched_cache_keys:
+            return self.file_manager.source_cache.lookup(cache_key) is not None
+        if FORCE_RELOAD:
+            return False
+
+        entry = self.file_manager.source_cache.lookup(cache_key)
+        if entry is None:
+            cache_logger.info(f"No cached data for {self.name}")
+            return False
+        if not SourceCacheManifest.is_fresh(entry, self.cache_ttl_hours):
+            cache_logger.info(
+                f"Cached data for {self.name} from {entry['fetched_at']} has expired"
+            )
+            return False
+        return True
+
     def load_or_fetch(self) -> Tuple[gpd.GeoDataFrame, ValidationResult]:
         cache_logger = get_logger("cache")
         cache_logger.info(f"=== Starting load_or_fetch for: {self.name} ===")
@@ -538,19 +321,14 @@ class BaseLoader(ABC):
 
         # Check if we should use cached data
         cache_check_start = time.time()
-        use_cache = (
-            not FORCE_RELOAD
-            and self.file_manager.check_source_cache_file_exists(
-                self.table_name, LoadType.SOURCE_CACHE
-            )
-        )
+        use_cache = self._cache_is_usable()
         cache_check_time = time.time() - cache_check_start
         cache_logger.info(f"Cache check took: {cache_check_time:.2f}s")
 
         if use_cache:
             cache_logger.info(f"Loading data for {self.name} from cache...")
             cache_load_start = time.time()
-            gdf = self.file_manager.get_most_recent_cache(self.table_name)
+            gdf = self.file_manager.source_cache.load(self.cache_key)
             cache_load_time = time.time() - cache_load_start
             cache_logger.info(f"Cache load took: {cache_load_time:.2f}s")
 
@@ -591,9 +369,24 @@ class BaseLoader(ABC):
 
         cache_logger.info("Caching fresh data now...")
         self.cache_data(gdf)
+        BaseLoader.fetched_cache_keys.add(self.cache_key)
 
         return gdf
 
+    def prefetch(self) -> None:
+        """
+        Fetch the source data into the source cache without validating it, so that a later
+        call to load_or_fetch reads it from disk. Does nothing if the data would be read
+        from the cache anyway.
+        """
+        if self._cache_is_usable():
+            get_logger("cache").info(
+                f"{self.name} is already cached, skipping prefetch"
+            )
+            return
+
+        self._load_fresh_data()
+
     def standardize_opa(self, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
         """
         Standardize the OPA column in the GeoDataFrame to be a string and renamed properly to "opa_id".
@@ -651,6 +444,15 @@ class GdfLoader(BaseLoader):
         super().__init__(*args, **kwargs)
         self.input = input
 
+    def cache_key_params(self) -> dict:
+        # In-memory inputs (e.g. a downloaded file) are keyed by their contents
+        source = (
+            hashlib.sha256(self.input.getvalue()).hexdigest()
+            if hasattr(self.input, "getvalue")
+            else str(self.input)
+        )
+        return {**super().cache_key_params(), "input": source}
+
     def load_data(self):
         performance_logger = get_logger("performance")
         performance_logger.info(f"Starting for {self.name} from {self.input}")
@@ -728,6 +530,13 @@ class EsriLoader(BaseLoader):
         self.esri_urls = esri_urls
         self.extra_query_args = extra_query_args
 
+    def cache_key_params(self) -> dict:
+        return {
+            **super().cache_key_params(),
+            "esri_urls": self.esri_urls,
+            "extra_query_args": self.extra_query_args,
+        }
+
     def load_data(self):
         performance_logger = get_logger("performance")
         performance_logger.info(
@@ -854,12 +663,25 @@ class CartoLoader(BaseLoader):
         wkb_geom_field: str | None = "the_geom",
         **kwargs,
     ):
+        """
+        Args:
+            carto_queries (str | List[str]): The Carto SQL queries to fetch.
+            wkb_geom_field (str | None): The column with the hex-encoded WKB geometry, or None
+                to build points from the x and y columns.
+        """
         # Carto data comes in EPSG:4326 (geographic coordinates)
         kwargs["input_crs"] = kwargs.get("input_crs", "EPSG:4326")
         super().__init__(*args, **kwargs)
         self.carto_queries = BaseLoader.string_to_list(carto_queries)
         self.wkb_geom_field = wkb_geom_field
 
+    def cache_key_params(self) -> dict:
+        return {
+            **super().cache_key_params(),
+            "carto_queries": self.carto_queries,
+            "wkb_geom_field": self.wkb_geom_field,
+        }
+
     def load_data(self):
         performance_logger = get_logger("performance")
         performance_logger.info(
@@ -874,6 +696,53 @@ class CartoLoader(BaseLoader):
             f"load_carto_data took {carto_time:.2f}s ({len(gdf)} rows)"
         )
 
+        gdf = self._process_carto_data(gdf)
+
+        total_time = time.time() - start_time
+        performance_logger.info(f"Total load_data took {total_time:.2f}s")
+
+        return gdf
+
+    def _load_fresh_data(self) -> gpd.GeoDataFrame:
+        """
+        Fetch the table into the source cache. A full fetch is streamed page by page straight
+        into the cached parquet file (see stream_carto_data), so the raw rows of the whole
+        table are never held in memory at once.
+        """
+        cache_logger = get_logger("cache")
+        load_start = time.time()
+
+        cache_key = self.cache_key
+        file_name = f"{self.table_name}_{cache_key[:16]}.parquet"
+        file_path = self.file_manager.get_file_path(file_name, LoadType.SOURCE_CACHE)
+
+        cache_logger.info(f"Streaming {self.name} into {file_name}...")
+        row_count = stream_carto_data(
+            self.carto_queries,
+            self.input_crs,
+            file_path,
+            wkb_geom_field=self.wkb_geom_field,
+            process_chunk=self._process_carto_data,
+        )
+        if not os.path.exists(file_path):
+            cache_logger.info("No data to cache")
+            return gpd.GeoDataFrame()
+
+        gdf = gpd.read_parquet(file_path)
+        self.file_manager.source_cache.record(
+            cache_key, self.table_name, file_name, gdf
+        )
+        BaseLoader.fetched_cache_keys.add(cache_key)
+
+        load_time = time.time() - load_start
+        cache_logger.info(
+            f"Streamed {row_count} rows of {self.name} in {load_time:.2f}s"
+        )
+        return gdf
+
+    def _process_carto_data(self, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        performance_logger = get_logger("performance")
+
         normalize_start = time.time()
         gdf = self.normalize_columns(gdf, self.cols)
         normalize_time = time.time() - normalize_start
@@ -894,9 +763,6 @@ class CartoLoader(BaseLoader):
         geometry_time = time.time() - geometry_start
         performance_logger.info(f"Geometry validation took {geometry_time:.2f}s")
 
-        total_time = time.time() - start_time
-        performance_logger.info(f"Total load_data took {total_time:.2f}s")
-
         return gdf
 
     def build_and_publish(self, tiles_file_id_prefix: str) -> None:
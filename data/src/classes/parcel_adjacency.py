@@ -0,0 +1,190 @@
+import hashlib
+import os
+from typing import Optional
+
+import geopandas as gpd
+import numpy as np
+from scipy import sparse
+
+from src.config.config import get_logger
+
+
+def geometry_hashes(geometries: gpd.GeoSeries) -> np.ndarray:
+    """
+    A 64-bit hash of the WKB of each geometry, to tell which parcels changed between runs.
+    """
+    digests = b"".join(
+        hashlib.blake2b(wkb, digest_size=8).digest() for wkb in geometries.to_wkb()
+    )
+    return np.frombuffer(digests, dtype=np.uint64)
+
+
+class ParcelAdjacency:
+    """
+    The contiguity graph of the parcels, in which parcels that touch or overlap are
+    neighbors (queen contiguity), as a sparse adjacency matrix keyed by opa_id.
+
+    The graph is persisted as CSR arrays in the pipeline cache along with a hash of each
+    parcel's geometry. Parcels barely change from one run to the next, so refreshing the
+    graph only queries the spatial index for the parcels that are new or whose geometry
+    changed, and keeps the edges between the others. Adjacency queries are then slices of
+    the arrays rather than geometry predicates.
+
+    Attributes:
+        opa_ids (ndarray): The opa_id of each parcel, sorted.
+        hashes (ndarray): The geometry hash of each parcel (see geometry_hashes).
+        matrix (csr_matrix): The boolean adjacency matrix, with rows and columns in the
+            order of `opa_ids`.
+    """
+
+    def __init__(
+        self,
+        opa_ids: np.ndarray,
+        hashes: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+    ):
+        self.opa_ids = opa_ids
+        self.hashes = hashes
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=bool), indices, indptr),
+            shape=(len(opa_ids), len(opa_ids)),
+        )
+
+    @classmethod
+    def build(
+        cls,
+        parcels: gpd.GeoDataFrame,
+        previous: Optional["ParcelAdjacency"] = None,
+    ) -> "ParcelAdjacency":
+        """
+        Build the graph of the parcels, reusing the edges of a previous graph between the
+        parcels whose geometry hasn't changed.
+
+        Args:
+            parcels (GeoDataFrame): The parcels, with opa_id and polygon geometries.
+            previous (ParcelAdjacency): The graph of an earlier version of the parcels.
+
+        Returns:
+            ParcelAdjacency: The graph of the parcels.
+        """
+        parcels = parcels.drop_duplicates(subset="opa_id").sort_values("opa_id")
+        parcels = parcels.reset_index(drop=True)
+        opa_ids = parcels["opa_id"].to_numpy(dtype=str)
+        hashes = geometry_hashes(parcels.geometry)
+
+        rows, cols = [], []
+        changed = np.ones(len(parcels), dtype=bool)
+        if previous is not None:
+            positions = previous.positions(opa_ids)
+            known = positions >= 0
+            changed[known] = previous.hashes[positions[known]] != hashes[known]
+
+            # The previous edges between unchanged parcels, renumbered
+            renumber = np.full(len(previous.opa_ids), -1)
+            renumber[positions[~changed]] = np.flatnonzero(~changed)
+            edges = previous.matrix.tocoo()
+            kept_rows, kept_cols = renumber[edges.row], renumber[edges.col]
+            kept = (kept_rows >= 0) & (kept_cols >= 0)
+            rows.append(kept_rows[kept])
+            cols.append(kept_cols[kept])
+
+        get_logger("cache").info(
+            f"Parcel adjacency: querying {changed.sum()} of {len(parcels)} parcels"
+        )
+
+        queried = np.flatnonzero(changed)
+        if len(queried) > 0:
+            left, right = parcels.sindex.query(
+                parcels.geometry.iloc[queried], predicate="intersects"
+            )
+            left = queried[left]
+            pairs = left != right
+            rows.extend([left[pairs], right[pairs]])
+            cols.extend([right[pairs], left[pairs]])
+
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=int)
+        cols = np.concatenate(cols) if cols else np.zeros(0, dtype=int)
+        # Pairs found from both of their changed parcels are merged into one edge
+        matrix = sparse.coo_matrix(
+            (np.ones(len(rows), dtype=bool), (rows, cols)),
+            shape=(len(parcels), len(parcels)),
+        ).tocsr()
+        matrix.sort_indices()
+        return cls(opa_ids, hashes, matrix.indptr, matrix.indices)
+
+    def positions(self, opa_ids: np.ndarray) -> np.ndarray:
+        """
+        The row of each opa_id in the adjacency matrix, or -1 for parcels not in the graph.
+        """
+        opa_ids = np.asarray(opa_ids, dtype=str)
+        if len(self.opa_ids) == 0:
+            return np.full(len(opa_ids), -1)
+        positions = np.minimum(
+            np.searchsorted(self.opa_ids, opa_ids), len(self.opa_ids) - 1
+        )
+        return np.where(self.opa_ids[positions] == opa_ids, positions, -1)
+
+    def neighbors(self, opa_id: str) -> np.ndarray:
+        """
+        The opa_ids of the neighbors of a parcel.
+        """
+        (position,) = self.positions([opa_id])
+        if position < 0:
+            raise KeyError(opa_id)
+        start, stop = self.matrix.indptr[position], self.matrix.indptr[position + 1]
+        return self.opa_ids[self.matrix.indices[start:stop]]
+
+    def subgraph(self, opa_ids: np.ndarray) -> sparse.csr_matrix:
+        """
+        The adjacency matrix between the given parcels, in their order. All of them must be
+        in the graph.
+        """
+        positions = self.positions(opa_ids)
+        if (positions < 0).any():
+            raise KeyError(f"{(positions < 0).sum()} parcels are not in the graph")
+        return self.matrix[positions][:, positions]
+
+    def save(self, path: str) -> None:
+        """
+        Save the graph as CSR arrays in an npz file, replacing it atomically.
+        """
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(
+                f,
+                opa_ids=self.opa_ids,
+                hashes=self.hashes,
+                indptr=self.matrix.indptr,
+                indices=self.matrix.indices,
+            )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["ParcelAdjacency"]:
+        """
+        Load a graph saved with save, or None if there is no readable graph at the path.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as arrays:
+                return cls(
+                    arrays["opa_ids"],
+                    arrays["hashes"],
+                    arrays["indptr"],
+                    arrays["indices"],
+                )
+        except (OSError, ValueError, KeyError) as e:
+            get_logger("cache").warning(f"Ignoring unreadable parcel adjacency: {e}")
+            return None
+
+    @classmethod
+    def refresh(cls, parcels: gpd.GeoDataFrame, path: str) -> "ParcelAdjacency":
+        """
+        Bring the graph saved at the path up to date with the parcels, building it from
+        scratch if there is none, and save it back.
+        """
+        adjacency = cls.build(parcels, previous=cls.load(path))
+        adjacency.save(path)
+        return adjacency
@@ -0,0 +1,212 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import geopandas as gpd
+
+from src.config.config import get_logger
+from src.metadata.metadata_utils import parse_docstring
+
+ServiceResult = Tuple[gpd.GeoDataFrame, dict]
+Service = Callable[[gpd.GeoDataFrame], ServiceResult]
+
+
+@dataclass
+class ServiceNode:
+    """
+    A pipeline service along with the columns it reads and writes, as declared in its docstring.
+
+    A value of None for `reads` or `writes` means the docstring does not declare the columns,
+    in which case the service is assumed to touch every column.
+    """
+
+    service: Service
+    position: int
+    reads: Optional[Set[str]]
+    writes: Optional[Set[str]]
+    dependencies: Set[str] = field(default_factory=set)
+
+    @property
+    def name(self) -> str:
+        return self.service.__name__
+
+    @classmethod
+    def from_service(cls, service: Service, position: int) -> "ServiceNode":
+        doc_meta = parse_docstring(service.__doc__)
+
+        referenced = doc_meta.get("columns referenced", [])
+        reads = set(referenced) | {"opa_id"} if referenced else None
+
+        written = [
+            col["name"]
+            for section in ("columns added", "columns updated")
+            for col in doc_meta.get(section, [])
+        ]
+        writes = set(written) if written else None
+
+        return cls(service=service, position=position, reads=reads, writes=writes)
+
+    def conflicts_with(self, later: "ServiceNode") -> bool:
+        """
+        Whether `later` must wait for this service to finish: it reads a column this service
+        writes, writes a column this service writes, or writes a column this service reads.
+        """
+        return (
+            _overlaps(self.writes, later.reads)
+            or _overlaps(self.writes, later.writes)
+            or _overlaps(self.reads, later.writes)
+        )
+
+
+def _overlaps(first: Optional[Set[str]], second: Optional[Set[str]]) -> bool:
+    if first is None:
+        return bool(second) or second is None
+    if second is None:
+        return bool(first)
+    return not first.isdisjoint(second)
+
+
+class ServiceScheduler:
+    """
+    Runs pipeline services concurrently while respecting the column dependencies declared in
+    their docstrings ("Columns referenced", "Columns added" and "Columns updated").
+
+    Each service runs against its own copy of the dataset as it stood once all of its
+    dependencies had completed. When a service finishes, only the columns it added or updated
+    are merged back into the shared dataset by opa_id, so services that do not depend on each
+    other can overlap their (mostly network-bound) loading.
+    """
+
+    def __init__(self, services: List[Service], max_workers: int = 1):
+        self.max_workers = max(1, max_workers)
+        self.nodes: Dict[str, ServiceNode] = {}
+
+        for position, service in enumerate(services):
+            node = ServiceNode.from_service(service, position)
+            for earlier in self.nodes.values():
+                if earlier.conflicts_with(node):
+                    node.dependencies.add(earlier.name)
+            self.nodes[node.name] = node
+
+    def waves(self) -> List[List[str]]:
+        """
+        Group the services into waves where every service only depends on services from
+        earlier waves. Useful for logging and documenting the dependency graph.
+        """
+        level: Dict[str, int] = {}
+        for node in self.nodes.values():
+            level[node.name] = 1 + max(
+                (level[dep] for dep in node.dependencies), default=-1
+            )
+
+        waves: List[List[str]] = [
+            [] for _ in range(max(level.values(), default=-1) + 1)
+        ]
+        for name, index in level.items():
+            waves[index].append(name)
+        return waves
+
+    def run(
+        self,
+        dataset: gpd.GeoDataFrame,
+        run_service: Callable[[Service, gpd.GeoDataFrame], ServiceResult],
+        on_complete: Optional[Callable[[str, gpd.GeoDataFrame, dict], None]] = None,
+    ) -> gpd.GeoDataFrame:
+        """
+        Run every service and return the merged dataset.
+
+        Args:
+            dataset (GeoDataFrame): The base dataset, e.g. the output of opa_properties.
+            run_service (Callable): Called as run_service(service, gdf) in a worker thread.
+            on_complete (Callable): Called as on_complete(name, dataset, validation) in the
+                calling thread after each service's output has been merged.
+
+        Returns:
+            GeoDataFrame: The dataset with all service outputs merged in.
+        """
+        pipeline_logger = get_logger("pipeline")
+        for i, wave in enumerate(self.waves(), 1):
+            pipeline_logger.info(f"Service wave {i}: {', '.join(wave)}")
+
+        if self.max_workers == 1:
+            for node in self.nodes.values():
+                dataset, validation = run_service(node.service, dataset)
+                if on_complete:
+                    on_complete(node.name, dataset, validation)
+            return dataset
+
+        completed: Set[str] = set()
+        pending = dict(self.nodes)
+        running: Dict[Future, Tuple[ServiceNode, List[str]]] = {}
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while pending or running:
+                ready = [
+                    node for node in pending.values() if node.dependencies <= completed
+                ]
+                for node in ready[: self.max_workers - len(running)]:
+                    del pending[node.name]
+                    pipeline_logger.info(f"Starting {node.name}")
+                    future = executor.submit(run_service, node.service, dataset.copy())
+                    running[future] = (node, list(dataset.columns))
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=lambda f: running[f][0].position):
+                    node, input_columns = running.pop(future)
+                    output, validation = future.result()
+                    dataset = self.merge_output(dataset, output, input_columns, node)
+                    completed.add(node.name)
+                    if on_complete:
+                        on_complete(node.name, dataset, validation)
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        executor.shutdown(wait=True)
+
+        return dataset
+
+    @staticmethod
+    def merge_output(
+        dataset: gpd.GeoDataFrame,
+        output: gpd.GeoDataFrame,
+        input_columns: List[str],
+        node: ServiceNode,
+    ) -> gpd.GeoDataFrame:
+        """
+        Merge the columns a service added or updated back into the shared dataset by opa_id.
+        Rows the service dropped are dropped from the dataset as well, and if the service
+        returned one row per opa_id the dataset is deduplicated to match.
+        """
+        performance_logger = get_logger("performance")
+        start_time = time.time()
+
+        columns = [col for col in output.columns if col not in input_columns]
+        if node.writes is not None:
+            columns += [
+                col
+                for col in output.columns
+                if col in node.writes and col in input_columns and col != "opa_id"
+            ]
+        else:
+            columns += [
+                col
+                for col in output.columns
+                if col in input_columns and col != "opa_id"
+            ]
+
+        if output["opa_id"].is_unique:
+            dataset = dataset.drop_duplicates(subset="opa_id")
+        dataset = dataset[dataset["opa_id"].isin(output["opa_id"])]
+
+        updates = output[["opa_id", *columns]].drop_duplicates(subset="opa_id")
+        merged = dataset.drop(
+            columns=[col for col in columns if col in dataset.columns]
+        ).merge(updates, how="left", on="opa_id")
+        merged = gpd.GeoDataFrame(merged, geometry="geometry", crs=dataset.crs)
+
+        performance_logger.info(
+            f"Merged {len(columns)} columns from {node.name} in {time.time() - start_time:.2f}s"
+        )
+        return merged
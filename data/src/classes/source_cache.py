@@ -0,0 +1,162 @@
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+import geopandas as gpd
+
+from src.config.config import get_logger
+
+
+class SourceCacheManifest:
+    """
+    A manifest of the source data cached as parquet files in the source cache directory.
+
+    Entries are keyed by a hash of the parameters that determine what a loader fetches (see
+    BaseLoader.cache_key_params), so changing a loader's URLs, queries or columns never reads
+    back data cached for the old parameters. Each entry records when the data was fetched,
+    its row count and its schema, which are checked again when the file is read back.
+    """
+
+    MANIFEST_FILE = "manifest.json"
+
+    # Loaders run concurrently and each creates its own FileManager, so the lock is shared
+    _lock = threading.Lock()
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, self.MANIFEST_FILE)
+
+    @staticmethod
+    def cache_key(params: dict) -> str:
+        """
+        Hash the parameters that determine what a loader fetches into a cache key.
+
+        Args:
+            params (dict): JSON-serializable loader parameters.
+
+        Returns:
+            str: The hex digest of the parameters.
+        """
+        serialized = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def _read(self) -> Dict[str, dict]:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            get_logger("cache").warning(f"Ignoring unreadable cache manifest: {e}")
+            return {}
+
+    def _write(self, entries: Dict[str, dict]) -> None:
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(entries, f, indent=2)
+        os.replace(temp_path, self.manifest_path)
+
+    def lookup(self, cache_key: str) -> Optional[dict]:
+        """
+        Get the manifest entry for a cache key, if its parquet file still exists.
+        """
+        with self._lock:
+            entry = self._read().get(cache_key)
+        if entry is None:
+            return None
+        if not os.path.exists(os.path.join(self.directory, entry["file_name"])):
+            return None
+        return entry
+
+    @staticmethod
+    def is_fresh(entry: dict, ttl_hours: float) -> bool:
+        """
+        Whether an entry was fetched less than `ttl_hours` ago.
+        """
+        fetched_at = datetime.fromisoformat(entry["fetched_at"])
+        return datetime.now(timezone.utc) - fetched_at < timedelta(hours=ttl_hours)
+
+    def load(self, cache_key: str) -> Optional[gpd.GeoDataFrame]:
+        """
+        Read the cached data for a cache key, checking it against the row count and columns
+        recorded when it was cached.
+
+        Returns:
+            GeoDataFrame: The cached data, or None if it is missing or doesn't match the manifest.
+        """
+        cache_logger = get_logger("cache")
+        entry = self.lookup(cache_key)
+        if entry is None:
+            return None
+
+        gdf = gpd.read_parquet(os.path.join(self.directory, entry["file_name"]))
+
+        if len(gdf) != entry["row_count"] or list(gdf.columns) != list(entry["schema"]):
+            cache_logger.warning(
+                f"Cached {entry['table_name']} doesn't match its manifest entry "
+                f"({len(gdf)} rows, expected {entry['row_count']}), ignoring it"
+            )
+            return None
+
+        return gdf
+
+    def record(
+        self, cache_key: str, table_name: str, file_name: str, gdf: gpd.GeoDataFrame
+    ) -> dict:
+        """
+        Record a newly cached parquet file and evict the files previously cached for the same
+        table, whether under an older cache key or from before the manifest existed.
+
+        Args:
+            cache_key (str): The cache key of the loader that fetched the data.
+            table_name (str): The table name of the loader.
+            file_name (str): The name of the parquet file in the source cache directory.
+            gdf (GeoDataFrame): The data that was cached.
+
+        Returns:
+            dict: The new manifest entry.
+        """
+        entry = {
+            "table_name": table_name,
+            "file_name": file_name,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            "row_count": len(gdf),
+            "schema": {col: str(dtype) for col, dtype in gdf.dtypes.items()},
+        }
+
+        with self._lock:
+            entries = self._read()
+            stale_keys = [
+                key
+                for key, other in entries.items()
+                if other["table_name"] == table_name and key != cache_key
+            ]
+            for key in stale_keys:
+                del entries[key]
+            entries[cache_key] = entry
+            self._write(entries)
+
+            # Only files named like this table's cache files, so that a table name that is a
+            # prefix of another one doesn't evict the other table's files
+            file_pattern = re.compile(
+                rf"{re.escape(table_name)}_([0-9a-f]{{16}}|\d{{4}}_\d{{2}}_\d{{2}}_new)\.parquet"
+            )
+            referenced = {other["file_name"] for other in entries.values()}
+            pattern = os.path.join(
+                self.directory, f"{glob.escape(table_name)}_*.parquet"
+            )
+            for path in glob.glob(pattern):
+                cached_file = os.path.basename(path)
+                if (
+                    file_pattern.fullmatch(cached_file)
+                    and cached_file not in referenced
+                ):
+                    get_logger("cache").info(f"Evicting stale cache file {cached_file}")
+                    os.remove(path)
+
+        return entry
@@ -0,0 +1,89 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.classes.loaders import BaseLoader
+from src.config.config import get_logger, prefetch_max_workers
+
+LoaderFactory = Callable[[], BaseLoader]
+
+SOURCE_LOADERS: Dict[str, List[LoaderFactory]] = {}
+"""Loader factories for each service's source data, keyed by service name."""
+
+
+def register_source_loader(
+    service_name: str,
+) -> Callable[[LoaderFactory], LoaderFactory]:
+    """
+    Decorator registering a zero-argument function that builds one of a service's loaders,
+    so the prefetch stage can fetch the service's source data before the service runs.
+    The service should build its loader through the same function so both use the same
+    cache entry.
+
+    Args:
+        service_name (str): The name of the service function that uses the loader.
+    """
+
+    def decorator(factory: LoaderFactory) -> LoaderFactory:
+        SOURCE_LOADERS.setdefault(service_name, []).append(factory)
+        return factory
+
+    return decorator
+
+
+def prefetch_sources(
+    service_names: Optional[Iterable[str]] = None,
+    max_workers: int = prefetch_max_workers,
+) -> Dict[str, Exception]:
+    """
+    Fetch the source data of the given services into the source cache concurrently.
+
+    Failures are logged and returned rather than raised: a service whose data could not be
+    prefetched fetches it again when it runs, and surfaces the error there.
+
+    Args:
+        service_names (Iterable[str]): The services to prefetch for. Defaults to all registered services.
+        max_workers (int): The number of sources fetched at the same time.
+
+    Returns:
+        Dict[str, Exception]: The errors raised while fetching, keyed by loader name.
+    """
+    pipeline_logger = get_logger("pipeline")
+    performance_logger = get_logger("performance")
+
+    if service_names is None:
+        service_names = list(SOURCE_LOADERS)
+
+    loaders: Dict[str, BaseLoader] = {}
+    for service_name in service_names:
+        for factory in SOURCE_LOADERS.get(service_name, []):
+            loader = factory()
+            # Services sharing a source only need it fetched once
+            loaders.setdefault(loader.table_name, loader)
+
+    if max_workers < 1 or not loaders:
+        return {}
+
+    pipeline_logger.info(
+        f"Prefetching {len(loaders)} sources with {max_workers} workers"
+    )
+    start_time = time.time()
+    errors: Dict[str, Exception] = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(loader.prefetch): loader for loader in loaders.values()
+        }
+        for future in as_completed(futures):
+            loader = futures[future]
+            try:
+                future.result()
+                pipeline_logger.info(f"Prefetched {loader.name}")
+            except Exception as e:
+                pipeline_logger.warning(f"Failed to prefetch {loader.name}: {e}")
+                errors[loader.name] = e
+
+    performance_logger.info(
+        f"Prefetched {len(loaders) - len(errors)}/{len(loaders)} sources in {time.time() - start_time:.2f}s"
+    )
+    return errors
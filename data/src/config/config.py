@@ -3,9 +3,22 @@ import threading
 from contextlib import contextmanager
 from pathlib import Path
 
-FORCE_RELOAD = True
-""" During the data load, whether to query the various GIS API services for the data to load. If True, will query the
-API services and report on data differences.  If false will read the cached data."""
+FORCE_RELOAD = False
+""" During the data load, whether to query the various GIS API services for all data regardless of the source cache.
+If False, cached source data is reused until its time-to-live (see SOURCE_CACHE_TTL_HOURS) runs out."""
+
+DEFAULT_SOURCE_CACHE_TTL_HOURS: float = 20
+""" How long cached source data is reused before it is fetched again, for sources not listed in
+SOURCE_CACHE_TTL_HOURS. Just under a day, so that daily runs refetch volatile sources like violations and crimes. """
+
+SOURCE_CACHE_TTL_HOURS: dict[str, float] = {
+    "council_districts": 24 * 7,
+    "neighborhoods": 24 * 7,
+    "census_bgs": 24 * 7,
+    "park_priority_areas_-_philadelphia": 24 * 7,
+}
+""" Per-source overrides of DEFAULT_SOURCE_CACHE_TTL_HOURS, keyed by loader table name, for sources that change
+rarely. """
 
 USE_CRS = "EPSG:2272"
 """ the standard geospatial code for Pennsylvania South (ftUS) """
@@ -16,6 +29,47 @@ ROOT_DIRECTORY = Path(__file__).resolve().parent.parent
 CACHE_FRACTION = 0.05
 """The fraction used to cache portions of the pipeline's transformed data in each step of the pipeline."""
 
+max_service_workers: int = 4
+""" The number of pipeline services that may run at the same time. Services only run concurrently when the columns
+they reference and add (per their docstrings) don't overlap. Set to 1 to run services one at a time in list order. """
+
+prefetch_max_workers: int = 8
+""" The number of source datasets fetched at the same time during the prefetch stage, before any service runs.
+Set to 0 to skip the prefetch stage and let each service fetch its own data when it runs. """
+
+http_max_connections_per_host: int = 10
+""" The size of the keep-alive connection pool kept for each host by the shared HTTP session (see
+src/classes/http_client.py), and the number of requests sent to a host at the same time: threads past the limit
+wait for a free connection. """
+
+HTTP_HOST_CONNECTION_LIMITS: dict[str, int] = {
+    "phl.carto.com": 16,
+    "services.arcgis.com": 4,
+    "services2.arcgis.com": 4,
+}
+""" Per-host overrides of http_max_connections_per_host: raised for hosts that the loaders fetch from with many threads,
+lowered for hosted Esri services, which throttle clients that send many requests at once. """
+
+esri_max_workers: int = 8
+""" The number of Esri query pages fetched at the same time, across all the layers of a loader. The number of requests
+in flight to each host is further capped by HTTP_HOST_CONNECTION_LIMITS. """
+
+http_max_retries: int = 5
+""" How many times a failed request (connection error, 429 or 5xx response) is retried before giving up. """
+
+http_backoff_factor: float = 1.0
+""" The base of the exponential backoff between retries: the n-th retry waits http_backoff_factor * 2 ** (n - 1)
+seconds, or as long as the server's Retry-After header asks. """
+
+http_timeout: tuple[float, float] = (10, 300)
+""" The (connect, read) timeouts in seconds for requests sent through the shared HTTP session. """
+
+kde_backend: str = "awkde"
+""" How the KDE services (gun crimes, drug crimes, L&I complaints) estimate density on the raster grid: "awkde"
+evaluates awkde's adaptive GaussianKDE at every grid point, "binned" bins the points onto the grid and convolves them
+with the same adaptive kernels through FFTs (see src/classes/binned_kde.py), which ranks parcels almost identically in
+seconds instead of minutes. """
+
 log_level: int = logging.WARN
 """ overall log level for the project """
 
@@ -0,0 +1,13 @@
+import json
+import os
+
+directory = os.path.dirname(os.path.abspath(__file__))
+owner_patterns_file_path = os.path.join(directory, "owner_patterns.json")
+
+with open(owner_patterns_file_path) as f:
+    OWNER_PATTERNS = json.load(f)
+"""
+Owner types and the patterns that identify them, in order of precedence. Each pattern has a
+name and maps one or more columns to a lowercase substring that must appear in that column;
+a pattern over several columns matches only when all of them do.
+"""
@@ -3,10 +3,28 @@ from typing import Tuple
 import geopandas as gpd
 import pandas as pd
 
+from src.classes.decision_table import DecisionTable, Rule, flag, numeric
 from src.metadata.metadata_utils import current_metadata, provide_metadata
 from src.validation.access_process import AccessProcessOutputValidator
 from src.validation.base import ValidationResult, validate_output
 
+ACCESS_PROCESSES = DecisionTable(
+    rules=[
+        # Non-vacant properties have no access process
+        Rule(lambda p: ~p["vacant"], pd.NA),
+        Rule(
+            lambda p: p["city_owner_agency"] == "Land Bank (PHDC)",
+            "Go through Land Bank",
+        ),
+        Rule(lambda p: p["city_owner_agency"] == "PRA", "Do Nothing"),
+        Rule(lambda p: p["market_value_over_1000"], "Private Land Use Agreement"),
+    ],
+    default="Buy Property",
+)
+"""
+Access processes from the decision points computed in access_process, in order of precedence.
+"""
+
 
 @validate_output(AccessProcessOutputValidator)
 @provide_metadata(current_metadata=current_metadata)
@@ -38,33 +56,20 @@ def access_process(
     Side Effects:
         Prints the distribution of the "access_process" column.
     """
-    access_processes = []
-
-    for _, row in dataset.iterrows():
-        # If property is not vacant, set access_process to NA
-        if not row.get("vacant", False):
-            access_processes.append(pd.NA)
-            continue
-
-        # Decision Points
-        city_owner_agency = row["city_owner_agency"]
-        market_value_over_1000 = (
-            row["market_value"] and float(row["market_value"]) > 1000
-        )
-
-        # Simplified decision logic
-        if city_owner_agency == "Land Bank (PHDC)":
-            access_process = "Go through Land Bank"
-        elif city_owner_agency == "PRA":
-            access_process = "Do Nothing"
-        else:
-            if market_value_over_1000:
-                access_process = "Private Land Use Agreement"
-            else:
-                access_process = "Buy Property"
-
-        access_processes.append(access_process)
-
-    dataset["access_process"] = access_processes
+    vacant = (
+        flag(dataset["vacant"])
+        if "vacant" in dataset.columns
+        else pd.Series(False, index=dataset.index)
+    )
+    decision_points = pd.DataFrame(
+        {
+            "vacant": vacant,
+            "city_owner_agency": dataset["city_owner_agency"],
+            "market_value_over_1000": numeric(dataset["market_value"]) > 1000,
+        },
+        index=dataset.index,
+    )
+
+    dataset["access_process"] = ACCESS_PROCESSES.evaluate(decision_points)
 
     return dataset, ValidationResult(True)
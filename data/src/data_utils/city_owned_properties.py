@@ -10,12 +10,55 @@ from src.validation.city_owned_properties import (
     CityOwnedPropertiesOutputValidator,
 )
 
+from ..classes.address_index import AddressIndex
 from ..classes.loaders import EsriLoader
+from ..classes.source_prefetch import register_source_loader
 from ..constants.services import CITY_OWNED_PROPERTIES_TO_LOAD
 from ..utilities import opa_join
 
 logger = logging.getLogger(__name__)
 
+CITY_OWNER_NAMES = [
+    "CITY OF PHILA",
+    "CITY OF PHILADELPHIA",
+    "PHILADELPHIA HOUSING",
+    "REDEVELOPMENT AUTHORITY",
+]
+
+# Owners whose name identifies the agency
+OWNER_AGENCIES = {
+    "PHILADELPHIA HOUSING AUTH": "PHA",
+    "PHILADELPHIA LAND BANK": "Land Bank (PHDC)",
+    "REDEVELOPMENT AUTHORITY": "PRA",
+    "PHILA REDEVELOPMENT AUTH": "PRA",
+}
+
+# Mailing addresses of city offices, matched against standardized_mailing_address
+CITY_ADDRESSES = [
+    "municipal services bldg",
+    "1234 market st",
+    "office of general counsel",
+    "1401 john f kennedy blvd",
+    "1600 arch st",
+]
+
+# Mailing addresses that identify the agency, taking precedence over the owner name
+AGENCY_ADDRESSES = {
+    "12 s 23rd st": "PHA",  # Philadelphia Housing Authority
+    "440 n broad st": "School District of Philadelphia",
+}
+
+
+@register_source_loader("city_owned_properties")
+def city_owned_properties_loader() -> EsriLoader:
+    return EsriLoader(
+        name="City Owned Properties",
+        esri_urls=CITY_OWNED_PROPERTIES_TO_LOAD,
+        cols=["OPABRT", "AGENCY", "SIDEYARDELIGIBLE"],
+        opa_col="opabrt",
+        validator=CityOwnedPropertiesInputValidator(),
+    )
+
 
 @validate_output(CityOwnedPropertiesOutputValidator)
 @provide_metadata(current_metadata=current_metadata)
@@ -40,7 +83,7 @@ def city_owned_properties(
         side_yard_eligible (bool): Indicates if the property is eligible for the side yard program.
 
     Columns referenced:
-        opa_id, owner_1, owner2
+        opa_id, owner_1, owner_2, standardized_mailing_address
 
     Tagline:
         Categorizes City Owned Properties
@@ -50,13 +93,7 @@ def city_owned_properties(
 
     """
 
-    loader = EsriLoader(
-        name="City Owned Properties",
-        esri_urls=CITY_OWNED_PROPERTIES_TO_LOAD,
-        cols=["OPABRT", "AGENCY", "SIDEYARDELIGIBLE"],
-        opa_col="opabrt",
-        validator=CityOwnedPropertiesInputValidator(),
-    )
+    loader = city_owned_properties_loader()
 
     city_owned_properties, input_validation = loader.load_or_fetch()
 
@@ -83,37 +120,12 @@ def city_owned_properties(
     }
     merged_gdf.rename(columns=rename_columns, inplace=True)
 
+    addresses = AddressIndex(merged_gdf["standardized_mailing_address"])
+
     # Include additional properties as city-owned based on owner names and addresses
     # Add properties with specific owner names and addresses to city-owned category
-    include_mask = (
-        merged_gdf["owner_1"].isin(["CITY OF PHILA", "CITY OF PHILADELPHIA"])
-        | merged_gdf["owner_1"].isin(["PHILADELPHIA HOUSING"])
-        | merged_gdf["owner_1"].isin(["REDEVELOPMENT AUTHORITY"])
-        | merged_gdf["standardized_mailing_address"].str.contains(
-            "municipal services bldg", case=False, na=False
-        )
-        | merged_gdf["standardized_mailing_address"].str.contains(
-            "1234 market st", case=False, na=False
-        )
-        | merged_gdf["standardized_mailing_address"].str.contains(
-            "office of general counsel", case=False, na=False
-        )
-        | merged_gdf["standardized_mailing_address"].str.contains(
-            "1401 john f. kennedy blvd", case=False, na=False
-        )
-        | merged_gdf["standardized_mailing_address"].str.contains(
-            "1600 arch st", case=False, na=False
-        )
-        | merged_gdf["standardized_mailing_address"].str.contains(
-            "12 s 23rd st",
-            case=False,
-            na=False,  # Philadelphia Housing Authority
-        )
-        | merged_gdf["standardized_mailing_address"].str.contains(
-            "440 n broad st",
-            case=False,
-            na=False,  # school district of philadelphia
-        )
+    include_mask = merged_gdf["owner_1"].isin(CITY_OWNER_NAMES) | addresses.matches(
+        CITY_ADDRESSES + list(AGENCY_ADDRESSES)
     )
 
     # Set city_owner_agency for included properties that don't already have it
@@ -121,24 +133,8 @@ def city_owned_properties(
         include_mask & merged_gdf["city_owner_agency"].isna(), "city_owner_agency"
     ] = "City of Philadelphia"
 
-    merged_gdf.loc[
-        merged_gdf["owner_1"].isin(
-            [
-                "PHILADELPHIA HOUSING AUTH",
-                "PHILADELPHIA LAND BANK",
-                "REDEVELOPMENT AUTHORITY",
-                "PHILA REDEVELOPMENT AUTH",
-            ]
-        ),
-        "city_owner_agency",
-    ] = merged_gdf["owner_1"].replace(
-        {
-            "PHILADELPHIA HOUSING AUTH": "PHA",
-            "PHILADELPHIA LAND BANK": "Land Bank (PHDC)",
-            "REDEVELOPMENT AUTHORITY": "PRA",
-            "PHILA REDEVELOPMENT AUTH": "PRA",
-        }
-    )
+    owner_agencies = merged_gdf["owner_1"].map(OWNER_AGENCIES)
+    merged_gdf.loc[owner_agencies.notna(), "city_owner_agency"] = owner_agencies
 
     merged_gdf.loc[
         (merged_gdf["owner_1"] == "CITY OF PHILA")
@@ -153,19 +149,8 @@ def city_owned_properties(
     ] = "City of Philadelphia"
 
     # Assign specific agencies based on addresses
-    merged_gdf.loc[
-        merged_gdf["standardized_mailing_address"].str.contains(
-            "12 s 23rd st", case=False, na=False
-        ),
-        "city_owner_agency",
-    ] = "PHA"
-
-    merged_gdf.loc[
-        merged_gdf["standardized_mailing_address"].str.contains(
-            "440 n broad st", case=False, na=False
-        ),
-        "city_owner_agency",
-    ] = "School District of Philadelphia"
+    address_agencies = addresses.lookup(AGENCY_ADDRESSES)
+    merged_gdf.loc[address_agencies.notna(), "city_owner_agency"] = address_agencies
 
     merged_gdf.loc[:, "side_yard_eligible"] = (
         merged_gdf["side_yard_eligible"].map({"Yes": True, "No": False}).fillna(False)
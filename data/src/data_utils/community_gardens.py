@@ -11,10 +11,21 @@ from src.validation.community_gardens import (
 )
 
 from ..classes.loaders import EsriLoader
+from ..classes.source_prefetch import register_source_loader
 from ..constants.services import COMMUNITY_GARDENS_TO_LOAD
 from ..utilities import spatial_join
 
 
+@register_source_loader("community_gardens")
+def community_gardens_loader() -> EsriLoader:
+    return EsriLoader(
+        name="Community Gardens",
+        esri_urls=COMMUNITY_GARDENS_TO_LOAD,
+        cols=["site_name"],
+        validator=CommunityGardensInputValidator(),
+    )
+
+
 @validate_output(CommunityGardensOutputValidator)
 @provide_metadata(current_metadata=current_metadata)
 def community_gardens(
@@ -39,18 +50,13 @@ def community_gardens(
         vacant: Updated to False for parcels containing community gardens.
 
     Columns referenced:
-        opa_id, vacant
+        opa_id, vacant, geometry
 
     Source:
         https://services2.arcgis.com/qjOOiLCYeUtwT7x7/arcgis/rest/services/PHS_NGT_Supported_Current_view/FeatureServer/0/
     """
 
-    loader = EsriLoader(
-        name="Community Gardens",
-        esri_urls=COMMUNITY_GARDENS_TO_LOAD,
-        cols=["site_name"],
-        validator=CommunityGardensInputValidator(),
-    )
+    loader = community_gardens_loader()
 
     community_gardens, input_validation = loader.load_or_fetch()
 
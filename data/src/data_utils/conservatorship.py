@@ -1,30 +1,71 @@
 import datetime
-from typing import Tuple
+from typing import Optional, Tuple
 
 import geopandas as gpd
-import pytz
-from dateutil.parser import parse
+import pandas as pd
 
+from src.classes.decision_table import DecisionTable, Rule, flag, numeric
 from src.metadata.metadata_utils import current_metadata, provide_metadata
 from src.validation.base import ValidationResult, validate_output
 from src.validation.conservatorship import ConservatorshipOutputValidator
 
-est = pytz.timezone("US/Eastern")
-six_months_ago = (datetime.datetime.now() - datetime.timedelta(days=180)).astimezone(
-    est
+est = "US/Eastern"
+
+CONSERVATORSHIP = DecisionTable(
+    rules=[
+        Rule(
+            lambda p: p["land_bank"]
+            | (~p["sold_over_6_months_ago"] & p["market_value_over_1000"]),
+            False,
+        ),
+        Rule(
+            lambda p: p["violations_exist"]
+            & ~p["sheriff_sale"]
+            & p["sold_over_6_months_ago"],
+            True,
+        ),
+    ],
+    default=False,
+    dtype=bool,
 )
 
 
+def eastern_dates(dates: pd.Series) -> pd.Series:
+    """
+    A date column as timezone-aware datetimes in US/Eastern, with values that aren't dates
+    as NaT. Naive datetimes are taken to be in US/Eastern already.
+    """
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates, errors="coerce", utc=True)
+    if dates.dt.tz is None:
+        return dates.dt.tz_localize(est, ambiguous="NaT", nonexistent="NaT")
+    return dates.dt.tz_convert(est)
+
+
+def six_months_before(run_date: Optional[datetime.datetime] = None) -> pd.Timestamp:
+    """
+    The cutoff for sales counting as six months old: 180 days before the run date, or
+    before now if no run date is given. A naive run date is taken to be in US/Eastern.
+    """
+    run_date = pd.Timestamp.now(tz=est) if run_date is None else pd.Timestamp(run_date)
+    if run_date.tzinfo is None:
+        run_date = run_date.tz_localize(est)
+    return run_date.tz_convert(est) - pd.Timedelta(days=180)
+
+
 @validate_output(ConservatorshipOutputValidator)
 @provide_metadata(current_metadata=current_metadata)
 def conservatorship(
     input_gdf: gpd.GeoDataFrame,
+    run_date: Optional[datetime.datetime] = None,
 ) -> Tuple[gpd.GeoDataFrame, ValidationResult]:
     """
     Determines conservatorship eligibility for properties in a GeoDataFrame.
 
     Args:
         input_gdf (GeoDataFrame): A GeoDataFrame containing property data in a GeoDataFrame (`gdf`).
+        run_date (datetime): The date the six months since the last sale are counted back
+            from. Defaults to now; pass a fixed date to reproduce an earlier run.
 
     Columns Added:
         conservatorship (bool): Indicates whether each property qualifies for conservatorship (True or False).
@@ -39,33 +80,17 @@ def conservatorship(
         GeoDataFrame: The input GeoDataFrame with an added "conservatorship" column indicating
         whether each property qualifies for conservatorship (True or False).
     """
-    conservatorships = []
-
-    for idx, row in input_gdf.iterrows():
-        city_owner_agency = row["city_owner_agency"]
-        sheriff_sale = row["sheriff_sale"]  # Now boolean
-        market_value_over_1000 = (
-            row["market_value"] and float(row["market_value"]) > 1000
-        )
-        violations_exist = float(row["all_violations_past_year"]) > 0
-
-        try:
-            sale_date = parse(row["sale_date"]).astimezone(est)
-            sale_date_6_months_ago = sale_date <= six_months_ago
-        except (TypeError, ValueError):
-            sale_date_6_months_ago = False
-
-        # Simplified decision logic
-        if city_owner_agency == "Land Bank (PHDC)" or (
-            not sale_date_6_months_ago and market_value_over_1000
-        ):
-            conservatorship = False
-        elif violations_exist and not sheriff_sale and sale_date_6_months_ago:
-            conservatorship = True
-        else:
-            conservatorship = False
-
-        conservatorships.append(conservatorship)
-
-    input_gdf["conservatorship"] = conservatorships
+    properties = pd.DataFrame(
+        {
+            "land_bank": input_gdf["city_owner_agency"] == "Land Bank (PHDC)",
+            "sheriff_sale": flag(input_gdf["sheriff_sale"]),
+            "market_value_over_1000": numeric(input_gdf["market_value"]) > 1000,
+            "violations_exist": numeric(input_gdf["all_violations_past_year"]) > 0,
+            "sold_over_6_months_ago": eastern_dates(input_gdf["sale_date"])
+            <= six_months_before(run_date),
+        },
+        index=input_gdf.index,
+    )
+
+    input_gdf["conservatorship"] = CONSERVATORSHIP.evaluate(properties)
     return input_gdf, ValidationResult(True)
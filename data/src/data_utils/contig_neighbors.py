@@ -1,17 +1,23 @@
-import warnings
 from typing import Tuple
 
 import geopandas as gpd
-import networkx as nx
 import numpy as np
-from libpysal.weights import Queen
+from scipy.sparse.csgraph import connected_components
 
+from src.classes.file_manager import FileManager, LoadType
+from src.classes.parcel_adjacency import ParcelAdjacency
+from src.config.config import get_logger
 from src.metadata.metadata_utils import current_metadata, provide_metadata
 from src.validation.base import ValidationResult, validate_output
 from src.validation.contig_neighbors import ContigNeighborsOutputValidator
 
 from ..utilities import opa_join
 
+# The contiguity graph of all the parcels, kept between runs
+PARCEL_ADJACENCY_PATH = FileManager().get_file_path(
+    "parcel_adjacency.npz", LoadType.PIPELINE_CACHE
+)
+
 
 @validate_output(ContigNeighborsOutputValidator)
 @provide_metadata(current_metadata=current_metadata)
@@ -35,7 +41,7 @@ def contig_neighbors(
         n_contiguous (int): The number of contiguous vacant neighbors for each property.
 
     Columns referenced:
-        opa_id, vacant
+        opa_id, vacant, geometry
     """
     print(f"[DEBUG] contig_neighbors: Starting with {len(input_gdf)} properties")
     print(f"[DEBUG] contig_neighbors: Vacant properties: {input_gdf['vacant'].sum()}")
@@ -76,77 +82,28 @@ def contig_neighbors(
         print(f"[DEBUG] contig_neighbors: Return length: {len(result)}")
         return result
 
-    with warnings.catch_warnings():
-        warnings.filterwarnings("ignore", category=FutureWarning)
-        warnings.filterwarnings(
-            "ignore",
-            category=UserWarning,
-            message="The weights matrix is not fully connected",
-        )
-
-        # Create a spatial weights matrix for vacant parcels
-        w = Queen.from_dataframe(vacant_parcels)
-
-    # Convert the spatial weights matrix to a NetworkX graph
-    g = w.to_networkx()
-
-    # Calculate the number of contiguous vacant properties for each vacant parcel
-    n_contiguous = {
-        node: len(nx.node_connected_component(g, node)) - 1 for node in g.nodes
-    }
-
-    # Debug: Check what values we're getting
-    print(
-        f"[DEBUG] contig_neighbors: n_contiguous values calculated: {len(n_contiguous)}"
-    )
-    if len(n_contiguous) > 0:
-        sample_values = list(n_contiguous.values())[:10]
-        print(f"[DEBUG] contig_neighbors: Sample n_contiguous values: {sample_values}")
-        print(
-            f"[DEBUG] contig_neighbors: n_contiguous value types: {[type(v) for v in sample_values]}"
-        )
+    # The graph of all the parcels is refreshed from the last run's for the parcels whose
+    # geometry changed, then cut down to the vacant ones
+    parcels = input_gdf.loc[
+        input_gdf.geometry.type.isin(["Polygon", "MultiPolygon"]),
+        ["opa_id", "geometry"],
+    ]
+    adjacency = ParcelAdjacency.refresh(parcels, PARCEL_ADJACENCY_PATH)
 
-    # Debug: Check the mapping issue
-    print(
-        f"[DEBUG] contig_neighbors: vacant_parcels index type: {type(vacant_parcels.index)}"
-    )
-    print(
-        f"[DEBUG] contig_neighbors: vacant_parcels index sample: {list(vacant_parcels.index[:5])}"
-    )
-    print(
-        f"[DEBUG] contig_neighbors: n_contiguous keys type: {type(list(n_contiguous.keys())[0])}"
-    )
-    print(
-        f"[DEBUG] contig_neighbors: n_contiguous keys sample: {list(n_contiguous.keys())[:5]}"
+    # Count the contiguous vacant neighbors of each vacant parcel: the other parcels of
+    # its connected component of touching vacant parcels
+    vacant_parcels = vacant_parcels.reset_index(drop=True)
+    _, components = connected_components(
+        adjacency.subgraph(vacant_parcels["opa_id"]), directed=False
     )
+    component_sizes = np.bincount(components)
+    vacant_parcels["n_contiguous"] = component_sizes[components] - 1
 
-    # Assign the contiguous neighbor count to the filtered vacant parcels
-    vacant_parcels = vacant_parcels.reset_index(
-        drop=True
-    )  # Reset to sequential indices
-    vacant_parcels["n_contiguous"] = vacant_parcels.index.map(n_contiguous)
-
-    # Debug: Check what's in vacant_parcels after assignment
-    print(
-        f"[DEBUG] contig_neighbors: vacant_parcels n_contiguous column: {vacant_parcels['n_contiguous'].dtype}"
-    )
-    print(
-        f"[DEBUG] contig_neighbors: vacant_parcels n_contiguous sample: {vacant_parcels['n_contiguous'].head().tolist()}"
-    )
-    print(
-        f"[DEBUG] contig_neighbors: vacant_parcels n_contiguous null count: {vacant_parcels['n_contiguous'].isna().sum()}"
+    get_logger("pipeline").debug(
+        f"contig_neighbors: {len(component_sizes)} components, "
+        f"largest: {component_sizes.max()}"
     )
 
-    # Debug: Check for boolean values in vacant_parcels
-    bool_mask = vacant_parcels["n_contiguous"].apply(lambda x: isinstance(x, bool))
-    if bool_mask.any():
-        print(
-            f"[DEBUG] contig_neighbors: Found {bool_mask.sum()} boolean values in vacant_parcels!"
-        )
-        print(
-            f"[DEBUG] contig_neighbors: Boolean values: {vacant_parcels.loc[bool_mask, 'n_contiguous'].tolist()}"
-        )
-
     # Debug: Check opa_id matching
     print(
         f"[DEBUG] contig_neighbors: vacant_parcels opa_id sample: {vacant_parcels['opa_id'].head().tolist()}"
@@ -211,16 +168,6 @@ def contig_neighbors(
         f"[DEBUG] contig_neighbors: input_gdf n_contiguous null count: {input_gdf['n_contiguous'].isna().sum()}"
     )
 
-    # Debug: Check for boolean values in input_gdf
-    bool_mask = input_gdf["n_contiguous"].apply(lambda x: isinstance(x, bool))
-    if bool_mask.any():
-        print(
-            f"[DEBUG] contig_neighbors: Found {bool_mask.sum()} boolean values in input_gdf!"
-        )
-        print(
-            f"[DEBUG] contig_neighbors: Boolean values: {input_gdf.loc[bool_mask, 'n_contiguous'].tolist()}"
-        )
-
     # Debug: Check if any non-null values exist
     non_null_mask = input_gdf["n_contiguous"].notna()
     if non_null_mask.any():
@@ -238,18 +185,6 @@ def contig_neighbors(
     # Assign NA for non-vacant properties
     input_gdf.loc[~input_gdf["vacant"], "n_contiguous"] = np.nan
 
-    # Final check: Ensure no boolean values remain
-    final_bool_mask = input_gdf["n_contiguous"].apply(lambda x: isinstance(x, bool))
-    if final_bool_mask.any():
-        print(
-            f"[DEBUG] contig_neighbors: WARNING - Found {final_bool_mask.sum()} boolean values in final result!"
-        )
-        print("[DEBUG] contig_neighbors: Converting boolean values to numeric...")
-        # Convert boolean False to 0, True to 1
-        input_gdf.loc[final_bool_mask, "n_contiguous"] = input_gdf.loc[
-            final_bool_mask, "n_contiguous"
-        ].astype(int)
-
     print("[DEBUG] contig_neighbors: Returning tuple with ValidationResult")
     result = input_gdf, ValidationResult(True)
     print(f"[DEBUG] contig_neighbors: Return type: {type(result)}")
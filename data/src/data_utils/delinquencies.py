@@ -8,10 +8,30 @@ from src.validation.base import ValidationResult, validate_output
 from src.validation.delinquencies import DelinquenciesOutputValidator
 
 from ..classes.loaders import CartoLoader
+from ..classes.source_prefetch import register_source_loader
 from ..constants.services import DELINQUENCIES_QUERY
 from ..utilities import opa_join
 
 
+@register_source_loader("delinquencies")
+def delinquencies_loader() -> CartoLoader:
+    return CartoLoader(
+        name="Property Tax Delinquencies",
+        carto_queries=DELINQUENCIES_QUERY,
+        cols=[
+            "opa_number",
+            "total_due",
+            "is_actionable",
+            "payment_agreement",
+            "num_years_owed",
+            "most_recent_year_owed",
+            "total_assessment",
+            "sheriff_sale",
+        ],
+        opa_col="opa_number",
+    )
+
+
 @validate_output(DelinquenciesOutputValidator)
 @provide_metadata(current_metadata=current_metadata)
 def delinquencies(
@@ -47,21 +67,7 @@ def delinquencies(
         opa_id
     """
 
-    loader = CartoLoader(
-        name="Property Tax Delinquencies",
-        carto_queries=DELINQUENCIES_QUERY,
-        cols=[
-            "opa_number",
-            "total_due",
-            "is_actionable",
-            "payment_agreement",
-            "num_years_owed",
-            "most_recent_year_owed",
-            "total_assessment",
-            "sheriff_sale",
-        ],
-        opa_col="opa_number",
-    )
+    loader = delinquencies_loader()
 
     tax_delinquencies, input_validation = loader.load_or_fetch()
 
@@ -3,16 +3,22 @@ from typing import Tuple
 import geopandas as gpd
 import jenkspy
 import pandas as pd
-import requests
 
 from src.config.config import USE_CRS
 from src.metadata.metadata_utils import current_metadata, provide_metadata
 from src.validation.base import ValidationResult, validate_output
 from src.validation.dev_probability import DevProbabilityOutputValidator
 
+from ..classes import http_client
 from ..classes.loaders import GdfLoader
+from ..classes.source_prefetch import register_source_loader
 from ..constants.services import CENSUS_BGS_URL, PERMITS_QUERY
-from ..utilities import spatial_join
+from ..utilities import spatial_enrich
+
+
+@register_source_loader("dev_probability")
+def census_bgs_loader() -> GdfLoader:
+    return GdfLoader(name="Census BGs", input=CENSUS_BGS_URL)
 
 
 @validate_output(DevProbabilityOutputValidator)
@@ -48,12 +54,14 @@ def dev_probability(
     print("[DEBUG] dev_probability: Starting function")
     print(f"[DEBUG] dev_probability: Input dataset shape: {input_gdf.shape}")
 
-    loader = GdfLoader(name="Census BGs", input=CENSUS_BGS_URL)
+    loader = census_bgs_loader()
     census_bgs_gdf, census_input_validation = loader.load_or_fetch()
     print(f"[DEBUG] dev_probability: Census BGs loaded, shape: {census_bgs_gdf.shape}")
 
     base_url = "https://phl.carto.com/api/v2/sql"
-    response = requests.get(f"{base_url}?q={PERMITS_QUERY}&format=GeoJSON")
+    response = http_client.get(
+        base_url, params={"q": PERMITS_QUERY, "format": "GeoJSON"}
+    )
 
     if response.status_code == 200:
         try:
@@ -133,7 +141,7 @@ def dev_probability(
 
     census_bgs_gdf = census_bgs_gdf[["permit_count", "dev_rank", "geometry"]]
 
-    merged_gdf = spatial_join(input_gdf, census_bgs_gdf)
+    merged_gdf = spatial_enrich(input_gdf, census_bgs_gdf, ["permit_count", "dev_rank"])
     print(
         f"[DEBUG] dev_probability: Final merge completed, output shape: {merged_gdf.shape}"
     )
@@ -144,12 +152,6 @@ def dev_probability(
         f"[DEBUG] dev_probability: Final dev_rank distribution: {merged_gdf['dev_rank'].value_counts().to_dict()}"
     )
 
-    # Deduplicate by OPA ID to keep only the first occurrence
-    merged_gdf = merged_gdf.drop_duplicates(subset=["opa_id"], keep="first")
-    print(
-        f"[DEBUG] dev_probability: After OPA ID deduplication, output shape: {merged_gdf.shape}"
-    )
-
     # Fill null values with appropriate defaults
     merged_gdf["permit_count"] = merged_gdf["permit_count"].fillna(0).astype(int)
     merged_gdf["dev_rank"] = merged_gdf["dev_rank"].fillna("Low")
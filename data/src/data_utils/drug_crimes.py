@@ -2,13 +2,25 @@ from typing import Tuple
 
 import geopandas as gpd
 
-from src.data_utils.kde import apply_kde_to_input
+from src.classes.loaders import CartoLoader
+from src.classes.source_prefetch import register_source_loader
+from src.data_utils.kde import KDELayer, apply_kde_to_input
 from src.metadata.metadata_utils import current_metadata, provide_metadata
 from src.validation.base import ValidationResult, validate_output
 from src.validation.drug_crimes import DrugCrimesOutputValidator
 
 from ..constants.services import DRUGCRIME_SQL_QUERY
 
+DRUG_CRIMES_LAYER = KDELayer("Drug Crimes", DRUGCRIME_SQL_QUERY, batch_size=250000)
+
+
+# Same name and query as the loader apply_kde_to_input builds, so both share a cache entry
+@register_source_loader("drug_crimes")
+def drug_crimes_loader() -> CartoLoader:
+    return CartoLoader(
+        name=DRUG_CRIMES_LAYER.name, carto_queries=DRUG_CRIMES_LAYER.query
+    )
+
 
 @validate_output(DrugCrimesOutputValidator)
 @provide_metadata(current_metadata=current_metadata)
@@ -41,5 +53,8 @@ def drug_crimes(
 
     """
     return apply_kde_to_input(
-        input_gdf, "Drug Crimes", DRUGCRIME_SQL_QUERY, batch_size=250000
+        input_gdf,
+        DRUG_CRIMES_LAYER.name,
+        DRUG_CRIMES_LAYER.query,
+        batch_size=DRUG_CRIMES_LAYER.batch_size,
     )
@@ -2,13 +2,23 @@ from typing import Tuple
 
 import geopandas as gpd
 
-from src.data_utils.kde import apply_kde_to_input
+from src.classes.loaders import CartoLoader
+from src.classes.source_prefetch import register_source_loader
+from src.data_utils.kde import KDELayer, apply_kde_to_input
 from src.metadata.metadata_utils import current_metadata, provide_metadata
 from src.validation.base import ValidationResult, validate_output
 from src.validation.gun_crimes import GunCrimesOutputValidator
 
 from ..constants.services import GUNCRIME_SQL_QUERY
 
+GUN_CRIMES_LAYER = KDELayer("Gun Crimes", GUNCRIME_SQL_QUERY, batch_size=250000)
+
+
+# Same name and query as the loader apply_kde_to_input builds, so both share a cache entry
+@register_source_loader("gun_crimes")
+def gun_crimes_loader() -> CartoLoader:
+    return CartoLoader(name=GUN_CRIMES_LAYER.name, carto_queries=GUN_CRIMES_LAYER.query)
+
 
 @validate_output(GunCrimesOutputValidator)
 @provide_metadata(current_metadata=current_metadata)
@@ -40,5 +50,8 @@ def gun_crimes(
         https://phl.carto.com/api/v2/sql
     """
     return apply_kde_to_input(
-        input_gdf, "Gun Crimes", GUNCRIME_SQL_QUERY, batch_size=250000
+        input_gdf,
+        GUN_CRIMES_LAYER.name,
+        GUN_CRIMES_LAYER.query,
+        batch_size=GUN_CRIMES_LAYER.batch_size,
     )
@@ -11,12 +11,23 @@ from src.validation.imm_dang_buildings import (
 )
 
 from ..classes.loaders import CartoLoader
+from ..classes.source_prefetch import register_source_loader
 from ..constants.services import IMMINENT_DANGER_BUILDINGS_QUERY
 from ..utilities import opa_join
 
 logger = logging.getLogger(__name__)
 
 
+@register_source_loader("imm_dang_buildings")
+def imm_dang_buildings_loader() -> CartoLoader:
+    return CartoLoader(
+        name="Imminently Dangerous Buildings",
+        carto_queries=IMMINENT_DANGER_BUILDINGS_QUERY,
+        opa_col="opa_account_num",
+        validator=ImmDangerInputValidator(),
+    )
+
+
 @validate_output(ImmDangerOutputValidator)
 @provide_metadata(current_metadata=current_metadata)
 def imm_dang_buildings(
@@ -46,12 +57,7 @@ def imm_dang_buildings(
         https://phl.carto.com/api/v2/sql
     """
 
-    loader = CartoLoader(
-        name="Imminently Dangerous Buildings",
-        carto_queries=IMMINENT_DANGER_BUILDINGS_QUERY,
-        opa_col="opa_account_num",
-        validator=ImmDangerInputValidator(),
-    )
+    loader = imm_dang_buildings_loader()
 
     imm_dang_buildings, input_validation = loader.load_or_fetch()
 
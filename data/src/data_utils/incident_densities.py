@@ -0,0 +1,66 @@
+from typing import Tuple
+
+import geopandas as gpd
+
+from src.classes.source_prefetch import register_source_loader
+from src.data_utils.drug_crimes import DRUG_CRIMES_LAYER, drug_crimes_loader
+from src.data_utils.gun_crimes import GUN_CRIMES_LAYER, gun_crimes_loader
+from src.data_utils.kde import apply_kde_layers
+from src.data_utils.li_complaints import LI_COMPLAINTS_LAYER, li_complaints_loader
+from src.metadata.metadata_utils import current_metadata, provide_metadata
+from src.validation.base import ValidationResult, validate_output
+from src.validation.incident_densities import IncidentDensitiesOutputValidator
+
+INCIDENT_LAYERS = [LI_COMPLAINTS_LAYER, GUN_CRIMES_LAYER, DRUG_CRIMES_LAYER]
+
+for loader_factory in (li_complaints_loader, gun_crimes_loader, drug_crimes_loader):
+    register_source_loader("incident_densities")(loader_factory)
+
+
+@validate_output(IncidentDensitiesOutputValidator)
+@provide_metadata(current_metadata=current_metadata)
+def incident_densities(
+    input_gdf: gpd.GeoDataFrame,
+) -> Tuple[gpd.GeoDataFrame, ValidationResult]:
+    """
+    Applies kernel density estimation (KDE) analysis for L&I complaints, gun crimes and drug
+    crimes to the input GeoDataFrame in one batch, sharing the grid and the sampling of the
+    property centroids between the three layers. Unlike running li_complaints, gun_crimes
+    and drug_crimes separately, which each lay their grid over the bounding box of their own
+    incidents, all three densities are evaluated on one grid over the bounding box of the
+    union of the incidents, so they can differ slightly from the standalone services.
+
+    Args:
+        input_gdf (GeoDataFrame): The GeoDataFrame containing property data.
+
+    Returns:
+        GeoDataFrame: The input GeoDataFrame with KDE analysis results for each layer.
+
+    Tagline:
+        Analyzes complaint and crime density
+
+    Columns added:
+        l_and_i_complaints_density (float): KDE density of complaints.
+        l_and_i_complaints_density_zscore (float): Z-score of complaint density.
+        l_and_i_complaints_density_label (str): Categorized density level.
+        l_and_i_complaints_density_percentile (float): Percentile rank of density.
+        gun_crimes_density (float): KDE density of gun crimes.
+        gun_crimes_density_zscore (float): Z-score of gun crime density.
+        gun_crimes_density_label (str): Categorized density level.
+        gun_crimes_density_percentile (float): Percentile rank of density.
+        drug_crimes_density (float): KDE density of drug crimes.
+        drug_crimes_density_zscore (float): Z-score of drug crime density.
+        drug_crimes_density_label (str): Categorized density level.
+        drug_crimes_density_percentile (float): Percentile rank of density.
+
+    Columns referenced:
+        geometry
+
+    Source:
+        https://phl.carto.com/api/v2/sql
+    """
+    input_gdf, input_validations = apply_kde_layers(input_gdf, INCIDENT_LAYERS)
+
+    errors = [error for validation in input_validations for error in validation.errors]
+    input_validation = ValidationResult(success=all(input_validations), errors=errors)
+    return input_gdf, input_validation
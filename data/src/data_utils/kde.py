@@ -1,20 +1,26 @@
 import functools
+import multiprocessing
 import os
+import tempfile
 import time
 from concurrent.futures import ProcessPoolExecutor, as_completed
-from typing import Tuple
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
 
 import geopandas as gpd
-import mapclassify
 import numpy as np
 import psutil
 import rasterio
 from awkde.awkde import GaussianKDE
+from rasterio.features import geometry_mask
 from rasterio.transform import Affine
 from tqdm import tqdm
 
+from src.classes.binned_kde import BinnedKDE
 from src.classes.file_manager import FileManager, LoadType
-from src.config.config import USE_CRS, get_logger
+from src.config.config import USE_CRS, get_logger, kde_backend
+from src.constants.city_limits import PHL_GEOMETRY
+from src.utilities import PERCENTILE_LABELS, percentile_ranks
 from src.validation.base import ValidationResult
 
 from ..classes.loaders import CartoLoader
@@ -105,65 +111,175 @@ def profile_section(section_name: str):
 resolution = 1320  # 0.25 miles (in feet, since the CRS is 2272)
 batch_size = 50000
 
+# The kernel width relative to the spread of the points, and how strongly the kernels
+# adapt to the local density (see GaussianKDE and BinnedKDE)
+kde_glob_bw = 0.1
+kde_alpha = 0.999
+
 file_manager = FileManager()
 
 
-def kde_predict_chunk(kde: GaussianKDE, chunk: np.ndarray) -> np.ndarray:
+@dataclass(frozen=True)
+class KDELayer:
+    """
+    An incident dataset whose density is estimated and attached to the properties.
+
+    Attributes:
+        name (str): Name of the dataset, e.g. "Gun Crimes". The density columns are named
+            after it.
+        query (str): SQL query to fetch the incidents from Carto.
+        batch_size (int): The number of grid points evaluated per task by awkde.
+    """
+
+    name: str
+    query: str
+    batch_size: int = batch_size
+
+    @property
+    def density_column(self) -> str:
+        return f"{self.name.lower().replace(' ', '_')}_density"
+
+
+# Prediction workers are started by a server process rather than forked from the
+# pipeline, whose ServiceScheduler threads may hold locks that a fork would copy
+predict_pool_context = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# The state of a prediction worker process, set once by init_predict_worker
+_worker_model = None
+_worker_grid: np.ndarray | None = None
+_worker_output: np.ndarray | None = None
+
+
+def init_predict_worker(model, grid_path: str, output_path: str, n_points: int) -> None:
+    """
+    Pool initializer: keeps the model, which is pickled once per worker rather than once
+    per chunk, and maps the shared grid and output arrays into the worker.
+    """
+    global _worker_model, _worker_grid, _worker_output
+    _worker_model = model
+    _worker_grid = np.memmap(grid_path, dtype=float, mode="r", shape=(n_points, 2))
+    _worker_output = np.memmap(output_path, dtype=float, mode="r+", shape=(n_points,))
+
+
+def kde_predict_chunk(start: int, stop: int) -> int:
     """
-    Helper function to predict KDE for a chunk of grid points.
+    Predicts the KDE for a slice of the shared grid, writing the values straight into the
+    shared output array.
 
     Args:
-        kde (GaussianKDE): The KDE model to use for prediction.
-        chunk (np.ndarray): A chunk of grid points for prediction.
+        start (int): The first grid point of the slice.
+        stop (int): The grid point after the last one of the slice.
 
     Returns:
-        np.ndarray: Predicted KDE values for the chunk.
+        int: The number of grid points predicted.
     """
-    return kde.predict(chunk)
+    _worker_output[start:stop] = _worker_model.predict(_worker_grid[start:stop])
+    return stop - start
 
 
-@timer
-def generic_kde(
-    name: str, query: str, resolution: int = resolution, batch_size: int = batch_size
-) -> Tuple[str, np.ndarray]:
+def predict_in_pool(
+    model, grid_points: np.ndarray, batch_size: int = batch_size
+) -> np.ndarray:
     """
-    Generates a raster file and grid points from kernel density estimation (KDE) for a dataset.
+    Evaluates a fitted model at every grid point in batches spread over a process pool.
+    The grid and the output live in memory-mapped files shared with the workers, and the
+    model is sent to each worker once by the pool initializer, so a task is only a pair of
+    indices and nothing but the index range travels back.
 
     Args:
-        name (str): Name of the dataset being processed.
-        query (str): SQL query to fetch data.
-        resolution (int): Resolution for the grid. Defaults to 1320.
-        batch_size (int): Batch size for processing grid points. Defaults to 100000.
+        model: A picklable fitted model with a predict method, e.g. a GaussianKDE.
+        grid_points (np.ndarray): The grid points to evaluate, of shape (m, 2).
+        batch_size (int): The number of grid points evaluated per task.
 
     Returns:
-        Tuple[str, np.ndarray]: The raster filename and the array of input points.
+        np.ndarray: The prediction at each grid point.
     """
-    performance_logger.info(f"Initializing GeoDataFrame for {name}")
+    n_points = len(grid_points)
+    ranges = [
+        (start, min(start + batch_size, n_points))
+        for start in range(0, n_points, batch_size)
+    ]
+    performance_logger.info(
+        f"Created {len(ranges)} chunks of size {batch_size} (total grid points: {n_points})"
+    )
 
-    # Profile data loading
-    with profile_section("Data Loading"):
-        loader = CartoLoader(name=name, carto_queries=query)
-        gdf, input_validation = loader.load_or_fetch()
+    with tempfile.TemporaryDirectory(prefix="kde_") as directory:
+        grid_path = os.path.join(directory, "grid.dat")
+        output_path = os.path.join(directory, "output.dat")
+
+        grid = np.memmap(grid_path, dtype=float, mode="w+", shape=(n_points, 2))
+        grid[:] = grid_points
+        grid.flush()
+        output = np.memmap(output_path, dtype=float, mode="w+", shape=(n_points,))
+
+        with ProcessPoolExecutor(
+            mp_context=predict_pool_context,
+            initializer=init_predict_worker,
+            initargs=(model, grid_path, output_path, n_points),
+        ) as executor:
+            futures = [executor.submit(kde_predict_chunk, *r) for r in ranges]
+            for future in tqdm(
+                as_completed(futures), total=len(futures), desc="Processing tasks"
+            ):
+                future.result()
 
-    gdf.dropna(subset=["geometry"], inplace=True)
+        z = np.array(output)
+        del grid, output
 
-    # Profile coordinate extraction
-    with profile_section("Coordinate Extraction"):
-        coords = np.array([geom.xy for geom in gdf.geometry])
-        x, y = coords[:, 0, :].flatten(), coords[:, 1, :].flatten()
-        X = np.column_stack((x, y))
+    return z
 
-    # Profile grid generation
-    with profile_section(
-        "Grid Generation (np.linspace + np.meshgrid + np.column_stack)"
-    ):
-        x_grid, y_grid = (
-            np.linspace(x.min(), x.max(), resolution),
-            np.linspace(y.min(), y.max(), resolution),
-        )
-        xx, yy = np.meshgrid(x_grid, y_grid)
-        grid_points = np.column_stack((xx.ravel(), yy.ravel()))
 
+@functools.lru_cache(maxsize=8)
+def city_grid_mask(
+    x0: float, dx: float, y0: float, dy: float, width: int, height: int
+) -> np.ndarray:
+    """
+    Which points of a regular grid lie within the city limits, or within two grid cells of
+    them so that parcels on the edge of the city still sample evaluated points. The city
+    limits are rasterized once per grid and the mask is cached.
+
+    Args:
+        x0 (float): The x coordinate of the first grid column.
+        dx (float): The spacing of the grid columns.
+        y0 (float): The y coordinate of the first grid row.
+        dy (float): The spacing of the grid rows.
+        width (int): The number of grid columns.
+        height (int): The number of grid rows.
+
+    Returns:
+        np.ndarray: A read-only boolean array of shape (height, width).
+    """
+    # Each grid point is the center of its pixel
+    transform = Affine.translation(x0 - dx / 2, y0 - dy / 2) * Affine.scale(dx, dy)
+    mask = geometry_mask(
+        [PHL_GEOMETRY.buffer(2 * max(abs(dx), abs(dy)))],
+        out_shape=(height, width),
+        transform=transform,
+        invert=True,
+        all_touched=True,
+    )
+    mask.setflags(write=False)
+    return mask
+
+
+def awkde_predict(
+    name: str, X: np.ndarray, grid_points: np.ndarray, batch_size: int = batch_size
+) -> np.ndarray:
+    """
+    Fits awkde's adaptive GaussianKDE to the points and evaluates it at every grid point,
+    in batches spread over a process pool (see predict_in_pool).
+
+    Args:
+        name (str): Name of the dataset being processed.
+        X (np.ndarray): The input points, of shape (n, 2).
+        grid_points (np.ndarray): The grid points to evaluate, of shape (m, 2).
+        batch_size (int): The number of grid points evaluated per task.
+
+    Returns:
+        np.ndarray: The density at each grid point.
+    """
     # Profile KDE fitting
     with profile_section("KDE Fitting"):
         performance_logger.info(f"Fitting KDE for {name} data")
@@ -176,7 +292,7 @@ def generic_kde(
         performance_logger.info(f"  Input data has NaN: {np.isnan(X).any()}")
         performance_logger.info(f"  Input data has Inf: {np.isinf(X).any()}")
 
-        kde = GaussianKDE(glob_bw=0.1, alpha=0.999, diag_cov=True)
+        kde = GaussianKDE(glob_bw=kde_glob_bw, alpha=kde_alpha, diag_cov=True)
         kde.fit(X)
 
     performance_logger.info(
@@ -185,159 +301,123 @@ def generic_kde(
 
     # Profile the entire prediction loop
     with profile_section("Entire Prediction Loop"):
-        # Profile chunk creation
-        with profile_section("Chunk Creation"):
-            chunks = [
-                grid_points[i : i + batch_size]
-                for i in range(0, len(grid_points), batch_size)
-            ]
-            performance_logger.info(
-                f"Created {len(chunks)} chunks of size {batch_size} (total grid points: {len(grid_points)})"
-            )
-
-        z = np.zeros(len(grid_points))
-
-        with ProcessPoolExecutor() as executor:
-            futures = {
-                executor.submit(kde_predict_chunk, kde, chunk): i
-                for i, chunk in enumerate(tqdm(chunks, desc="Submitting tasks"))
-            }
+        z = predict_in_pool(kde, grid_points, batch_size)
 
-            for future in tqdm(
-                as_completed(futures), total=len(futures), desc="Processing tasks"
-            ):
-                i = futures[future]
-                z[i * batch_size : (i + 1) * batch_size] = future.result()
+    return z
 
-    zz = z.reshape(xx.shape)
 
-    x_res, y_res = (
-        (x.max() - x.min()) / (resolution - 1),
-        (y.max() - y.min()) / (resolution - 1),
-    )
-    min_x, min_y = x.min(), y.min()
+def estimate_density(
+    name: str,
+    X: np.ndarray,
+    x_grid: np.ndarray,
+    y_grid: np.ndarray,
+    batch_size: int = batch_size,
+) -> np.ndarray:
+    """
+    Estimates the density of the points at the nodes of a regular grid with the configured
+    KDE backend. Only the nodes within or near the city limits are evaluated; the rest of
+    the grid (the rivers, New Jersey, Delaware County) holds no parcels and stays 0.
 
-    transform = Affine.translation(min_x, min_y) * Affine.scale(x_res, y_res)
+    Args:
+        name (str): Name of the dataset being processed.
+        X (np.ndarray): The input points, of shape (n, 2).
+        x_grid (np.ndarray): The evenly spaced x coordinates of the grid nodes.
+        y_grid (np.ndarray): The evenly spaced y coordinates of the grid nodes.
+        batch_size (int): The number of grid points evaluated per task by awkde.
 
-    raster_filename = f"{name.lower().replace(' ', '_')}.tif"
-    raster_file_path = file_manager.get_file_path(raster_filename, LoadType.TEMP)
-    performance_logger.info(f"Saving raster to {raster_filename}")
+    Returns:
+        np.ndarray: The density at each node, of shape (len(y_grid), len(x_grid)).
+    """
+    with profile_section("City Mask"):
+        mask = city_grid_mask(
+            x_grid[0],
+            x_grid[1] - x_grid[0],
+            y_grid[0],
+            y_grid[1] - y_grid[0],
+            len(x_grid),
+            len(y_grid),
+        )
+        xx, yy = np.meshgrid(x_grid, y_grid)
+        grid_points = np.column_stack((xx[mask], yy[mask]))
+        performance_logger.info(
+            f"Evaluating {len(grid_points)} of {mask.size} grid points within the city limits"
+        )
 
-    # Profile raster saving
-    with profile_section("Raster Saving"):
-        with rasterio.open(
-            raster_file_path,
-            "w",
-            driver="GTiff",
-            height=zz.shape[0],
-            width=zz.shape[1],
-            count=1,
-            dtype=zz.dtype,
-            crs=USE_CRS,
-            transform=transform,
-        ) as dst:
-            dst.write(zz, 1)
+    zz = np.zeros(mask.shape)
+    if kde_backend == "binned":
+        with profile_section("Binned KDE"):
+            performance_logger.info(f"Estimating binned KDE for {name} data")
+            density = (
+                BinnedKDE(glob_bw=kde_glob_bw, alpha=kde_alpha)
+                .fit(X)
+                .predict_grid(x_grid, y_grid)
+            )
+            zz[mask] = density[mask]
+    elif kde_backend == "awkde":
+        zz[mask] = awkde_predict(name, X, grid_points, batch_size)
+    else:
+        raise ValueError(f"Unknown KDE backend: {kde_backend}")
 
-    return raster_file_path, X, input_validation
+    return zz
 
 
 @timer
-def apply_kde_to_input(
-    input_gdf: gpd.GeoDataFrame,
+def generic_kde(
     name: str,
     query: str,
     resolution: int = resolution,
     batch_size: int = batch_size,
-) -> Tuple[gpd.GeoDataFrame, ValidationResult]:
+    write_raster: bool = False,
+) -> Tuple[np.ndarray, Affine, np.ndarray, ValidationResult]:
     """
-    Applies KDE to the input GeoDataFrame and adds columns for density, z-score,
-    percentile, and percentile as a string.
+    Estimates the density surface of a dataset with kernel density estimation (KDE) on a
+    grid spanning its points, keeping the surface in memory.
 
     Args:
-        input_gdf (GeoDataFrame): The GeoDataFrame containing property data.
-        name (str): Name of the KDE feature.
-        query (str): SQL query to fetch data for KDE.
-        resolution (int): Resolution for the KDE raster grid.
-        batch_size (int): Batch size for processing grid points.
+        name (str): Name of the dataset being processed.
+        query (str): SQL query to fetch data.
+        resolution (int): Resolution for the grid. Defaults to 1320.
+        batch_size (int): Batch size for processing grid points. Defaults to 50000.
+        write_raster (bool): Whether to also save the surface as a GeoTIFF in the temp
+            directory.
 
     Returns:
-        GeoDataFrame: The input GeoDataFrame with added KDE-related columns.
+        Tuple[np.ndarray, Affine, np.ndarray, ValidationResult]: The density surface, the
+        transform of its pixels (centered on the grid nodes), the array of input points and
+        the validation of the input data.
     """
-    raster_filename, crime_coords, input_validation = generic_kde(
-        name, query, resolution, batch_size
-    )
-
-    # Profile centroid calculation and coordinate preparation
-    with profile_section("Centroid Calculation and Coordinate Preparation"):
-        centroids = input_gdf.geometry.centroid
-
-        coord_list = [
-            (x, y)
-            for x, y in zip(
-                centroids.x,
-                centroids.y,
-            )
-        ]
-
-    # Profile raster sampling
-    with profile_section("Raster Sampling"):
-        with rasterio.open(raster_filename) as src:
-            # Load entire raster into memory as numpy array
-            raster_array = src.read(1)  # Read the first (and only) band
-
-            # Debug logging for raster data
-            performance_logger.info("Raster sampling debug:")
-            performance_logger.info(f"  Raster shape: {raster_array.shape}")
-            performance_logger.info(
-                f"  Raster min: {raster_array.min()}, max: {raster_array.max()}"
-            )
-            performance_logger.info(f"  Raster has NaN: {np.isnan(raster_array).any()}")
-            performance_logger.info(f"  Raster has Inf: {np.isinf(raster_array).any()}")
-            performance_logger.info(
-                f"  Raster unique values count: {len(np.unique(raster_array))}"
-            )
-
-            # Get the transform for coordinate conversion
-            transform = src.transform
-
-            # Convert coordinates to numpy array for vectorized operations
-            coords_array = np.array(coord_list)
+    performance_logger.info(f"Initializing GeoDataFrame for {name}")
+    X, input_validation = load_incident_points(KDELayer(name, query, batch_size))
 
-            # Debug logging for coordinate conversion
-            performance_logger.info(
-                f"  Input coordinates min: {coords_array.min(axis=0)}, max: {coords_array.max(axis=0)}"
-            )
+    # Profile grid generation
+    with profile_section("Grid Generation"):
+        x_grid, y_grid = (
+            np.linspace(X[:, 0].min(), X[:, 0].max(), resolution),
+            np.linspace(X[:, 1].min(), X[:, 1].max(), resolution),
+        )
+        transform = grid_transform(x_grid, y_grid)
 
-            # Vectorized coordinate conversion to pixel indices
-            rows, cols = ~transform * (coords_array[:, 0], coords_array[:, 1])
-            rows = rows.astype(int)
-            cols = cols.astype(int)
+    zz = estimate_density(name, X, x_grid, y_grid, batch_size)
 
-            # Debug logging for pixel indices
-            performance_logger.info(
-                f"  Pixel rows min: {rows.min()}, max: {rows.max()}"
-            )
-            performance_logger.info(
-                f"  Pixel cols min: {cols.min()}, max: {cols.max()}"
-            )
+    if write_raster:
+        write_kde_raster(name, zz, transform)
 
-            # Clip indices to valid bounds
-            rows = np.clip(rows, 0, raster_array.shape[0] - 1)
-            cols = np.clip(cols, 0, raster_array.shape[1] - 1)
+    return zz, transform, X, input_validation
 
-            # Vectorized array indexing
-            sampled_values = raster_array[rows, cols].tolist()
 
-            # Debug logging for sampled values
-            performance_logger.info(
-                f"  Sampled values min: {min(sampled_values)}, max: {max(sampled_values)}"
-            )
-            performance_logger.info(
-                f"  Sampled values unique count: {len(set(sampled_values))}"
-            )
+def add_density_columns(
+    input_gdf: gpd.GeoDataFrame, density_column: str, densities: Sequence[float]
+) -> None:
+    """
+    Adds a density column to the GeoDataFrame along with its z-score, percentile and
+    percentile label columns.
 
-    density_column = f"{name.lower().replace(' ', '_')}_density"
-    input_gdf[density_column] = sampled_values
+    Args:
+        input_gdf (GeoDataFrame): The GeoDataFrame to add the columns to, in place.
+        density_column (str): The name of the density column, e.g. "gun_crimes_density".
+        densities (Sequence[float]): The density at each row.
+    """
+    input_gdf[density_column] = densities
 
     # Profile statistical calculations
     with profile_section("Statistical Calculations (z-scores, percentiles, labels)"):
@@ -368,61 +448,197 @@ def apply_kde_to_input(
         input_gdf[z_score_column] = z_scores
 
         # Calculate percentiles
-        percentile_breaks = list(range(101))
-        classifier = mapclassify.Percentiles(
-            input_gdf[density_column], pct=percentile_breaks
-        )
+        percentile_column = f"{density_column}_percentile"
+        input_gdf[percentile_column] = percentile_ranks(input_gdf[density_column])
 
         # Debug logging for percentile calculation
         performance_logger.info("Percentile calculation debug:")
         performance_logger.info(
-            f"  Percentile breaks: {percentile_breaks[:10]}...{percentile_breaks[-10:]}"
-        )  # Show first and last 10
-        performance_logger.info(f"  Classifier bins: {classifier.bins}")
-        performance_logger.info(
-            f"  Classifier yb min: {classifier.yb.min()}, max: {classifier.yb.max()}"
-        )
-        performance_logger.info(
-            f"  Classifier yb unique values: {np.unique(classifier.yb)}"
+            f"  Final percentile column min: {input_gdf[percentile_column].min()}, max: {input_gdf[percentile_column].max()}"
         )
 
-        percentile_column = f"{density_column}_percentile"
-        input_gdf[percentile_column] = classifier.yb.astype(int)
+        # Assign percentile labels
+        label_column = f"{density_column}_label"
+        input_gdf[label_column] = PERCENTILE_LABELS[
+            input_gdf[percentile_column].to_numpy()
+        ]
 
-        # Debug logging for final percentile column
-        performance_logger.info(
-            f"  Final percentile column min: {input_gdf[percentile_column].min()}, max: {input_gdf[percentile_column].max()}"
+
+@timer
+def apply_kde_to_input(
+    input_gdf: gpd.GeoDataFrame,
+    name: str,
+    query: str,
+    resolution: int = resolution,
+    batch_size: int = batch_size,
+    write_raster: bool = False,
+) -> Tuple[gpd.GeoDataFrame, ValidationResult]:
+    """
+    Applies KDE to the input GeoDataFrame and adds columns for density, z-score,
+    percentile, and percentile as a string.
+
+    Args:
+        input_gdf (GeoDataFrame): The GeoDataFrame containing property data.
+        name (str): Name of the KDE feature.
+        query (str): SQL query to fetch data for KDE.
+        resolution (int): Resolution for the KDE raster grid.
+        batch_size (int): Batch size for processing grid points.
+        write_raster (bool): Whether to also save the density surface as a GeoTIFF.
+
+    Returns:
+        GeoDataFrame: The input GeoDataFrame with added KDE-related columns.
+    """
+    zz, transform, _, input_validation = generic_kde(
+        name, query, resolution, batch_size, write_raster
+    )
+
+    # Profile raster sampling
+    with profile_section("Raster Sampling"):
+        centroids = input_gdf.geometry.centroid
+        rows, cols = grid_pixels(
+            transform, zz.shape, centroids.x.to_numpy(), centroids.y.to_numpy()
         )
+        sampled_values = zz[rows, cols]
+
+        # Debug logging for raster data
+        performance_logger.info("Raster sampling debug:")
+        performance_logger.info(f"  Raster shape: {zz.shape}")
+        performance_logger.info(f"  Raster min: {zz.min()}, max: {zz.max()}")
+        performance_logger.info(f"  Raster has NaN: {np.isnan(zz).any()}")
         performance_logger.info(
-            f"  Final percentile column unique values: {input_gdf[percentile_column].unique()}"
+            f"  Sampled values min: {sampled_values.min()}, max: {sampled_values.max()}"
         )
 
-        # Assign percentile labels
-        label_column = f"{density_column}_label"
-        input_gdf[label_column] = input_gdf[percentile_column].apply(label_percentile)
+    density_column = f"{name.lower().replace(' ', '_')}_density"
+    add_density_columns(input_gdf, density_column, sampled_values)
 
     performance_logger.info(f"Finished processing {name}")
     return input_gdf, input_validation
 
 
-def label_percentile(value: float) -> str:
+def load_incident_points(layer: KDELayer) -> Tuple[np.ndarray, ValidationResult]:
     """
-    Converts a percentile value into a human-readable string.
+    Loads the incidents of a KDE layer as an array of points.
+
+    Returns:
+        Tuple[np.ndarray, ValidationResult]: The points, of shape (n, 2), and the validation
+        of the loaded data.
+    """
+    with profile_section(f"Data Loading ({layer.name})"):
+        loader = CartoLoader(name=layer.name, carto_queries=layer.query)
+        gdf, input_validation = loader.load_or_fetch()
+
+    gdf = gdf.dropna(subset=["geometry"])
+    return gdf.geometry.get_coordinates().to_numpy(), input_validation
+
+
+def grid_transform(x_grid: np.ndarray, y_grid: np.ndarray) -> Affine:
+    """
+    The transform of a raster whose pixels are centered on the nodes of a regular grid.
+    """
+    dx, dy = x_grid[1] - x_grid[0], y_grid[1] - y_grid[0]
+    return Affine.translation(x_grid[0] - dx / 2, y_grid[0] - dy / 2) * Affine.scale(
+        dx, dy
+    )
+
+
+def grid_pixels(
+    transform: Affine, shape: Tuple[int, int], x: np.ndarray, y: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The row and column of the raster pixel containing each point, i.e. of the nearest grid
+    node, clipped to the raster so points off the grid sample its edge.
 
     Args:
-        value (float): The percentile value.
+        transform (Affine): The transform of the raster (see grid_transform).
+        shape (Tuple[int, int]): The number of rows and columns of the raster.
+        x (np.ndarray): The x coordinates of the points.
+        y (np.ndarray): The y coordinates of the points.
 
     Returns:
-        str: The formatted percentile string (e.g., '1st Percentile').
+        Tuple[np.ndarray, np.ndarray]: The row and column indices of the points.
     """
-    # Handle special cases: 11th, 12th, 13th (and 111th, 112th, 113th, etc.)
-    if value % 100 in [11, 12, 13]:
-        return f"{value}th Percentile"
-    elif value % 10 == 1:
-        return f"{value}st Percentile"
-    elif value % 10 == 2:
-        return f"{value}nd Percentile"
-    elif value % 10 == 3:
-        return f"{value}rd Percentile"
-    else:
-        return f"{value}th Percentile"
+    cols, rows = ~transform * (x, y)
+    rows = np.clip(np.floor(rows).astype(int), 0, shape[0] - 1)
+    cols = np.clip(np.floor(cols).astype(int), 0, shape[1] - 1)
+    return rows, cols
+
+
+def write_kde_raster(name: str, zz: np.ndarray, transform: Affine) -> str:
+    """
+    Saves a density surface as a GeoTIFF in the temp directory.
+
+    Returns:
+        str: The path of the raster file.
+    """
+    raster_filename = f"{name.lower().replace(' ', '_')}.tif"
+    raster_file_path = file_manager.get_file_path(raster_filename, LoadType.TEMP)
+    performance_logger.info(f"Saving raster to {raster_filename}")
+
+    with profile_section("Raster Saving"):
+        with rasterio.open(
+            raster_file_path,
+            "w",
+            driver="GTiff",
+            height=zz.shape[0],
+            width=zz.shape[1],
+            count=1,
+            dtype=zz.dtype,
+            crs=USE_CRS,
+            transform=transform,
+        ) as dst:
+            dst.write(zz, 1)
+
+    return raster_file_path
+
+
+@timer
+def apply_kde_layers(
+    input_gdf: gpd.GeoDataFrame,
+    layers: Sequence[KDELayer],
+    resolution: int = resolution,
+    write_rasters: bool = False,
+) -> Tuple[gpd.GeoDataFrame, List[ValidationResult]]:
+    """
+    Applies KDE for several incident datasets at once, adding the density, z-score,
+    percentile and label columns of each layer (see add_density_columns).
+
+    The layers share one grid spanning all of their incidents, so the city mask and the
+    grid pixel of every property centroid are computed once for all of them, and each
+    density surface is sampled in memory.
+
+    Args:
+        input_gdf (GeoDataFrame): The GeoDataFrame containing property data.
+        layers (Sequence[KDELayer]): The incident datasets.
+        resolution (int): Resolution for the KDE raster grid.
+        write_rasters (bool): Whether to also save each density surface as a GeoTIFF.
+
+    Returns:
+        Tuple[GeoDataFrame, List[ValidationResult]]: The input GeoDataFrame with the added
+        columns, and the validation of each layer's input data.
+    """
+    points, input_validations = zip(*(load_incident_points(layer) for layer in layers))
+
+    with profile_section("Grid Generation"):
+        all_points = np.vstack(points)
+        x_grid = np.linspace(all_points[:, 0].min(), all_points[:, 0].max(), resolution)
+        y_grid = np.linspace(all_points[:, 1].min(), all_points[:, 1].max(), resolution)
+        transform = grid_transform(x_grid, y_grid)
+
+    with profile_section("Centroid Pixel Indices"):
+        centroids = input_gdf.geometry.centroid
+        rows, cols = grid_pixels(
+            transform,
+            (len(y_grid), len(x_grid)),
+            centroids.x.to_numpy(),
+            centroids.y.to_numpy(),
+        )
+
+    for layer, X in zip(layers, points):
+        zz = estimate_density(layer.name, X, x_grid, y_grid, layer.batch_size)
+        if write_rasters:
+            write_kde_raster(layer.name, zz, transform)
+        add_density_columns(input_gdf, layer.density_column, zz[rows, cols])
+        performance_logger.info(f"Finished processing {layer.name}")
+
+    return input_gdf, list(input_validations)
@@ -6,8 +6,22 @@ from src.metadata.metadata_utils import current_metadata, provide_metadata
 from src.validation.base import ValidationResult, validate_output
 from src.validation.li_complaints import LIComplaintsOutputValidator
 
+from ..classes.loaders import CartoLoader
+from ..classes.source_prefetch import register_source_loader
 from ..constants.services import COMPLAINTS_SQL_QUERY
-from ..data_utils.kde import apply_kde_to_input
+from ..data_utils.kde import KDELayer, apply_kde_to_input
+
+LI_COMPLAINTS_LAYER = KDELayer(
+    "L and I Complaints", COMPLAINTS_SQL_QUERY, batch_size=20000
+)
+
+
+# Same name and query as the loader apply_kde_to_input builds, so both share a cache entry
+@register_source_loader("li_complaints")
+def li_complaints_loader() -> CartoLoader:
+    return CartoLoader(
+        name=LI_COMPLAINTS_LAYER.name, carto_queries=LI_COMPLAINTS_LAYER.query
+    )
 
 
 @validate_output(LIComplaintsOutputValidator)
@@ -42,5 +56,8 @@ def li_complaints(
 
     """
     return apply_kde_to_input(
-        input_gdf, "L and I Complaints", COMPLAINTS_SQL_QUERY, batch_size=20000
+        input_gdf,
+        LI_COMPLAINTS_LAYER.name,
+        LI_COMPLAINTS_LAYER.query,
+        batch_size=LI_COMPLAINTS_LAYER.batch_size,
     )
@@ -1,6 +1,8 @@
+import re
 from typing import List, Tuple
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 
 from src.metadata.metadata_utils import current_metadata, provide_metadata
@@ -11,10 +13,74 @@ from src.validation.li_violations import (
 )
 
 from ..classes.loaders import CartoLoader
+from ..classes.source_prefetch import register_source_loader
 from ..constants.services import VIOLATIONS_SQL_QUERY
 from ..utilities import opa_join
 
 
+@register_source_loader("li_violations")
+def li_violations_loader() -> CartoLoader:
+    return CartoLoader(
+        name="LI Violations",
+        carto_queries=VIOLATIONS_SQL_QUERY,
+        opa_col="opa_account_num",
+        validator=LIViolationsInputValidator(),
+    )
+
+
+KEYWORDS: List[str] = [
+    "dumping",
+    "blight",
+    "rubbish",
+    "weeds",
+    "graffiti",
+    "abandoned",
+    "sanitation",
+    "litter",
+    "vacant",
+    "trash",
+    "unsafe",
+]
+
+# One alternation of all the keywords, so each code title is scanned once
+KEYWORD_PATTERN = "|".join(map(re.escape, KEYWORDS))
+
+
+def count_violations(l_and_i_violations: pd.DataFrame) -> pd.DataFrame:
+    """
+    Count the keyword violations and the open ones of each property in one pass: the
+    matching violations are factorized by opa_id and both counts are bincounts of the codes.
+
+    Args:
+        l_and_i_violations (DataFrame): The violations, with opa_id, violationnumber,
+            violationcodetitle and violationstatus columns.
+
+    Returns:
+        DataFrame: opa_id, all_violations_past_year and open_violations_past_year, with one
+        row per property that has at least one keyword violation.
+    """
+    violations = l_and_i_violations[
+        l_and_i_violations["violationcodetitle"].str.contains(
+            KEYWORD_PATTERN, case=False, na=False
+        )
+        & l_and_i_violations["violationnumber"].notna()
+        & l_and_i_violations["opa_id"].notna()
+    ]
+
+    codes, opa_ids = pd.factorize(violations["opa_id"])
+    is_open = violations["violationstatus"].str.lower().eq("open").to_numpy(bool)
+
+    return pd.DataFrame(
+        {
+            "opa_id": opa_ids,
+            "all_violations_past_year": np.bincount(codes, minlength=len(opa_ids)),
+            "open_violations_past_year": np.bincount(
+                codes[is_open], minlength=len(opa_ids)
+            ),
+        }
+    )
+
+
 @validate_output(LIViolationsOutputValidator)
 @provide_metadata(current_metadata=current_metadata)
 def li_violations(
@@ -46,100 +112,20 @@ def li_violations(
     Columns referenced:
         opa_id
     """
-    keywords: List[str] = [
-        "dumping",
-        "blight",
-        "rubbish",
-        "weeds",
-        "graffiti",
-        "abandoned",
-        "sanitation",
-        "litter",
-        "vacant",
-        "trash",
-        "unsafe",
-    ]
-
-    loader = CartoLoader(
-        name="LI Violations",
-        carto_queries=VIOLATIONS_SQL_QUERY,
-        opa_col="opa_account_num",
-        validator=LIViolationsInputValidator(),
-    )
+    loader = li_violations_loader()
 
     l_and_i_violations, input_validation = loader.load_or_fetch()
 
-    # Filter for rows where 'casetype' contains any of the keywords, handling NaN values
-    l_and_i_violations = l_and_i_violations[
-        l_and_i_violations["violationcodetitle"]
-        .fillna("")
-        .str.lower()
-        .str.contains("|".join(keywords))
-    ]
-
-    all_violations_count_df: pd.DataFrame = (
-        l_and_i_violations.groupby("opa_id")
-        .count()
-        .reset_index()[["opa_id", "violationnumber", "geometry"]]
-    )
-    all_violations_count_df = all_violations_count_df.rename(
-        columns={"violationnumber": "all_violations_past_year"}
-    )
-    # filter for only cases where the casestatus is 'IN VIOLATION' or 'UNDER INVESTIGATION'
-    violations_gdf: gpd.GeoDataFrame = l_and_i_violations[
-        (l_and_i_violations["violationstatus"].str.lower() == "open")
-    ]
-
-    open_violations_count_df: pd.DataFrame = (
-        violations_gdf.groupby("opa_id")
-        .count()
-        .reset_index()[["opa_id", "violationnumber", "geometry"]]
-    )
-    open_violations_count_df = open_violations_count_df.rename(
-        columns={"violationnumber": "open_violations_past_year"}
-    )
-    # join the all_violations_count_df and open_violations_count_df dataframes on opa_id
-    violations_count_gdf: gpd.GeoDataFrame = all_violations_count_df.merge(
-        open_violations_count_df, how="left", on="opa_id"
-    )
-
-    # replace NaN values with 0
-    violations_count_gdf.fillna(0, inplace=True)
-
-    # convert the all_violations_past_year and open_violations_past_year columns to integers
-    violations_count_gdf["all_violations_past_year"] = violations_count_gdf[
-        "all_violations_past_year"
-    ].astype(int)
-    violations_count_gdf["open_violations_past_year"] = violations_count_gdf[
-        "open_violations_past_year"
-    ].astype(int)
-    violations_count_gdf = violations_count_gdf[
-        ["opa_id", "all_violations_past_year", "open_violations_past_year"]
-    ]
-
-    # collapse violations_gdf by address and concatenate the violationcodetitle values into a list with a semicolon separator
-    l_and_i_violations = (
-        l_and_i_violations.groupby("geometry")["violationcodetitle"]
-        .apply(lambda x: "; ".join([val for val in x if val is not None]))
-        .reset_index()
-    )
-
-    # rename the column to 'li_violations'
-    l_and_i_violations.rename(
-        columns={"violationcodetitle": "li_code_violations"}, inplace=True
-    )
+    violations_count_df = count_violations(l_and_i_violations)
 
     # Violations can work with an OPA join
     merged_gdf = opa_join(
         input_gdf,
-        violations_count_gdf,
+        violations_count_df,
     )
 
-    merged_gdf[["all_violations_past_year", "open_violations_past_year"]] = (
-        merged_gdf[["all_violations_past_year", "open_violations_past_year"]]
-        .apply(lambda x: pd.to_numeric(x, errors="coerce"))
-        .fillna(0)
-        .astype(int)
-    )
+    # Properties without keyword violations have none of either
+    count_columns = ["all_violations_past_year", "open_violations_past_year"]
+    merged_gdf[count_columns] = merged_gdf[count_columns].fillna(0).astype(int)
 
     return merged_gdf, input_validation
@@ -7,8 +7,14 @@ from src.validation.base import ValidationResult, validate_output
 from src.validation.nbhoods import NeighborhoodsOutputValidator
 
 from ..classes.loaders import GdfLoader
+from ..classes.source_prefetch import register_source_loader
 from ..constants.services import NBHOODS_URL
-from ..utilities import spatial_join
+from ..utilities import assign_nearest, spatial_enrich
+
+
+@register_source_loader("nbhoods")
+def nbhoods_loader() -> GdfLoader:
+    return GdfLoader(name="Neighborhoods", input=NBHOODS_URL, cols=["mapname"])
 
 
 @validate_output(NeighborhoodsOutputValidator)
@@ -38,49 +44,29 @@ def nbhoods(input_gdf: gpd.GeoDataFrame) -> Tuple[gpd.GeoDataFrame, ValidationRe
         https://raw.githubusercontent.com/opendataphilly/open-geo-data/master/philadelphia-neighborhoods/philadelphia-neighborhoods.geojson
     """
 
-    loader = GdfLoader(name="Neighborhoods", input=NBHOODS_URL, cols=["mapname"])
+    loader = nbhoods_loader()
     phl_nbhoods, input_validation = loader.load_or_fetch()
 
     # Correct the column name to lowercase if needed
     if "mapname" in phl_nbhoods.columns:
         phl_nbhoods.rename(columns={"mapname": "neighborhood"}, inplace=True)
 
-    merged_gdf = spatial_join(input_gdf, phl_nbhoods, predicate="within")
+    merged_gdf = spatial_enrich(
+        input_gdf, phl_nbhoods, ["neighborhood"], predicate="within"
+    )
+
+    # Properties just outside every neighborhood boundary get the nearest neighborhood
+    null_neighborhood_count = merged_gdf["neighborhood"].isna().sum()
+    if null_neighborhood_count > 0:
+        print(
+            f"\n[DEBUG] Found {null_neighborhood_count} properties without neighborhood assignments"
+        )
+        merged_gdf = assign_nearest(merged_gdf, phl_nbhoods, "neighborhood")
 
-    # Check for properties without neighborhood assignments and use nearest neighbor
-    if "neighborhood" in merged_gdf.columns:
-        null_neighborhood_count = merged_gdf["neighborhood"].isna().sum()
-        if null_neighborhood_count > 0:
+        final_null_count = merged_gdf["neighborhood"].isna().sum()
+        if final_null_count > 0:
             print(
-                f"\n[DEBUG] Found {null_neighborhood_count} properties without neighborhood assignments"
+                f"WARNING: {final_null_count} properties still have null neighborhood values"
             )
-            print("Assigning neighborhoods using nearest neighbor...")
-
-            # For properties without neighborhoods, assign based on nearest neighborhood
-            null_neighborhood_mask = merged_gdf["neighborhood"].isna()
-            properties_without_neighborhoods = merged_gdf[null_neighborhood_mask]
-
-            if len(properties_without_neighborhoods) > 0:
-                # Use nearest neighbor to assign neighborhoods
-                for idx in properties_without_neighborhoods.index:
-                    property_geom = merged_gdf.loc[idx, "geometry"]
-                    # Find the nearest neighborhood boundary
-                    distances = phl_nbhoods.geometry.distance(property_geom)
-                    nearest_neighborhood_idx = distances.idxmin()
-                    nearest_neighborhood = phl_nbhoods.loc[
-                        nearest_neighborhood_idx, "neighborhood"
-                    ]
-                    merged_gdf.loc[idx, "neighborhood"] = nearest_neighborhood
-
-                print(
-                    f"Assigned neighborhoods to {null_neighborhood_count} properties using nearest neighbor"
-                )
-
-            # Final check
-            final_null_count = merged_gdf["neighborhood"].isna().sum()
-            if final_null_count > 0:
-                print(
-                    f"WARNING: {final_null_count} properties still have null neighborhood values"
-                )
 
     return merged_gdf, input_validation
@@ -1,6 +1,9 @@
 from typing import Tuple
 
 import geopandas as gpd
+import pandas as pd
+
+from src.classes.address_index import AddressIndex
 
 from src.metadata.metadata_utils import current_metadata, provide_metadata
 from src.validation.base import ValidationResult, validate_output
@@ -38,26 +41,22 @@ def negligent_devs(
         GeoDataFrame: The input GeoDataFrame with additional columns for total properties
         owned, vacant properties owned, average violations per property, and a "negligent_dev" flag.
     """
-    # Count total properties and vacant properties by standardized_mailing_address
-    property_counts = (
-        input_gdf.groupby("standardized_mailing_address")
-        .agg(
-            n_total_properties_owned=("opa_id", "size"),
-            n_vacant_properties_owned=("vacant", "sum"),
-            total_violations=("all_violations_past_year", "sum"),
-        )
-        .reset_index()
-    )
+    # Count total properties and vacant properties by standardized_mailing_address,
+    # grouping by the address codes of the index rather than the address strings and
+    # broadcasting the counts back to the properties without a merge
+    codes = AddressIndex(input_gdf["standardized_mailing_address"]).codes
+    owners = pd.Series(codes, index=input_gdf.index).where(codes >= 0)
+    by_owner = input_gdf.groupby(owners)
 
-    # Calculate average violations per property
-    property_counts["avg_violations_per_property"] = (
-        property_counts["total_violations"]
-        / property_counts["n_total_properties_owned"]
+    input_gdf["n_total_properties_owned"] = by_owner["opa_id"].transform("size")
+    input_gdf["n_vacant_properties_owned"] = by_owner["vacant"].transform("sum")
+    input_gdf["total_violations"] = by_owner["all_violations_past_year"].transform(
+        "sum"
     )
 
-    # Merge the property counts back to the main DataFrame
-    input_gdf = input_gdf.merge(
-        property_counts, on="standardized_mailing_address", how="left"
+    # Calculate average violations per property
+    input_gdf["avg_violations_per_property"] = (
+        input_gdf["total_violations"] / input_gdf["n_total_properties_owned"]
     )
 
     # Identify negligent developers: non-city owned entities owning 5+ vacant properties
@@ -6,6 +6,7 @@ import geopandas as gpd
 import pandas as pd
 
 from src.classes.loaders import CartoLoader
+from src.classes.source_prefetch import register_source_loader
 from src.config.config import get_logger
 from src.metadata.metadata_utils import current_metadata, provide_metadata
 from src.validation.base import ValidationResult, validate_output
@@ -40,6 +41,24 @@ replacements = {
     "PARKWAY": "PKY",
 }
 
+# All of the replacements as one case-insensitive alternation of whole words, longest
+# first, so each street is scanned once rather than once per replacement
+STREET_ABBREVIATIONS = re.compile(
+    r"\b(?:{})\b".format(
+        "|".join(
+            re.escape(full) for full in sorted(replacements, key=len, reverse=True)
+        )
+    ),
+    flags=re.IGNORECASE,
+)
+
+
+def abbreviate(match: re.Match) -> str:
+    """
+    The abbreviation of a word matched by STREET_ABBREVIATIONS.
+    """
+    return replacements.get(match.group(0).upper(), match.group(0))
+
 
 def standardize_street(street: str) -> str:
     """
@@ -53,9 +72,7 @@ def standardize_street(street: str) -> str:
     """
     if not isinstance(street, str):
         return ""
-    for full, abbr in replacements.items():
-        street = re.sub(r"\b{}\b".format(full), abbr, street, flags=re.IGNORECASE)
-    return street
+    return STREET_ABBREVIATIONS.sub(abbreviate, street)
 
 
 def create_standardized_mailing_address(row: pd.Series) -> str:
@@ -98,13 +115,12 @@ def standardize_street_vectorized(street_series: pd.Series) -> pd.Series:
     # Convert to string and handle non-string values
     street_series = street_series.astype(str)
 
-    # Apply all replacements using vectorized operations
-    for full, abbr in replacements.items():
-        # Use case-insensitive regex replacement
-        pattern = r"\b" + re.escape(full) + r"\b"
-        street_series = street_series.str.replace(pattern, abbr, case=False, regex=True)
-
-    return street_series
+    # Each distinct street is standardized once, in a single pass of the combined pattern
+    codes, streets = pd.factorize(street_series)
+    standardized = [STREET_ABBREVIATIONS.sub(abbreviate, street) for street in streets]
+    return pd.Series(
+        pd.Index(standardized, dtype=object).take(codes), index=street_series.index
+    )
 
 
 def create_standardized_mailing_address_vectorized(gdf: gpd.GeoDataFrame) -> pd.Series:
@@ -139,6 +155,34 @@ def create_standardized_mailing_address_vectorized(gdf: gpd.GeoDataFrame) -> pd.
     return standardized.str.lower()
 
 
+@register_source_loader("opa_properties")
+def opa_properties_loader() -> CartoLoader:
+    return CartoLoader(
+        carto_queries=OPA_PROPERTIES_QUERY,
+        name="OPA Properties",
+        opa_col="parcel_number",
+        cols=[
+            "market_value",
+            "sale_date",
+            "sale_price",
+            "parcel_number",
+            "owner_1",
+            "owner_2",
+            "mailing_address_1",
+            "mailing_address_2",
+            "mailing_care_of",
+            "mailing_city_state",
+            "mailing_street",
+            "mailing_zip",
+            "unit",
+            "street_address",
+            "building_code_description",
+            "zip_code",
+            "zoning",
+        ],
+    )
+
+
 @validate_output(OPAPropertiesOutputValidator)
 @provide_metadata(current_metadata=current_metadata)
 def opa_properties(
@@ -177,30 +221,7 @@ def opa_properties(
 
     loader_start = time.time()
     performance_logger.info("Creating CartoLoader")
-    loader = CartoLoader(
-        carto_queries=OPA_PROPERTIES_QUERY,
-        name="OPA Properties",
-        opa_col="parcel_number",
-        cols=[
-            "market_value",
-            "sale_date",
-            "sale_price",
-            "parcel_number",
-            "owner_1",
-            "owner_2",
-            "mailing_address_1",
-            "mailing_address_2",
-            "mailing_care_of",
-            "mailing_city_state",
-            "mailing_street",
-            "mailing_zip",
-            "unit",
-            "street_address",
-            "building_code_description",
-            "zip_code",
-            "zoning",
-        ],
-    )
+    loader = opa_properties_loader()
     loader_time = time.time() - loader_start
     performance_logger.info(f"CartoLoader creation: {loader_time:.3f}s")
 
@@ -258,11 +279,10 @@ def opa_properties(
     # Combine street_address and unit into a single column, if unit is not empty
     street_combine_start = time.time()
     performance_logger.info("Combining street_address and unit")
-    opa["street_address"] = opa.apply(
-        lambda row: f"{row['street_address']} {row['unit']}"
-        if pd.notnull(row.get("unit")) and str(row["unit"]).strip() != ""
-        else row["street_address"],
-        axis=1,
+    unit = opa["unit"]
+    has_unit = unit.notna() & (unit.astype(str).str.strip() != "")
+    opa["street_address"] = opa["street_address"].where(
+        ~has_unit, opa["street_address"].astype(str) + " " + unit.astype(str)
     )
     street_combine_time = time.time() - street_combine_start
     performance_logger.info(f"Street combine: {street_combine_time:.3f}s")
@@ -270,7 +290,7 @@ def opa_properties(
     # Standardize street addresses
     street_start = time.time()
     performance_logger.info("Standardizing street addresses")
-    opa["street_address"] = opa["street_address"].astype(str).apply(standardize_street)
+    opa["street_address"] = standardize_street_vectorized(opa["street_address"])
     street_time = time.time() - street_start
     performance_logger.info(f"Street standardization: {street_time:.3f}s")
 
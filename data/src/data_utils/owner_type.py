@@ -1,12 +1,100 @@
-from typing import Tuple
+import re
+from collections import defaultdict
+from typing import Dict, List, Tuple
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 
+from src.classes.address_index import AddressIndex
+from src.classes.decision_table import DecisionTable, Rule
+from src.constants.owner_patterns import OWNER_PATTERNS
 from src.metadata.metadata_utils import current_metadata, provide_metadata
 from src.validation.base import ValidationResult, validate_output
 from src.validation.owner_type import OwnerTypeOutputValidator
 
+ADDRESS_COLUMN = "standardized_mailing_address"
+
+
+class OwnerPatternMatcher:
+    """
+    The patterns of one owner type, compiled so that each column is scanned once: the
+    single-column patterns of a column are combined into one regular expression, evaluated
+    on Arrow strings (by RE2, whose run time doesn't grow with the number of alternatives).
+    Patterns over several columns are checked separately, and mailing address patterns are
+    looked up in an AddressIndex of standardized_mailing_address.
+    """
+
+    def __init__(self, patterns: List[Dict[str, str]]):
+        substrings = defaultdict(list)
+        self.multi_column_patterns: List[Dict[str, str]] = []
+        self.known_addresses: List[str] = []
+
+        for pattern in patterns:
+            conditions = {
+                column: substring
+                for column, substring in pattern.items()
+                if column != "name"
+            }
+            if list(conditions) == [ADDRESS_COLUMN]:
+                self.known_addresses.append(conditions[ADDRESS_COLUMN])
+            elif len(conditions) == 1:
+                [(column, substring)] = conditions.items()
+                substrings[column].append(substring)
+            else:
+                self.multi_column_patterns.append(conditions)
+
+        self.column_patterns: Dict[str, str] = {
+            column: "|".join(
+                re.escape(substring)
+                for substring in sorted(set(column_substrings), key=len, reverse=True)
+            )
+            for column, column_substrings in substrings.items()
+        }
+
+    def matches(
+        self, columns: Dict[str, pd.Series], addresses: AddressIndex
+    ) -> np.ndarray:
+        """
+        Whether each row matches any of the patterns.
+
+        Args:
+            columns (Dict[str, Series]): The lowercased text of each owner column the
+                patterns reference, as Arrow strings without missing values.
+            addresses (AddressIndex): The index of the rows' mailing addresses.
+        """
+        length = len(addresses.codes)
+        matched = np.zeros(length, dtype=bool)
+
+        if self.known_addresses:
+            matched |= addresses.matches(self.known_addresses)
+
+        for column, pattern in self.column_patterns.items():
+            matched |= columns[column].str.contains(pattern, regex=True).to_numpy(bool)
+
+        for conditions in self.multi_column_patterns:
+            pattern_matched = np.ones(length, dtype=bool)
+            for column, substring in conditions.items():
+                pattern_matched &= (
+                    columns[column].str.contains(substring, regex=False).to_numpy(bool)
+                )
+            matched |= pattern_matched
+
+        return matched
+
+
+OWNER_TYPE_MATCHERS = {
+    owner_type: OwnerPatternMatcher(patterns)
+    for owner_type, patterns in OWNER_PATTERNS.items()
+}
+
+
+def lowercase_text(gdf: gpd.GeoDataFrame, column: str) -> pd.Series:
+    """
+    A column as lowercase Arrow strings, with missing values as "".
+    """
+    return gdf[column].astype("string[pyarrow]").fillna("").str.lower()
+
 
 @validate_output(OwnerTypeOutputValidator)
 @provide_metadata(current_metadata=current_metadata)
@@ -25,6 +113,8 @@ def owner_type(
       in 'owner_1' or 'owner_2'.
     - "Individual" if none of the above conditions are met.
 
+    The patterns for each type are listed in src/constants/owner_patterns.json.
+
     Args:
         input_gdf (GeoDataFrame): The GeoDataFrame containing property ownership data.
 
@@ -41,54 +131,20 @@ def owner_type(
     Columns referenced:
         opa_id, owner_1, owner_2, city_owner_agency, standardized_mailing_address
     """
-    owner_types = []
-
-    for _, row in input_gdf.iterrows():
-        # Extract owner1, owner2, and city_owner_agency
-        owner1 = str(row["owner_1"]).lower()
-        owner2 = str(row["owner_2"]).lower()
-        city_owner_agency = row["city_owner_agency"]
-        standardized_mailing_address = str(
-            row.get("standardized_mailing_address", "")
-        ).lower()
-
-        # Determine ownership type based on the conditions
-        if pd.notna(city_owner_agency):
-            owner_types.append("Public")
-        elif (
-            "po box 3362, harrisburg pa, 17105"
-            in standardized_mailing_address  # PA Dept of Transportation
-            or "7000 geerdes blvd" in standardized_mailing_address  # Commonwealth of PA
-            or "400 n capitol st nw, washington dc, 20001"
-            in standardized_mailing_address  # Amtrak
-            or "200 n radnor chester rd, st davids pa, 19087"
-            in standardized_mailing_address  # PennDOT
-        ):
-            owner_types.append("Public")
-        elif (
-            "new kensington cdc" in owner1  # New Kensington CDC
-            or (
-                "strawberry mansion" in owner1 and "citizens council" in owner2
-            )  # Strawberry Mansion Citizens Council
-            or "habitat for humanity" in owner1  # Habitat for Humanity
-            or "norris square civic assoc" in owner1  # Norris Square Civic Association
-            or (
-                "neighborhood gardens asso" in owner1
-                or "neighborhood gardens trust" in owner1
-            )  # Neighborhood Gardens Association/Trust
-            or "east parkside community r" in owner1  # East Parkside Community
-            or "civic" in owner1
-            or "civic" in owner2  # Generic civic organizations
-            or "cdc" in owner1
-            or "cdc" in owner2  # Generic CDC organizations
-        ):
-            owner_types.append("Nonprofit/Civic")
-        elif " llc" in owner1 or " llc" in owner2:
-            owner_types.append("Business (LLC)")
-        else:
-            owner_types.append("Individual")
-
-    # Add the 'owner_type' column to the GeoDataFrame
-    input_gdf["owner_type"] = owner_types
+    columns = {
+        column: lowercase_text(input_gdf, column) for column in ["owner_1", "owner_2"]
+    }
+    addresses = AddressIndex(
+        input_gdf.get(ADDRESS_COLUMN, pd.Series(None, index=input_gdf.index))
+    )
+
+    rules = [Rule(lambda _: input_gdf["city_owner_agency"].notna(), "Public")]
+    rules += [
+        Rule(lambda _, matcher=matcher: matcher.matches(columns, addresses), owner_type)
+        for owner_type, matcher in OWNER_TYPE_MATCHERS.items()
+    ]
+    owner_types = DecisionTable(rules=rules, default="Individual")
+
+    input_gdf["owner_type"] = owner_types.evaluate(input_gdf)
 
     return input_gdf, ValidationResult(True)
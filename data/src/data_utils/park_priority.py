@@ -8,8 +8,19 @@ from src.validation.base import ValidationResult, validate_output
 from src.validation.park_priority import ParkPriorityOutputValidator
 
 from ..classes.loaders import EsriLoader
+from ..classes.source_prefetch import register_source_loader
 from ..constants.services import PARK_PRIORITY_AREAS_URBAN_PHL
-from ..utilities import spatial_join
+from ..utilities import spatial_enrich
+
+
+@register_source_loader("park_priority")
+def park_priority_loader() -> EsriLoader:
+    return EsriLoader(
+        name="Park Priority Areas - Philadelphia",
+        esri_urls=PARK_PRIORITY_AREAS_URBAN_PHL,
+        cols=["id", "parkneed", "rg_abbrev"],  # Include rg_abbrev for filtering
+        extra_query_args={"where": "rg_abbrev = 'PA'"},
+    )
 
 
 def _park_priority_logic(
@@ -40,12 +51,7 @@ def _park_priority_logic(
     loader_start = time.time()
     print("Initializing EsriLoader for Park Priority Areas...")
 
-    loader = EsriLoader(
-        name="Park Priority Areas - Philadelphia",
-        esri_urls=PARK_PRIORITY_AREAS_URBAN_PHL,
-        cols=["id", "parkneed", "rg_abbrev"],  # Include rg_abbrev for filtering
-        extra_query_args={"where": "rg_abbrev = 'PA'"},
-    )
+    loader = park_priority_loader()
 
     loader_init_time = time.time() - loader_start
     print(f"EsriLoader initialization took {loader_init_time:.2f}s")
@@ -85,15 +91,11 @@ def _park_priority_logic(
     join_start = time.time()
     print("Performing spatial join between input data and park priority areas...")
 
-    merged_gdf = spatial_join(input_gdf, park_priority_gdf)
+    merged_gdf = spatial_enrich(input_gdf, park_priority_gdf, ["park_priority"])
 
     join_time = time.time() - join_start
     print(f"Spatial join took {join_time:.2f}s")
 
-    # Deduplicate by OPA ID to keep only the first occurrence
-    merged_gdf = merged_gdf.drop_duplicates(subset=["opa_id"], keep="first")
-    print(f"After OPA ID deduplication: {len(merged_gdf)} properties")
-
     # Log join results
     if "park_priority" in merged_gdf.columns:
         matched_count = merged_gdf["park_priority"].notna().sum()
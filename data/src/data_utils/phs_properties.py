@@ -10,8 +10,19 @@ from src.validation.phs_properties import (
 )
 
 from ..classes.loaders import EsriLoader
+from ..classes.source_prefetch import register_source_loader
 from ..constants.services import PHS_LAYERS_TO_LOAD
-from ..utilities import spatial_join
+from ..utilities import spatial_enrich
+
+
+@register_source_loader("phs_properties")
+def phs_properties_loader() -> EsriLoader:
+    return EsriLoader(
+        name="PHS Properties",
+        esri_urls=PHS_LAYERS_TO_LOAD,
+        cols=["program"],
+        validator=PHSPropertiesInputValidator(),
+    )
 
 
 @validate_output(PHSPropertiesOutputValidator)
@@ -46,12 +57,7 @@ def phs_properties(
     print("Input data head:")
     print(input_gdf.head())
 
-    loader = EsriLoader(
-        name="PHS Properties",
-        esri_urls=PHS_LAYERS_TO_LOAD,
-        cols=["program"],
-        validator=PHSPropertiesInputValidator(),
-    )
+    loader = phs_properties_loader()
 
     phs_properties, input_validation = loader.load_or_fetch()
 
@@ -72,22 +78,12 @@ def phs_properties(
             print(f"PHS properties after deduplication: {len(phs_properties)} records")
 
     # Perform spatial join between input GeoDataFrame and PHS properties
-    merged_gdf = spatial_join(input_gdf, phs_properties)
+    merged_gdf = spatial_enrich(input_gdf, phs_properties, ["program"])
 
     print(f"After spatial join: {len(merged_gdf)} records")
     print("Merged data head:")
     print(merged_gdf.head())
 
-    # Remove duplicate OPA IDs in the main dataset after spatial join
-    before_dedup = len(merged_gdf)
-    merged_gdf = merged_gdf.drop_duplicates(subset=["opa_id"], keep="first")
-    after_dedup = len(merged_gdf)
-    if before_dedup != after_dedup:
-        print(
-            f"Removed {before_dedup - after_dedup} duplicate OPA IDs from main dataset after spatial join"
-        )
-        print(f"Main dataset after deduplication: {len(merged_gdf)} records")
-
     # Create 'phs_care_program' column with values from 'program', drop 'program'
     merged_gdf["phs_care_program"] = merged_gdf.pop("program")
 
@@ -2,7 +2,6 @@ import io
 from typing import Tuple
 
 import geopandas as gpd
-import requests
 
 from src.metadata.metadata_utils import current_metadata, provide_metadata
 from src.validation.base import ValidationResult, validate_output
@@ -11,9 +10,20 @@ from src.validation.ppr_properties import (
     PPRPropertiesOutputValidator,
 )
 
+from ..classes import http_client
 from ..classes.loaders import EsriLoader, GdfLoader
+from ..classes.source_prefetch import register_source_loader
 from ..constants.services import PPR_PROPERTIES_TO_LOAD
-from ..utilities import spatial_join
+from ..utilities import spatial_enrich
+
+
+@register_source_loader("ppr_properties")
+def ppr_properties_loader() -> EsriLoader:
+    return EsriLoader(
+        name="PPR Properties",
+        esri_urls=PPR_PROPERTIES_TO_LOAD,
+        cols=["public_name"],
+    )
 
 
 @validate_output(PPRPropertiesOutputValidator)
@@ -52,11 +62,7 @@ def ppr_properties(
     fallback_url = "https://opendata.arcgis.com/datasets/d52445160ab14380a673e5849203eb64_0.geojson"
 
     try:
-        loader = EsriLoader(
-            name="PPR Properties",
-            esri_urls=PPR_PROPERTIES_TO_LOAD,
-            cols=["public_name"],
-        )
+        loader = ppr_properties_loader()
 
         ppr_properties, input_validation = loader.load_or_fetch()
 
@@ -71,7 +77,7 @@ def ppr_properties(
         print(f"Error loading PPR properties from Esri REST URL: {e}")
         print("Falling back to loading from GeoJSON URL.")
 
-        response = requests.get(fallback_url)
+        response = http_client.get(fallback_url)
         response.raise_for_status()
 
         loader = GdfLoader(
@@ -83,17 +89,7 @@ def ppr_properties(
         ppr_properties, input_validation = loader.load_or_fetch()
 
     # Perform a spatial join with the input GeoDataFrame
-    merged_gdf = spatial_join(input_gdf, ppr_properties)
-
-    # Remove duplicate OPA IDs in the main dataset after spatial join
-    before_dedup = len(merged_gdf)
-    merged_gdf = merged_gdf.drop_duplicates(subset=["opa_id"], keep="first")
-    after_dedup = len(merged_gdf)
-    if before_dedup != after_dedup:
-        print(
-            f"Removed {before_dedup - after_dedup} duplicate OPA IDs from main dataset after spatial join"
-        )
-        print(f"Main dataset after deduplication: {len(merged_gdf)} records")
+    merged_gdf = spatial_enrich(input_gdf, ppr_properties, ["public_name"])
 
     # Ensure the 'vacant' column exists in the input GeoDataFrame
     if "vacant" not in merged_gdf.columns:
@@ -3,11 +3,53 @@ from typing import Tuple
 import geopandas as gpd
 import pandas as pd
 
+from src.classes.decision_table import DecisionTable, Rule, numeric
 from src.metadata.metadata_utils import current_metadata, provide_metadata
 from src.validation.base import ValidationResult, validate_output
 from src.validation.priority_level import PriorityLevelOutputValidator
 
 
+def _low_gun_crime(points: pd.DataFrame) -> pd.Series:
+    # Below the mean
+    return points["guncrime_density_zscore"] <= 0
+
+
+def _high_gun_crime(points: pd.DataFrame) -> pd.Series:
+    # More than 1 std above the mean
+    return points["guncrime_density_zscore"] > 1
+
+
+PRIORITY_LEVELS = DecisionTable(
+    rules=[
+        Rule(_low_gun_crime, "Low"),
+        Rule(lambda p: _high_gun_crime(p) & p["has_violation_or_high_density"], "High"),
+        Rule(
+            lambda p: _high_gun_crime(p)
+            & p["in_phs_landcare"]
+            & p["very_low_tree_canopy"],
+            "High",
+        ),
+        Rule(lambda p: _high_gun_crime(p) & p["in_phs_landcare"], "Medium"),
+        Rule(_high_gun_crime, "High"),
+        # The rows left have medium gun crime density (between the mean and 1 std above
+        # the mean)
+        Rule(
+            lambda p: p["has_violation_or_high_density"] & p["in_phs_landcare"],
+            "Medium",
+        ),
+        Rule(
+            lambda p: p["has_violation_or_high_density"] & p["very_low_tree_canopy"],
+            "High",
+        ),
+        Rule(lambda p: p["has_violation_or_high_density"], "Medium"),
+    ],
+    default="Low",
+)
+"""
+Priority levels from the decision points computed in priority_level, in order of precedence.
+"""
+
+
 @validate_output(PriorityLevelOutputValidator)
 @provide_metadata(current_metadata=current_metadata)
 def priority_level(
@@ -31,56 +73,24 @@ def priority_level(
     Tagline:
         Add priority levels
 
-    Source:
+    Columns referenced:
         gun_crimes_density_zscore, all_violations_past_year, l_and_i_complaints_density_zscore,
-        tree_canopy_gap, phs_care_program columns in the input GeoDataFrame.
+        tree_canopy_gap, phs_care_program
     """
-    priority_levels = []
-    for idx, row in dataset.iterrows():
-        priority_level = ""
-
-        # Decision Points
-        guncrime_density_zscore = row["gun_crimes_density_zscore"]
-        in_phs_landcare = pd.notna(row["phs_care_program"])
-        has_violation_or_high_density = (
-            float(row["all_violations_past_year"]) > 0
-            or row["l_and_i_complaints_density_zscore"] > 0  # above the mean
-        )
-        very_low_tree_canopy = row["tree_canopy_gap"] >= 0.3
-
-        # Logic for priority levels
-        if guncrime_density_zscore <= 0:
-            # Low Gun Crime Density (below the mean)
-            priority_level = "Low"
-
-        elif guncrime_density_zscore > 1:
-            # High Gun Crime Density (more than 1 std above the mean)
-            if has_violation_or_high_density:
-                priority_level = "High"
-            else:
-                if in_phs_landcare:
-                    if very_low_tree_canopy:
-                        priority_level = "High"
-                    else:
-                        priority_level = "Medium"
-                else:
-                    priority_level = "High"
-
-        else:
-            # Medium Gun Crime Density (between the mean and 1 std above the mean)
-            if has_violation_or_high_density:
-                if in_phs_landcare:
-                    priority_level = "Medium"
-                else:
-                    if very_low_tree_canopy:
-                        priority_level = "High"
-                    else:
-                        priority_level = "Medium"
-            else:
-                priority_level = "Low"
-
-        priority_levels.append(priority_level)
-
-    dataset["priority_level"] = priority_levels
+    decision_points = pd.DataFrame(
+        {
+            "guncrime_density_zscore": numeric(dataset["gun_crimes_density_zscore"]),
+            "in_phs_landcare": dataset["phs_care_program"].notna(),
+            "has_violation_or_high_density": (
+                numeric(dataset["all_violations_past_year"]) > 0
+            )
+            # above the mean
+            | (numeric(dataset["l_and_i_complaints_density_zscore"]) > 0),
+            "very_low_tree_canopy": numeric(dataset["tree_canopy_gap"]) >= 0.3,
+        },
+        index=dataset.index,
+    )
+
+    dataset["priority_level"] = PRIORITY_LEVELS.evaluate(decision_points)
 
     return dataset, ValidationResult(True)
@@ -10,6 +10,7 @@ from src.validation.pwd_parcels import (
 )
 
 from ..classes.loaders import CartoLoader
+from ..classes.source_prefetch import register_source_loader
 from ..constants.services import PWD_PARCELS_QUERY
 
 
@@ -86,6 +87,16 @@ def merge_pwd_parcels_gdf(
     return merged_gdf
 
 
+@register_source_loader("pwd_parcels")
+def pwd_parcels_loader() -> CartoLoader:
+    return CartoLoader(
+        name="PWD Parcels",
+        carto_queries=PWD_PARCELS_QUERY,
+        opa_col="brt_id",
+        validator=PWDParcelsInputValidator(),
+    )
+
+
 @validate_output(PWDParcelsOutputValidator)
 @provide_metadata(current_metadata=current_metadata)
 def pwd_parcels(
@@ -123,12 +134,7 @@ def pwd_parcels(
     Source:
         https://phl.carto.com/api/v2/sql
     """
-    loader = CartoLoader(
-        name="PWD Parcels",
-        carto_queries=PWD_PARCELS_QUERY,
-        opa_col="brt_id",
-        validator=PWDParcelsInputValidator(),
-    )
+    loader = pwd_parcels_loader()
 
     pwd_parcels, input_validation = loader.load_or_fetch()
 
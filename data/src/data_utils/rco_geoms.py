@@ -9,13 +9,23 @@ from src.validation.base import ValidationResult, validate_output
 from src.validation.rco_geoms import RCOGeomsOutputValidator, RCOGeomsInputValidator
 
 from ..classes.loaders import EsriLoader
+from ..classes.source_prefetch import register_source_loader
 from ..constants.services import RCOS_LAYERS_TO_LOAD
-from ..utilities import spatial_join
+from ..utilities import spatial_enrich
 
 pd.set_option("future.no_silent_downcasting", True)
 
 logger = logging.getLogger(__name__)
 
+RCO_SEPARATOR = "|"
+
+
+@register_source_loader("rco_geoms")
+def rco_geoms_loader() -> EsriLoader:
+    return EsriLoader(
+        name="RCOs", esri_urls=RCOS_LAYERS_TO_LOAD, validator=RCOGeomsInputValidator()
+    )
+
 
 @validate_output(RCOGeomsOutputValidator)
 @provide_metadata(current_metadata=current_metadata)
@@ -42,14 +52,13 @@ def rco_geoms(input_gdf: gpd.GeoDataFrame) -> Tuple[gpd.GeoDataFrame, Validation
         "https://services.arcgis.com/fLeGjb7u4uXqeF9q/ArcGIS/rest/services/Zoning_RCO/FeatureServer/0/"
 
     Notes:
-        Modifies various columns. Fillna and infer_objects is applied to most columns.
+        Parcels in several RCOs get the names and info of each, separated by "|". Parcels
+        outside every RCO get empty strings.
 
     Columns referenced:
         opa_id, geometry
     """
-    loader = EsriLoader(
-        name="RCOs", esri_urls=RCOS_LAYERS_TO_LOAD, validator=RCOGeomsInputValidator()
-    )
+    loader = rco_geoms_loader()
     rco_geoms, input_validation = loader.load_or_fetch()
 
     logger.debug(f"RCO data loaded: {len(rco_geoms)} RCO records")
@@ -90,95 +99,33 @@ def rco_geoms(input_gdf: gpd.GeoDataFrame) -> Tuple[gpd.GeoDataFrame, Validation
         "primary_phone",
     ]
 
-    rco_use_cols = ["rco_info", "rco_names", "geometry"]
-
-    # Aggregate RCO information into a single column
-    rco_geoms["rco_info"] = rco_geoms[rco_aggregate_cols].apply(
-        lambda x: "; ".join(map(str, x)), axis=1
+    # Each RCO's names and info, prefixed with the separator so that summing the strings of
+    # a parcel's RCOs joins them in one vectorized groupby (much faster than a str.join per
+    # parcel); the leading separator is stripped afterwards
+    rco_fields = rco_geoms[rco_aggregate_cols].fillna("").astype(str)
+    rco_geoms["rco_info"] = RCO_SEPARATOR + rco_fields["organization_name"].str.cat(
+        [rco_fields[col] for col in rco_aggregate_cols[1:]], sep="; "
     )
-
-    rco_geoms["rco_names"] = rco_geoms["organization_name"]
-
-    rco_geoms = rco_geoms[rco_use_cols].copy()
+    rco_geoms["rco_names"] = RCO_SEPARATOR + rco_fields["organization_name"]
 
     logger.debug(f"RCO data after processing: {len(rco_geoms)} records")
-    logger.debug(f"Sample RCO names: {rco_geoms['rco_names'].head().tolist()}")
-
-    # Perform spatial join
-    merged_gdf = spatial_join(input_gdf, rco_geoms)
-
-    logger.debug(f"After spatial join: {len(merged_gdf)} records")
-    logger.debug(f"Merged columns: {list(merged_gdf.columns)}")
-    logger.debug(
-        f"RCO columns present: {[col for col in ['rco_info', 'rco_names'] if col in merged_gdf.columns]}"
-    )
-    logger.debug(
-        f"Records with RCO data: {(merged_gdf['rco_names'].notna() & (merged_gdf['rco_names'] != '')).sum()}"
-    )
-    logger.debug(
-        f"Records without RCO data: {(merged_gdf['rco_names'].isna() | (merged_gdf['rco_names'] == '')).sum()}"
-    )
-    logger.debug(
-        f"Sample RCO names after join: {merged_gdf['rco_names'].head(5).tolist()}"
-    )
-    logger.debug(
-        f"Sample RCO info after join: {merged_gdf['rco_info'].head(5).tolist()}"
-    )
-
-    group_columns = [col for col in merged_gdf.columns if col not in rco_use_cols]
-    logger.debug(f"Group columns: {group_columns}")
-    logger.debug(f"RCO use columns: {rco_use_cols}")
 
-    # Ensure columns are appropriately filled and cast
-    for col in group_columns:
-        merged_gdf[col] = merged_gdf[col].fillna("").infer_objects(copy=False)
-
-    logger.debug(f"Before grouping: {len(merged_gdf)} records")
-    logger.debug(
-        f"Sample RCO names before grouping: {merged_gdf['rco_names'].head(5).tolist()}"
-    )
-    logger.debug(
-        f"Sample RCO info before grouping: {merged_gdf['rco_info'].head(5).tolist()}"
+    # Join the parcels to their RCOs, keeping one row per parcel with the names and info of
+    # all of its RCOs in layer order, and add only those two columns to the parcels
+    merged_gdf = spatial_enrich(
+        input_gdf,
+        rco_geoms,
+        {"rco_info": "sum", "rco_names": "sum"},
+        policy="aggregate",
     )
+    for col in ["rco_info", "rco_names"]:
+        merged_gdf[col] = merged_gdf[col].str[len(RCO_SEPARATOR) :].fillna("")
 
-    # Group by non-RCO columns and aggregate RCO data
-    merged_gdf = (
-        merged_gdf.groupby(group_columns)
-        .agg(
-            {
-                "rco_info": lambda x: "|".join(map(str, x)),
-                "rco_names": lambda x: "|".join(map(str, x)),
-                "geometry": "first",
-            }
-        )
-        .reset_index()
-    )
-
-    logger.debug(f"After grouping: {len(merged_gdf)} records")
     logger.debug(
-        f"Sample RCO names after grouping: {merged_gdf['rco_names'].head(5).tolist()}"
+        f"Records with RCO data: {(merged_gdf['rco_names'] != '').sum()} of {len(merged_gdf)}"
     )
     logger.debug(
-        f"Sample RCO info after grouping: {merged_gdf['rco_info'].head(5).tolist()}"
-    )
-    logger.debug(
-        f"Records with non-empty RCO names: {(merged_gdf['rco_names'].notna() & (merged_gdf['rco_names'] != '') & (merged_gdf['rco_names'] != 'nan')).sum()}"
-    )
-    logger.debug(
-        f"Records with non-empty RCO info: {(merged_gdf['rco_info'].notna() & (merged_gdf['rco_info'] != '') & (merged_gdf['rco_info'] != 'nan')).sum()}"
-    )
-
-    merged_gdf = gpd.GeoDataFrame(merged_gdf, geometry="geometry", crs=input_gdf.crs)
-    merged_gdf.drop_duplicates(inplace=True)
-
-    logger.debug(f"Final result: {len(merged_gdf)} records")
-    logger.debug(f"Final RCO names null count: {merged_gdf['rco_names'].isna().sum()}")
-    logger.debug(f"Final RCO info null count: {merged_gdf['rco_info'].isna().sum()}")
-    logger.debug(
-        f"Final RCO names empty string count: {(merged_gdf['rco_names'] == '').sum()}"
-    )
-    logger.debug(
-        f"Final RCO info empty string count: {(merged_gdf['rco_info'] == '').sum()}"
+        f"Sample RCO names after join: {merged_gdf['rco_names'].head(5).tolist()}"
     )
 
     return merged_gdf, input_validation
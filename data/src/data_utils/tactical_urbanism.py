@@ -2,10 +2,24 @@ from typing import Tuple
 
 import geopandas as gpd
 
+from src.classes.decision_table import DecisionTable, Rule, flag
 from src.metadata.metadata_utils import current_metadata, provide_metadata
 from src.validation.base import ValidationResult, validate_output
 from src.validation.tactical_urbanism import TacticalUrbanismOutputValidator
 
+TACTICAL_URBANISM = DecisionTable(
+    rules=[
+        Rule(
+            lambda gdf: (gdf["parcel_type"] == "Land")
+            & ~flag(gdf["unsafe_building"])
+            & ~flag(gdf["imm_dang_building"]),
+            True,
+        )
+    ],
+    default=False,
+    dtype=bool,
+)
+
 
 @validate_output(TacticalUrbanismOutputValidator)
 @provide_metadata(current_metadata=current_metadata)
@@ -33,19 +47,5 @@ def tactical_urbanism(
     Returns:
         The input GeoDataFrame with a new column 'tactical_urbanism' added to its GeoDataFrame.
     """
-    tactical_urbanism_values = []
-
-    for idx, row in input_gdf.iterrows():
-        if (
-            row["parcel_type"] == "Land"
-            and not row["unsafe_building"]
-            and not row["imm_dang_building"]
-        ):
-            tactical_urbanism = True
-        else:
-            tactical_urbanism = False
-
-        tactical_urbanism_values.append(tactical_urbanism)
-
-    input_gdf["tactical_urbanism"] = tactical_urbanism_values
+    input_gdf["tactical_urbanism"] = TACTICAL_URBANISM.evaluate(input_gdf)
     return input_gdf, ValidationResult(True)
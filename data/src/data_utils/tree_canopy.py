@@ -4,15 +4,15 @@ import zipfile
 from typing import Tuple
 
 import geopandas as gpd
-import requests
 
 from src.classes.file_manager import FileManager, LoadType
 from src.metadata.metadata_utils import current_metadata, provide_metadata
 from src.validation.base import ValidationResult, validate_output
 from src.validation.tree_canopy import TreeCanopyOutputValidator
 
+from ..classes import http_client
 from ..classes.loaders import GdfLoader
-from ..utilities import spatial_join
+from ..utilities import spatial_enrich
 
 file_manager = FileManager()
 
@@ -69,7 +69,7 @@ def tree_canopy(
 
     # Download and extract tree canopy data
     print(f"[TREE_CANOPY] Downloading from: {tree_url}")
-    tree_response = requests.get(tree_url)
+    tree_response = http_client.get(tree_url)
     print(
         f"[TREE_CANOPY] Download completed, content length: {len(tree_response.content)}"
     )
@@ -107,16 +107,6 @@ def tree_canopy(
     phl_trees.rename(columns={"tc_gap": "tree_canopy_gap"}, inplace=True)
 
     # Perform spatial join
-    merged_gdf = spatial_join(input_gdf, phl_trees)
-
-    # Remove duplicate OPA IDs in the main dataset after spatial join
-    before_dedup = len(merged_gdf)
-    merged_gdf = merged_gdf.drop_duplicates(subset=["opa_id"], keep="first")
-    after_dedup = len(merged_gdf)
-    if before_dedup != after_dedup:
-        print(
-            f"Removed {before_dedup - after_dedup} duplicate OPA IDs from main dataset after spatial join"
-        )
-        print(f"Main dataset after deduplication: {len(merged_gdf)} records")
+    merged_gdf = spatial_enrich(input_gdf, phl_trees, ["tree_canopy_gap"])
 
     return merged_gdf, input_validation
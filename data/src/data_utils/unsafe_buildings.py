@@ -11,12 +11,23 @@ from src.validation.unsafe_buildings import (
 )
 
 from ..classes.loaders import CartoLoader
+from ..classes.source_prefetch import register_source_loader
 from ..constants.services import UNSAFE_BUILDINGS_QUERY
 from ..utilities import opa_join
 
 logger = logging.getLogger(__name__)
 
 
+@register_source_loader("unsafe_buildings")
+def unsafe_buildings_loader() -> CartoLoader:
+    return CartoLoader(
+        name="Unsafe Buildings",
+        carto_queries=UNSAFE_BUILDINGS_QUERY,
+        opa_col="opa_account_num",
+        validator=UnsafeBuildingsInputValidator(),
+    )
+
+
 @validate_output(UnsafeBuildingsOutputValidator)
 @provide_metadata(current_metadata=current_metadata)
 def unsafe_buildings(
@@ -45,12 +56,7 @@ def unsafe_buildings(
     Source:
         https://phl.carto.com/api/v2/sql
     """
-    loader = CartoLoader(
-        name="Unsafe Buildings",
-        carto_queries=UNSAFE_BUILDINGS_QUERY,
-        opa_col="opa_account_num",
-        validator=UnsafeBuildingsInputValidator(),
-    )
+    loader = unsafe_buildings_loader()
 
     unsafe_buildings, input_validation = loader.load_or_fetch()
 
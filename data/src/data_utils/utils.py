@@ -1,6 +1,6 @@
 import os
 
-import requests
+from src.classes import http_client
 
 
 def save_stream_url(url: str) -> str:
@@ -16,7 +16,7 @@ def save_stream_url(url: str) -> str:
     if os.path.exists(local_filename):
         return local_filename
 
-    with requests.get(url, stream=True) as r:
+    with http_client.get(url, stream=True) as r:
         r.raise_for_status()
         with open(local_filename, "wb") as f:
             for chunk in r.iter_content(chunk_size=8192):
@@ -14,6 +14,7 @@ from src.validation.vacant_properties import (
 )
 
 from ..classes.loaders import EsriLoader, google_cloud_bucket
+from ..classes.source_prefetch import register_source_loader
 from ..constants.services import VACANT_PROPS_LAYERS_TO_LOAD
 
 
@@ -99,6 +100,16 @@ def check_null_percentage(df: pd.DataFrame, threshold: float = 0.05) -> None:
             )
 
 
+@register_source_loader("vacant_properties")
+def vacant_properties_loader() -> EsriLoader:
+    return EsriLoader(
+        name="Vacant Properties",
+        esri_urls=VACANT_PROPS_LAYERS_TO_LOAD,
+        cols=["opa_id", "parcel_type"],
+        validator=VacantPropertiesInputValidator(),
+    )
+
+
 @validate_output(VacantPropertiesOutputValidator)
 @provide_metadata(current_metadata=current_metadata)
 def vacant_properties(
@@ -127,12 +138,7 @@ def vacant_properties(
         - The vacant land data is below the threshold, so backup data is loaded from local files.
         - The vacant buildings data is below the threshold, so backup data is loaded from local files.
     """
-    loader = EsriLoader(
-        name="Vacant Properties",
-        esri_urls=VACANT_PROPS_LAYERS_TO_LOAD,
-        cols=["opa_id", "parcel_type"],
-        validator=VacantPropertiesInputValidator(),
-    )
+    loader = vacant_properties_loader()
 
     vacant_properties, input_validation = loader.load_or_fetch()
 
@@ -9,11 +9,15 @@ import pandas as pd
 from src.classes.data_diff import DiffReport
 from src.classes.file_manager import FileManager, FileType, LoadType
 from src.classes.loaders import generate_pmtiles
+from src.classes.service_scheduler import ServiceScheduler
+from src.classes.source_prefetch import prefetch_sources
 from src.classes.slack_reporters import SlackReporter
 from src.config.config import (
     enable_statistical_summaries,
     get_logger,
     log_level,
+    max_service_workers,
+    prefetch_max_workers,
 )
 from src.data_utils import (
     access_process,
@@ -24,10 +28,8 @@ from src.data_utils import (
     council_dists,
     delinquencies,
     dev_probability,
-    drug_crimes,
-    gun_crimes,
     imm_dang_buildings,
-    li_complaints,
+    incident_densities,
     li_violations,
     nbhoods,
     negligent_devs,
@@ -80,10 +82,8 @@ def main():
             ppr_properties,
             owner_type,
             li_violations,
-            li_complaints,
             tree_canopy,
-            gun_crimes,
-            drug_crimes,
+            incident_densities,  # li_complaints, gun_crimes and drug_crimes in one KDE batch
             delinquencies,
             unsafe_buildings,
             imm_dang_buildings,
@@ -99,6 +99,13 @@ def main():
 
         pipeline_errors = {}
 
+        # Fetch every service's source data into the source cache up front, concurrently,
+        # so the services read their data from disk instead of fetching it one by one
+        prefetch_sources(
+            ["opa_properties", *(service.__name__ for service in services)],
+            max_workers=prefetch_max_workers,
+        )
+
         pipeline_logger.info("Loading OPA properties dataset.")
         dataset, opa_validation = opa_properties(gdf=gpd.GeoDataFrame())
         pipeline_logger.info("OPA properties loaded.")
@@ -126,19 +133,21 @@ def main():
         if not opa_validation["input"] or not opa_validation["output"]:
             pipeline_errors["opa_properties"] = opa_validation
 
-        for i, service in enumerate(services, 1):
-            service_name = service.__name__
-            pipeline_logger.info(f"{'=' * 60}")
-            pipeline_logger.info(f"{i}/{len(services)}: {service_name}")
-            pipeline_logger.info(f"{'=' * 60}")
-
-            # Call the service function (with validation decorator)
+        def run_service(service, gdf):
             # Apply context manager specifically for phs_properties to enable statistical summaries
-            if service_name == "phs_properties":
+            if service.__name__ == "phs_properties":
                 with enable_statistical_summaries():
-                    dataset, validation = service(dataset)
-            else:
-                dataset, validation = service(dataset)
+                    return service(gdf)
+            return service(gdf)
+
+        completed_count = 0
+
+        def on_service_complete(service_name, dataset, validation):
+            nonlocal completed_count
+            completed_count += 1
+            pipeline_logger.info(f"{'=' * 60}")
+            pipeline_logger.info(f"{completed_count}/{len(services)}: {service_name}")
+            pipeline_logger.info(f"{'=' * 60}")
 
             pipeline_logger.info(f"{service_name} completed.")
             pipeline_logger.info(f"Dataset shape: {dataset.shape}")
@@ -154,7 +163,7 @@ def main():
 
             # Error checking - all services should return dict with input/output keys
             if not validation["input"] or not validation["output"]:
-                pipeline_errors[service.__name__] = validation
+                pipeline_errors[service_name] = validation
 
             # Memory check
             try:
@@ -167,6 +176,10 @@ def main():
             except ImportError:
                 pass
 
+        # Services with no overlapping columns run concurrently; see ServiceScheduler
+        scheduler = ServiceScheduler(services, max_workers=max_service_workers)
+        dataset = scheduler.run(dataset, run_service, on_service_complete)
+
         # Save metadata
         try:
             if current_metadata:
@@ -215,7 +215,7 @@ def provide_metadata(current_metadata: List[dict[str, Any]]):
 
     def decorator(func):
         @functools.wraps(func)
-        def wrapper(gdf: gpd.GeoDataFrame):
+        def wrapper(gdf: gpd.GeoDataFrame, *args, **kwargs):
             # Run the function and collect metadata
             # including start time, end time, and duration
 
@@ -224,7 +224,7 @@ def provide_metadata(current_metadata: List[dict[str, Any]]):
             start_time_str = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
             start_time = time.time()
 
-            end_gdf, validation = func(gdf)
+            end_gdf, validation = func(gdf, *args, **kwargs)
 
             end_time = time.time()
             end_time_str = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
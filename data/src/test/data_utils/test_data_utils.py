@@ -1,3 +1,6 @@
+import os
+import re
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -5,18 +8,26 @@ import geopandas as gpd
 import numpy as np
 import pandas as pd
 import pytest
-from shapely.geometry import LineString, MultiPolygon, Point, Polygon
+from shapely.geometry import LineString, MultiPolygon, Point, Polygon, box
 
 from src.config.config import USE_CRS
 from src.constants.services import PARK_PRIORITY_AREAS_URBAN_PHL
 
 # Import the raw business logic function (no decorator)
+from src.data_utils.contig_neighbors import contig_neighbors
+from src.data_utils.li_violations import count_violations
+from src.data_utils.opa_properties import (
+    replacements,
+    standardize_street,
+    standardize_street_vectorized,
+)
 from src.data_utils.park_priority import _park_priority_logic
 from src.data_utils.ppr_properties import ppr_properties
 from src.data_utils.pwd_parcels import (
     merge_pwd_parcels_gdf,
     transform_pwd_parcels_gdf,
 )
+from src.data_utils.rco_geoms import rco_geoms
 from src.data_utils.vacant_properties import vacant_properties
 from src.validation.base import ValidationResult
 
@@ -45,9 +56,9 @@ class TestDataUtils(unittest.TestCase):
         )
 
     @patch("src.data_utils.park_priority.EsriLoader")
-    @patch("src.data_utils.park_priority.spatial_join")
+    @patch("src.data_utils.park_priority.spatial_enrich")
     def test_park_priority_basic_functionality(
-        self, mock_spatial_join, mock_esri_loader_class
+        self, mock_spatial_enrich, mock_esri_loader_class
     ):
         """Test core workflow: load data, rename column, spatial join, return tuple"""
 
@@ -88,7 +99,7 @@ class TestDataUtils(unittest.TestCase):
             },
             crs=USE_CRS,
         )
-        mock_spatial_join.return_value = expected_result_gdf
+        mock_spatial_enrich.return_value = expected_result_gdf
 
         # Call the raw business logic function (no decorator)
         result_gdf, validation_result = _park_priority_logic(input_gdf)
@@ -106,9 +117,9 @@ class TestDataUtils(unittest.TestCase):
         mock_loader_instance.load_or_fetch.assert_called_once()
 
         # Check spatial join was called with correct data
-        # Note: The function renames 'parkneed' to 'park_priority' before calling spatial_join
-        call_args = mock_spatial_join.call_args
-        second_arg = call_args[0][1]  # The second argument to spatial_join
+        # Note: The function renames 'parkneed' to 'park_priority' before calling spatial_enrich
+        call_args = mock_spatial_enrich.call_args
+        second_arg = call_args[0][1]  # The second argument to spatial_enrich
         self.assertIn("park_priority", second_arg.columns)
         self.assertNotIn("parkneed", second_arg.columns)
 
@@ -135,9 +146,9 @@ class TestDataUtils(unittest.TestCase):
         self.assertIs(validation_result, mock_validation_result)
 
     @patch("src.data_utils.park_priority.EsriLoader")
-    @patch("src.data_utils.park_priority.spatial_join")
+    @patch("src.data_utils.park_priority.spatial_enrich")
     def test_park_priority_column_renaming(
-        self, mock_spatial_join, mock_esri_loader_class
+        self, mock_spatial_enrich, mock_esri_loader_class
     ):
         """Test parkneed → park_priority column renaming"""
 
@@ -176,15 +187,15 @@ class TestDataUtils(unittest.TestCase):
             },
             crs=USE_CRS,
         )
-        mock_spatial_join.return_value = expected_result_gdf
+        mock_spatial_enrich.return_value = expected_result_gdf
 
         # Call the raw business logic function
         result_gdf, validation_result = _park_priority_logic(input_gdf)
 
-        # Check that the column was renamed in the data passed to spatial_join
-        # The function should rename 'parkneed' to 'park_priority' before calling spatial_join
-        call_args = mock_spatial_join.call_args
-        second_arg = call_args[0][1]  # The second argument to spatial_join
+        # Check that the column was renamed in the data passed to spatial_enrich
+        # The function should rename 'parkneed' to 'park_priority' before calling spatial_enrich
+        call_args = mock_spatial_enrich.call_args
+        second_arg = call_args[0][1]  # The second argument to spatial_enrich
 
         # Check that the column was renamed
         self.assertIn("park_priority", second_arg.columns)
@@ -213,9 +224,9 @@ class TestDataUtils(unittest.TestCase):
         self.assertIs(validation_result, mock_validation_result)
 
     @patch("src.data_utils.park_priority.EsriLoader")
-    @patch("src.data_utils.park_priority.spatial_join")
+    @patch("src.data_utils.park_priority.spatial_enrich")
     def test_park_priority_pennsylvania_filtering(
-        self, mock_spatial_join, mock_esri_loader_class
+        self, mock_spatial_enrich, mock_esri_loader_class
     ):
         """Test EsriLoader called with correct PA filter"""
 
@@ -244,7 +255,7 @@ class TestDataUtils(unittest.TestCase):
             park_priority_gdf,
             mock_validation_result,
         )
-        mock_spatial_join.return_value = input_gdf
+        mock_spatial_enrich.return_value = input_gdf
 
         # Call the raw business logic function
         _park_priority_logic(input_gdf)
@@ -262,8 +273,10 @@ class TestDataUtils(unittest.TestCase):
         self.assertIn("rg_abbrev", call_args[1]["cols"])
 
     @patch("src.data_utils.park_priority.EsriLoader")
-    @patch("src.data_utils.park_priority.spatial_join")
-    def test_park_priority_empty_data(self, mock_spatial_join, mock_esri_loader_class):
+    @patch("src.data_utils.park_priority.spatial_enrich")
+    def test_park_priority_empty_data(
+        self, mock_spatial_enrich, mock_esri_loader_class
+    ):
         """Test behavior when no park priority data available"""
 
         # Setup mock input data
@@ -287,7 +300,7 @@ class TestDataUtils(unittest.TestCase):
         )
 
         # Setup mock spatial join result (should be same as input when no data)
-        mock_spatial_join.return_value = input_gdf
+        mock_spatial_enrich.return_value = input_gdf
 
         # Call the raw business logic function
         result_gdf, validation_result = _park_priority_logic(input_gdf)
@@ -314,13 +327,13 @@ class TestDataUtils(unittest.TestCase):
         # Check validation result
         self.assertIs(validation_result, mock_validation_result)
 
-        # Check that spatial_join was still called (even with empty data)
-        mock_spatial_join.assert_called_once()
+        # Check that spatial_enrich was still called (even with empty data)
+        mock_spatial_enrich.assert_called_once()
 
     @patch("src.data_utils.park_priority.EsriLoader")
-    @patch("src.data_utils.park_priority.spatial_join")
+    @patch("src.data_utils.park_priority.spatial_enrich")
     def test_park_priority_return_format(
-        self, mock_spatial_join, mock_esri_loader_class
+        self, mock_spatial_enrich, mock_esri_loader_class
     ):
         """Test returns correct tuple structure"""
 
@@ -355,7 +368,7 @@ class TestDataUtils(unittest.TestCase):
             {"opa_id": ["123"], "park_priority": [5.0], "geometry": [Point(0, 0)]},
             crs=USE_CRS,
         )
-        mock_spatial_join.return_value = expected_result_gdf
+        mock_spatial_enrich.return_value = expected_result_gdf
 
         # Call the raw business logic function
         result = _park_priority_logic(input_gdf)
@@ -391,6 +404,126 @@ class TestDataUtils(unittest.TestCase):
         # Check validation result
         self.assertIs(validation_result, mock_validation_result)
 
+    @patch("src.data_utils.rco_geoms.rco_geoms_loader")
+    def test_rco_geoms_joins_names_per_parcel(self, mock_loader):
+        """Test that parcels get the names of all their RCOs and other columns are untouched"""
+        input_gdf = gpd.GeoDataFrame(
+            {
+                "opa_id": ["1", "2", "3"],
+                "zoning": ["RSA5", None, "CMX2"],
+                "geometry": [Point(1005, 5), Point(1015, 5), Point(1050, 50)],
+            },
+            crs=USE_CRS,
+        )
+        rcos = gpd.GeoDataFrame(
+            {
+                "organization_name": ["North", "East"],
+                "organization_address": ["1 Main St", None],
+                "primary_email": ["n@example.org", "e@example.org"],
+                "primary_phone": ["555-0100", "555-0101"],
+                "geometry": [
+                    Polygon([(1000, 0), (1020, 0), (1020, 10), (1000, 10)]),
+                    Polygon([(1010, 0), (1030, 0), (1030, 10), (1010, 10)]),
+                ],
+            },
+            crs=USE_CRS,
+        )
+        mock_loader.return_value.load_or_fetch.return_value = (
+            rcos,
+            ValidationResult(True),
+        )
+
+        result, _ = rco_geoms.__wrapped__.__wrapped__(input_gdf.copy())
+
+        self.assertListEqual(list(result["rco_names"]), ["North", "North|East", ""])
+        self.assertEqual(
+            result.loc[1, "rco_info"],
+            "North; 1 Main St; n@example.org; 555-0100|East; ; e@example.org; 555-0101",
+        )
+        self.assertListEqual(list(result["opa_id"]), ["1", "2", "3"])
+        self.assertIsNone(result.loc[1, "zoning"])
+
+    def test_count_violations(self):
+        """Test that only keyword violations are counted, and open ones separately"""
+        violations = pd.DataFrame(
+            {
+                "opa_id": ["1", "1", "1", "2", "2", None],
+                "violationnumber": ["a", "b", "c", "d", None, "f"],
+                "violationcodetitle": [
+                    "VACANT LOT - WEEDS",
+                    "Rubbish Accumulation",
+                    "PERMIT REQUIRED",
+                    None,
+                    "GRAFFITI",
+                    "TRASH",
+                ],
+                "violationstatus": ["OPEN", "COMPLIED", "OPEN", "OPEN", "OPEN", "OPEN"],
+            }
+        )
+
+        counts = count_violations(violations)
+
+        self.assertListEqual(list(counts["opa_id"]), ["1"])
+        self.assertListEqual(list(counts["all_violations_past_year"]), [2])
+        self.assertListEqual(list(counts["open_violations_past_year"]), [1])
+
+    def test_contig_neighbors_counts_component_members(self):
+        """Test that vacant parcels count the other vacant parcels they connect to"""
+        parcels = gpd.GeoDataFrame(
+            {
+                "opa_id": ["1", "2", "3", "4", "5", "6"],
+                "vacant": [True, True, True, True, False, True],
+                "geometry": [
+                    box(0, 0, 1, 1),
+                    box(1, 0, 2, 1),
+                    box(2, 1, 3, 2),  # Touches parcel 2 at a corner only
+                    box(10, 10, 11, 11),
+                    box(11, 10, 12, 11),  # Not vacant, so it doesn't join 4 and 6
+                    box(12, 10, 13, 11),
+                ],
+            },
+            crs=USE_CRS,
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            with patch(
+                "src.data_utils.contig_neighbors.PARCEL_ADJACENCY_PATH",
+                os.path.join(directory, "parcel_adjacency.npz"),
+            ):
+                result, _ = contig_neighbors.__wrapped__.__wrapped__(parcels)
+
+        self.assertListEqual(
+            list(result["n_contiguous"].fillna(-1)), [2, 2, 2, 0, -1, 0]
+        )
+
+    def test_standardize_street_matches_sequential_replacements(self):
+        """Test that the combined pattern gives the result of each replacement in turn"""
+        streets = pd.Series(
+            [
+                "1234 North Broad Street Suite 5",
+                "100 W Lancaster Avenue FLR 2",
+                "55 La Lane",
+                "200 Benjamin Franklin Parkway",
+                "1 Eastwick Rd Third Floor",
+                "northeast st",
+                "FIRST AVENUE",
+                None,
+                "",
+            ],
+            index=list("abcdefghi"),
+        )
+
+        def sequential(street):
+            for full, abbr in replacements.items():
+                street = re.sub(rf"\b{full}\b", abbr, street, flags=re.IGNORECASE)
+            return street
+
+        expected = streets.astype(str).map(sequential)
+
+        pd.testing.assert_series_equal(standardize_street_vectorized(streets), expected)
+        self.assertEqual(standardize_street(streets["a"]), expected["a"])
+        self.assertEqual(expected["a"], "1234 N Broad ST STE 5")
+
     @pytest.mark.skip
     def test_ppr_properties(self):
         """
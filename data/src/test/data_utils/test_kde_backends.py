@@ -0,0 +1,122 @@
+import unittest
+from unittest.mock import patch
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+from src.constants.city_limits import PHL_GEOMETRY
+from src.data_utils.kde import (
+    KDELayer,
+    apply_kde_layers,
+    apply_kde_to_input,
+    city_grid_mask,
+    grid_pixels,
+    grid_transform,
+    predict_in_pool,
+)
+from src.validation.base import ValidationResult
+
+
+class SumModel:
+    """A picklable stand-in for a fitted KDE."""
+
+    def predict(self, points):
+        return points.sum(axis=1)
+
+
+class TestKDEBackends(unittest.TestCase):
+    def test_predict_in_pool_fills_every_chunk(self):
+        grid_points = np.random.default_rng(0).random((1005, 2))
+
+        z = predict_in_pool(SumModel(), grid_points, batch_size=100)
+
+        np.testing.assert_allclose(z, grid_points.sum(axis=1))
+
+    def test_city_grid_mask_covers_the_city(self):
+        min_x, min_y, max_x, max_y = PHL_GEOMETRY.bounds
+        x_grid = np.linspace(min_x - 5000, max_x + 5000, 200)
+        y_grid = np.linspace(min_y - 5000, max_y + 5000, 200)
+        xx, yy = np.meshgrid(x_grid, y_grid)
+
+        mask = city_grid_mask(
+            x_grid[0],
+            x_grid[1] - x_grid[0],
+            y_grid[0],
+            y_grid[1] - y_grid[0],
+            len(x_grid),
+            len(y_grid),
+        )
+
+        inside = shapely.contains_xy(PHL_GEOMETRY, xx, yy)
+        self.assertFalse((inside & ~mask).any())
+        self.assertLess(mask.mean(), 0.5)
+
+    def test_grid_pixels_picks_the_nearest_node(self):
+        x_grid = np.linspace(0, 100, 11)
+        y_grid = np.linspace(0, 50, 6)
+
+        rows, cols = grid_pixels(
+            grid_transform(x_grid, y_grid),
+            (len(y_grid), len(x_grid)),
+            np.array([14.0, 16.0, 100.0, -30.0]),
+            np.array([26.0, 24.0, 0.0, 80.0]),
+        )
+
+        np.testing.assert_array_equal(rows, [3, 2, 0, 5])
+        np.testing.assert_array_equal(cols, [1, 2, 10, 0])
+
+    @patch("src.data_utils.kde.kde_backend", "binned")
+    def test_apply_kde_layers_adds_columns_per_layer(self):
+        center = np.array(PHL_GEOMETRY.centroid.coords[0])
+        rng = np.random.default_rng(0)
+        points = {
+            "Gun Crimes": center + rng.normal(0, 3000, (300, 2)),
+            "L and I Complaints": center + rng.normal(5000, 2000, (200, 2)),
+        }
+        layers = [KDELayer(name, "") for name in points]
+        properties = gpd.GeoDataFrame(
+            geometry=gpd.points_from_xy(*(center + rng.normal(0, 4000, (50, 2))).T)
+        )
+
+        with patch(
+            "src.data_utils.kde.load_incident_points",
+            side_effect=lambda layer: (points[layer.name], ValidationResult(True)),
+        ):
+            result, validations = apply_kde_layers(properties, layers, resolution=100)
+
+        self.assertEqual(len(validations), 2)
+        for column in ("gun_crimes_density", "l_and_i_complaints_density"):
+            self.assertGreater(result[column].max(), 0)
+            self.assertEqual(result[f"{column}_percentile"].max(), 100)
+            self.assertEqual(result[f"{column}_label"].iloc[0][-10:], "Percentile")
+        self.assertFalse(
+            np.allclose(
+                result["gun_crimes_density"], result["l_and_i_complaints_density"]
+            )
+        )
+
+    def test_apply_kde_to_input_samples_the_surface_in_memory(self):
+        x_grid = np.linspace(0, 300, 4)
+        y_grid = np.linspace(0, 200, 3)
+        zz = np.arange(12, dtype=float).reshape(3, 4)
+        properties = gpd.GeoDataFrame(
+            geometry=gpd.points_from_xy([0, 310, 190, 120], [0, 20, 180, 110])
+        )
+
+        with patch(
+            "src.data_utils.kde.generic_kde",
+            return_value=(
+                zz,
+                grid_transform(x_grid, y_grid),
+                None,
+                ValidationResult(True),
+            ),
+        ):
+            result, _ = apply_kde_to_input(properties, "Gun Crimes", "")
+
+        self.assertListEqual(list(result["gun_crimes_density"]), [0.0, 3.0, 10.0, 5.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,257 @@
+import unittest
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from shapely.geometry import Point
+
+from src.config.config import USE_CRS
+from src.data_utils.access_process import access_process
+from src.data_utils.conservatorship import conservatorship
+from src.data_utils.owner_type import owner_type
+from src.data_utils.priority_level import priority_level
+from src.data_utils.tactical_urbanism import tactical_urbanism
+
+# Row-wise reference implementations: the logic the services used before they were
+# expressed as decision tables, kept to check that the tables give the same results
+
+
+def reference_priority_level(row) -> str:
+    guncrime_density_zscore = row["gun_crimes_density_zscore"]
+    in_phs_landcare = pd.notna(row["phs_care_program"])
+    has_violation_or_high_density = (
+        float(row["all_violations_past_year"]) > 0
+        or row["l_and_i_complaints_density_zscore"] > 0
+    )
+    very_low_tree_canopy = row["tree_canopy_gap"] >= 0.3
+
+    if guncrime_density_zscore <= 0:
+        return "Low"
+    elif guncrime_density_zscore > 1:
+        if has_violation_or_high_density:
+            return "High"
+        if in_phs_landcare:
+            return "High" if very_low_tree_canopy else "Medium"
+        return "High"
+    else:
+        if has_violation_or_high_density:
+            if in_phs_landcare:
+                return "Medium"
+            return "High" if very_low_tree_canopy else "Medium"
+        return "Low"
+
+
+def reference_access_process(row):
+    if not row.get("vacant", False):
+        return pd.NA
+    city_owner_agency = row["city_owner_agency"]
+    market_value_over_1000 = row["market_value"] and float(row["market_value"]) > 1000
+    if city_owner_agency == "Land Bank (PHDC)":
+        return "Go through Land Bank"
+    elif city_owner_agency == "PRA":
+        return "Do Nothing"
+    elif market_value_over_1000:
+        return "Private Land Use Agreement"
+    return "Buy Property"
+
+
+def reference_tactical_urbanism(row) -> bool:
+    return bool(
+        row["parcel_type"] == "Land"
+        and not row["unsafe_building"]
+        and not row["imm_dang_building"]
+    )
+
+
+def reference_owner_type(row) -> str:
+    owner1 = str(row["owner_1"]).lower()
+    owner2 = str(row["owner_2"]).lower()
+    address = str(row.get("standardized_mailing_address", "")).lower()
+
+    if pd.notna(row["city_owner_agency"]):
+        return "Public"
+    if (
+        "po box 3362, harrisburg pa, 17105" in address
+        or "7000 geerdes blvd" in address
+        or "400 n capitol st nw, washington dc, 20001" in address
+        or "200 n radnor chester rd, st davids pa, 19087" in address
+    ):
+        return "Public"
+    if (
+        "new kensington cdc" in owner1
+        or ("strawberry mansion" in owner1 and "citizens council" in owner2)
+        or "habitat for humanity" in owner1
+        or "norris square civic assoc" in owner1
+        or "neighborhood gardens asso" in owner1
+        or "neighborhood gardens trust" in owner1
+        or "east parkside community r" in owner1
+        or "civic" in owner1
+        or "civic" in owner2
+        or "cdc" in owner1
+        or "cdc" in owner2
+    ):
+        return "Nonprofit/Civic"
+    if " llc" in owner1 or " llc" in owner2:
+        return "Business (LLC)"
+    return "Individual"
+
+
+RUN_DATE = pd.Timestamp("2025-07-01 12:00", tz="US/Eastern")
+
+
+def reference_conservatorship(row) -> bool:
+    market_value_over_1000 = row["market_value"] and float(row["market_value"]) > 1000
+    violations_exist = float(row["all_violations_past_year"]) > 0
+    sale_date_6_months_ago = pd.notna(row["sale_date"]) and row[
+        "sale_date"
+    ] <= RUN_DATE - pd.Timedelta(days=180)
+
+    if row["city_owner_agency"] == "Land Bank (PHDC)" or (
+        not sale_date_6_months_ago and market_value_over_1000
+    ):
+        return False
+    if violations_exist and not row["sheriff_sale"] and sale_date_6_months_ago:
+        return True
+    return False
+
+
+def random_properties(size: int, seed: int = 0) -> gpd.GeoDataFrame:
+    """
+    Random property rows covering every branch of the three services, including missing
+    values where the pipeline can produce them.
+    """
+    rng = np.random.default_rng(seed)
+
+    def with_missing(values, fraction=0.1):
+        values = values.astype(object)
+        values[rng.random(size) < fraction] = np.nan
+        return values
+
+    return gpd.GeoDataFrame(
+        {
+            "opa_id": [str(i) for i in range(size)],
+            "gun_crimes_density_zscore": with_missing(rng.normal(0.5, 1, size)).astype(
+                float
+            ),
+            "l_and_i_complaints_density_zscore": with_missing(
+                rng.normal(0, 1, size)
+            ).astype(float),
+            "all_violations_past_year": with_missing(
+                rng.integers(0, 3, size).astype(float)
+            ).astype(float),
+            "tree_canopy_gap": with_missing(rng.random(size) * 0.6).astype(float),
+            "phs_care_program": with_missing(
+                rng.choice(np.array([None, "PHS"], dtype=object), size)
+            ),
+            "vacant": rng.random(size) < 0.5,
+            "city_owner_agency": rng.choice(
+                np.array(["Land Bank (PHDC)", "PRA", "PHA", None], dtype=object), size
+            ),
+            "market_value": with_missing(
+                rng.choice([0.0, 500.0, 1000.0, 1500.0, 250000.0], size)
+            ),
+            "parcel_type": rng.choice(["Land", "Building"], size),
+            "unsafe_building": rng.random(size) < 0.2,
+            "imm_dang_building": rng.random(size) < 0.2,
+            "owner_1": rng.choice(
+                np.array(
+                    [
+                        "SMITH JOHN",
+                        "123 MAIN ST LLC",
+                        "STRAWBERRY MANSION",
+                        "HABITAT FOR HUMANITY PHIL",
+                        "NORRIS SQUARE CIVIC ASSOC",
+                        "NEW KENSINGTON CDC",
+                        "EAST PARKSIDE COMMUNITY R",
+                        None,
+                    ],
+                    dtype=object,
+                ),
+                size,
+            ),
+            "owner_2": rng.choice(
+                np.array(
+                    ["CITIZENS COUNCIL", "HOLDINGS LLC", "SMITH JANE", "CDC", None],
+                    dtype=object,
+                ),
+                size,
+            ),
+            "standardized_mailing_address": rng.choice(
+                np.array(
+                    [
+                        "PO BOX 3362, HARRISBURG PA, 17105",
+                        "7000 Geerdes Blvd, King of Prussia PA, 19406",
+                        "400 N Capitol St NW, Washington DC, 20001",
+                        "1234 Market St, Philadelphia PA, 19107",
+                        None,
+                    ],
+                    dtype=object,
+                ),
+                size,
+            ),
+            "sheriff_sale": rng.random(size) < 0.3,
+            "sale_date": pd.to_datetime(
+                rng.choice(
+                    np.array(
+                        [
+                            "2024-12-01T00:00:00Z",
+                            "2025-01-02T04:59:00Z",
+                            "2025-01-02T05:01:00Z",
+                            "2025-06-01T00:00:00Z",
+                            None,
+                        ],
+                        dtype=object,
+                    ),
+                    size,
+                ),
+                utc=True,
+            ),
+            "geometry": [Point(i, i) for i in range(size)],
+        },
+        crs=USE_CRS,
+    )
+
+
+class TestRuleEquivalence(unittest.TestCase):
+    def setUp(self):
+        self.properties = random_properties(2000)
+
+    def assert_matches_reference(self, service, column, reference, **kwargs):
+        expected = [reference(row) for _, row in self.properties.iterrows()]
+        result, _ = service.__wrapped__.__wrapped__(self.properties.copy(), **kwargs)
+
+        for i, (actual, wanted) in enumerate(zip(result[column], expected)):
+            if pd.isna(wanted):
+                self.assertTrue(pd.isna(actual), f"{column} differs at row {i}")
+            else:
+                self.assertEqual(actual, wanted, f"{column} differs at row {i}")
+
+    def test_priority_level(self):
+        self.assert_matches_reference(
+            priority_level, "priority_level", reference_priority_level
+        )
+
+    def test_access_process(self):
+        self.assert_matches_reference(
+            access_process, "access_process", reference_access_process
+        )
+
+    def test_tactical_urbanism(self):
+        self.assert_matches_reference(
+            tactical_urbanism, "tactical_urbanism", reference_tactical_urbanism
+        )
+
+    def test_owner_type(self):
+        self.assert_matches_reference(owner_type, "owner_type", reference_owner_type)
+
+    def test_conservatorship(self):
+        self.assert_matches_reference(
+            conservatorship,
+            "conservatorship",
+            reference_conservatorship,
+            run_date=RUN_DATE,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.classes.address_index import AddressIndex, address_keys
+
+
+class TestAddressIndex(unittest.TestCase):
+    def setUp(self):
+        self.addresses = pd.Series(
+            [
+                "1234 market st ste 700, philadelphia pa, 19107",
+                None,
+                "po box 3362, harrisburg pa, 17105",
+                "po box 3362, erie pa, 16501",
+                "11234 market st, philadelphia pa, 19107",
+                "1401 john f. kennedy blvd  fl 5, philadelphia pa, 19102",
+                "1234 market st ste 700, philadelphia pa, 19107",
+                "",
+            ],
+            index=list("abcdefgh"),
+        )
+        self.index = AddressIndex(self.addresses)
+
+    def test_address_keys(self):
+        self.assertListEqual(
+            address_keys("1401 John F. Kennedy Blvd Ste 1070, Philadelphia PA, 19102"),
+            ["1401 john f kennedy blvd", "philadelphia pa", "19102"],
+        )
+        self.assertListEqual(
+            address_keys("Attn: 1600 Arch Street Rm 5, Philadelphia PA"),
+            ["1600 arch st", "philadelphia pa"],
+        )
+
+    def test_codes_group_equal_addresses(self):
+        self.assertEqual(self.index.codes[0], self.index.codes[6])
+        self.assertEqual(self.index.codes[1], -1)
+        self.assertEqual(len(self.index.addresses), 6)
+
+    def test_matches_whole_lines(self):
+        matched = self.index.matches(
+            ["1234 market st", "po box 3362, harrisburg pa, 17105"]
+        )
+
+        np.testing.assert_array_equal(
+            matched, [True, False, True, False, False, False, True, False]
+        )
+
+    def test_matches_known_addresses_within_lines(self):
+        index = AddressIndex(
+            pd.Series(
+                [
+                    "attn office of general counsel, 1515 arch st, philadelphia pa",
+                    "municipal services bldg rm 580, philadelphia pa, 19102",
+                    "1600 arch street, philadelphia pa, 19103",
+                    "16000 arch st, philadelphia pa, 19103",
+                    "c/o general counsel office, 1515 arch st, philadelphia pa",
+                ]
+            )
+        )
+
+        np.testing.assert_array_equal(
+            index.matches(["office of general counsel"]),
+            [True, False, False, False, False],
+        )
+        np.testing.assert_array_equal(
+            index.matches(["municipal services bldg"]),
+            [False, True, False, False, False],
+        )
+        np.testing.assert_array_equal(
+            index.matches(["1600 arch st"]), [False, False, True, False, False]
+        )
+
+    def test_lookup_last_entry_wins(self):
+        agencies = self.index.lookup(
+            {
+                "philadelphia pa": "City",
+                "1401 john f kennedy blvd": "Municipal",
+                "17105": "State",
+            }
+        )
+
+        self.assertListEqual(list(agencies.index), list("abcdefgh"))
+        self.assertListEqual(
+            list(agencies),
+            ["City", None, "State", None, "City", "Municipal", "City", None],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
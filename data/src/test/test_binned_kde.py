@@ -0,0 +1,77 @@
+import unittest
+
+import numpy as np
+from scipy.stats import spearmanr
+
+from src.classes.binned_kde import BinnedKDE
+
+
+def adaptive_kde(X, x_grid, y_grid, glob_bw, alpha):
+    """
+    The adaptive Gaussian KDE summed exactly over all points, per awkde's definition with a
+    diagonal covariance.
+    """
+    std = X.std(axis=0)
+
+    def evaluate(points, inverse_widths):
+        diff = (points[:, None, :] - X[None, :, :]) / std
+        scaled = diff * (inverse_widths[None, :, None] / glob_bw)
+        kernels = np.exp(-0.5 * (scaled**2).sum(axis=2)) * inverse_widths[None, :] ** 2
+        return kernels.sum(axis=1) / (2 * np.pi * glob_bw**2 * len(X) * std.prod())
+
+    pilot = evaluate(X, np.ones(len(X)))
+    inverse_widths = (pilot / np.exp(np.log(pilot).mean())) ** alpha
+
+    xx, yy = np.meshgrid(x_grid, y_grid)
+    grid_points = np.column_stack((xx.ravel(), yy.ravel()))
+    return evaluate(grid_points, inverse_widths).reshape(xx.shape)
+
+
+class TestBinnedKDE(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        clusters = [
+            center + rng.normal(0, spread, (count, 2))
+            for center, spread, count in [
+                ((2000, 3000), 150, 200),
+                ((7000, 6000), 600, 150),
+                ((4000, 8000), 300, 80),
+            ]
+        ]
+        background = rng.uniform(0, 10000, (60, 2))
+        self.X = np.vstack(clusters + [background])
+        self.x_grid = np.linspace(self.X[:, 0].min(), self.X[:, 0].max(), 80)
+        self.y_grid = np.linspace(self.X[:, 1].min(), self.X[:, 1].max(), 90)
+
+    def test_matches_exact_adaptive_kde(self):
+        expected = adaptive_kde(self.X, self.x_grid, self.y_grid, 0.1, 0.999)
+
+        density = (
+            BinnedKDE(glob_bw=0.1, alpha=0.999)
+            .fit(self.X)
+            .predict_grid(self.x_grid, self.y_grid)
+        )
+
+        self.assertEqual(density.shape, (90, 80))
+        correlation, _ = spearmanr(expected.ravel(), density.ravel())
+        self.assertGreater(correlation, 0.99)
+        np.testing.assert_allclose(density.sum(), expected.sum(), rtol=0.05)
+
+    def test_fixed_width_matches_exact_kde(self):
+        expected = adaptive_kde(self.X, self.x_grid, self.y_grid, 0.1, 0)
+
+        density = (
+            BinnedKDE(glob_bw=0.1, alpha=0)
+            .fit(self.X)
+            .predict_grid(self.x_grid, self.y_grid)
+        )
+
+        np.testing.assert_allclose(density, expected, atol=0.03 * expected.max())
+
+    def test_predict_before_fit(self):
+        with self.assertRaises(ValueError):
+            BinnedKDE().predict_grid(self.x_grid, self.y_grid)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.classes.decision_table import DecisionTable, Rule
+
+
+class TestDecisionTable(unittest.TestCase):
+    def test_first_matching_rule_wins(self):
+        df = pd.DataFrame({"x": [-1, 0, 5, 50, np.nan]}, index=list("abcde"))
+        table = DecisionTable(
+            rules=[
+                Rule(lambda d: d["x"] < 0, "negative"),
+                Rule(lambda d: d["x"] > 10, "large"),
+                Rule(lambda d: d["x"] > 0, "positive"),
+            ],
+            default="other",
+        )
+
+        result = table.evaluate(df)
+
+        self.assertListEqual(list(result.index), list("abcde"))
+        self.assertListEqual(
+            list(result), ["negative", "other", "positive", "large", "other"]
+        )
+
+    def test_typed_result(self):
+        df = pd.DataFrame({"x": [1, 2]})
+        table = DecisionTable([Rule(lambda d: d["x"] > 1, True)], False, dtype=bool)
+
+        self.assertEqual(table.evaluate(df).dtype, bool)
+
+
+if __name__ == "__main__":
+    unittest.main()
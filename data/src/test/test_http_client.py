@@ -0,0 +1,59 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.classes import http_client
+from src.config.config import HTTP_HOST_CONNECTION_LIMITS, http_max_connections_per_host
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Answers 503 to the first request for each path and 200 afterwards."""
+
+    seen_paths = set()
+
+    def do_GET(self):
+        if self.path not in self.seen_paths:
+            self.seen_paths.add(self.path)
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        body = self.headers.get("Accept-Encoding", "").encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpClient(unittest.TestCase):
+    def test_connection_limits_per_host(self):
+        session = http_client.create_session()
+        for host, limit in HTTP_HOST_CONNECTION_LIMITS.items():
+            adapter = session.get_adapter(f"https://{host}/api")
+            self.assertEqual(adapter._pool_maxsize, limit)
+            self.assertTrue(adapter._pool_block)
+        adapter = session.get_adapter("https://example.com/data.zip")
+        self.assertEqual(adapter._pool_maxsize, http_max_connections_per_host)
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+
+    def test_retries_server_errors(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/rows"
+            response = http_client.get(url)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("gzip", response.text)
+        self.assertIs(http_client.get_session(), http_client.get_session())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,14 +1,28 @@
+import os
+import re
+import tempfile
 import unittest
 from unittest.mock import MagicMock, Mock, patch
 
 import geopandas as gpd
+import pyarrow.parquet as pq
 from shapely.geometry import Point
 
+from src.classes.carto import (
+    CARTO_MAX_CHUNK_SIZE,
+    CARTO_MIN_CHUNK_SIZE,
+    adapt_carto_chunk_size,
+    load_carto_data,
+    stream_carto_data,
+)
+from src.classes.esri import fetch_esri_features
 from src.classes.loaders import (
     BaseLoader,
+    CartoLoader,
     EsriLoader,
     GdfLoader,
 )
+from src.classes.source_cache import SourceCacheManifest
 from src.config.config import USE_CRS
 
 
@@ -325,5 +339,253 @@ class TestBaseLoader(unittest.TestCase):
             )
 
 
+class FakeCartoResponse:
+    def __init__(self, rows, status_code=200):
+        self.rows = rows
+        self.status_code = status_code
+        self.content = b"x" * (100 * len(rows))
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise Exception(f"HTTP {self.status_code}")
+
+    def json(self):
+        return {"rows": self.rows}
+
+
+def fake_carto_get(ids, has_cartodb_id=True):
+    """
+    A stand-in for http_client.get against the Carto SQL API, serving a table with the given
+    cartodb_ids and answering the range, count, keyset and offset queries load_carto_data makes.
+    """
+    table = [{"cartodb_id": i, "x": float(i), "y": float(i)} for i in sorted(ids)]
+    queries = []
+
+    def get(url, params):
+        query = params["q"]
+        queries.append(query)
+        if "MIN(cartodb_id)" in query:
+            if not has_cartodb_id:
+                return FakeCartoResponse([], status_code=400)
+            return FakeCartoResponse(
+                [{"min_id": min(ids), "max_id": max(ids), "count": len(ids)}]
+            )
+        if "COUNT(*)" in query:
+            return FakeCartoResponse([{"count": len(table)}])
+        if "OFFSET" in query:
+            limit, offset = map(
+                int, re.search(r"LIMIT (\d+) OFFSET (\d+)", query).groups()
+            )
+            return FakeCartoResponse(table[offset : offset + limit])
+        after, upto, limit = map(
+            int,
+            re.search(
+                r"cartodb_id > (-?\d+) AND cartodb_id <= (\d+) ORDER BY cartodb_id LIMIT (\d+)",
+                query,
+            ).groups(),
+        )
+        page = [row for row in table if after < row["cartodb_id"] <= upto][:limit]
+        return FakeCartoResponse(page)
+
+    return get, queries
+
+
+class TestCartoPagination(unittest.TestCase):
+    def test_keyset_pagination_fetches_each_row_once_in_order(self):
+        ids = [1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233, 377]
+        get, queries = fake_carto_get(ids)
+
+        with patch("src.classes.carto.http_client.get", side_effect=get):
+            gdf = load_carto_data(
+                ["SELECT * FROM test"], "EPSG:4326", wkb_geom_field=None, chunk_size=4
+            )
+
+        self.assertListEqual(list(gdf["cartodb_id"]), ids)
+        self.assertFalse(any("OFFSET" in query for query in queries))
+
+    def test_offset_pagination_without_cartodb_id(self):
+        ids = list(range(1, 11))
+        get, queries = fake_carto_get(ids, has_cartodb_id=False)
+
+        with patch("src.classes.carto.http_client.get", side_effect=get):
+            gdf = load_carto_data(
+                ["SELECT x, y FROM test"],
+                "EPSG:4326",
+                wkb_geom_field=None,
+                chunk_size=4,
+            )
+
+        self.assertListEqual(list(gdf["cartodb_id"]), ids)
+        self.assertEqual(sum("OFFSET" in query for query in queries), 3)
+
+    def test_stream_writes_pages_as_row_groups(self):
+        ids = list(range(1, 11))
+        get, _ = fake_carto_get(ids)
+
+        def add_value(gdf):
+            # Null in the first pages and float in the later ones, so the page schemas differ
+            gdf["value"] = [None if i < 6 else i / 2 for i in gdf["cartodb_id"]]
+            return gdf
+
+        with tempfile.TemporaryDirectory() as directory:
+            output_path = os.path.join(directory, "test.parquet")
+            with patch("src.classes.carto.http_client.get", side_effect=get):
+                row_count = stream_carto_data(
+                    ["SELECT * FROM test"],
+                    "EPSG:4326",
+                    output_path,
+                    wkb_geom_field=None,
+                    process_chunk=add_value,
+                    chunk_size=3,
+                )
+
+            self.assertListEqual(os.listdir(directory), ["test.parquet"])
+            self.assertEqual(pq.ParquetFile(output_path).num_row_groups, 4)
+            gdf = gpd.read_parquet(output_path)
+
+        self.assertEqual(row_count, 10)
+        self.assertEqual(gdf.crs, "EPSG:4326")
+        self.assertListEqual(list(gdf["cartodb_id"]), ids)
+        self.assertTrue(gdf["value"].head(5).isna().all())
+        self.assertListEqual(list(gdf["value"].tail(5)), [3.0, 3.5, 4.0, 4.5, 5.0])
+
+    def test_loader_streams_into_source_cache(self):
+        ids = list(range(1, 8))
+        get, _ = fake_carto_get(ids)
+        loader = CartoLoader(
+            name="Test Table", carto_queries="SELECT * FROM test", wkb_geom_field=None
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            loader.file_manager = MagicMock()
+            loader.file_manager.source_cache = SourceCacheManifest(directory)
+            loader.file_manager.get_file_path.side_effect = (
+                lambda file_name, *args: os.path.join(directory, file_name)
+            )
+            with patch("src.classes.carto.http_client.get", side_effect=get):
+                gdf, _ = loader.load_or_fetch()
+
+            cached = loader.file_manager.source_cache.load(loader.cache_key)
+
+        self.assertEqual(gdf.crs, USE_CRS)
+        self.assertListEqual(list(gdf["cartodb_id"]), ids)
+        self.assertListEqual(list(cached["cartodb_id"]), ids)
+        self.assertIn(loader.cache_key, BaseLoader.fetched_cache_keys)
+        BaseLoader.fetched_cache_keys.discard(loader.cache_key)
+
+    def test_adapt_carto_chunk_size(self):
+        self.assertEqual(adapt_carto_chunk_size(20000, 1.0, 1024), 40000)
+        self.assertEqual(adapt_carto_chunk_size(20000, 60.0, 1024), 10000)
+        self.assertEqual(adapt_carto_chunk_size(20000, 10.0, 1024), 20000)
+        self.assertEqual(
+            adapt_carto_chunk_size(CARTO_MAX_CHUNK_SIZE, 1.0, 1024),
+            CARTO_MAX_CHUNK_SIZE,
+        )
+        self.assertEqual(
+            adapt_carto_chunk_size(CARTO_MIN_CHUNK_SIZE, 60.0, 1024),
+            CARTO_MIN_CHUNK_SIZE,
+        )
+
+
+class FakeEsriResponse(FakeCartoResponse):
+    def __init__(self, data):
+        super().__init__([])
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+def fake_esri_layer(object_ids, max_record_count=3, supports_ids=True, short_pages=0):
+    """
+    Stand-ins for http_client.get and http_client.post against an Esri feature layer with
+    point features at (id, id) for the given object IDs. The first `short_pages` pages it
+    serves are missing their last feature.
+    """
+    pages = []
+
+    def get(url, params):
+        return FakeEsriResponse({"maxRecordCount": max_record_count})
+
+    def post(url, data):
+        if data.get("returnIdsOnly"):
+            if not supports_ids:
+                return FakeEsriResponse({"error": {"message": "Not supported"}})
+            return FakeEsriResponse({"objectIds": list(reversed(object_ids))})
+        ids = [int(i) for i in data["objectIds"].split(",")]
+        pages.append(ids)
+        if len(pages) <= short_pages:
+            ids = ids[:-1]
+        features = [
+            {"attributes": {"objectid": i}, "geometry": {"x": float(i), "y": float(i)}}
+            for i in ids
+        ]
+        return FakeEsriResponse({"features": features})
+
+    return get, post, pages
+
+
+class TestEsriFetching(unittest.TestCase):
+    def test_pages_fetched_by_object_id(self):
+        get, post, pages = fake_esri_layer(list(range(1, 9)))
+
+        with (
+            patch("src.classes.esri.http_client.get", side_effect=get),
+            patch("src.classes.esri.http_client.post", side_effect=post),
+        ):
+            first, second = fetch_esri_features(["https://a/0", "https://b/0"])
+
+        self.assertEqual(len(pages), 6)
+        self.assertTrue(all(len(page) <= 3 for page in pages))
+        for features in [first, second]:
+            self.assertListEqual(
+                [feature["properties"]["objectid"] for feature in features],
+                list(range(1, 9)),
+            )
+
+    def test_short_page_is_requested_again(self):
+        get, post, pages = fake_esri_layer(list(range(1, 4)), short_pages=1)
+
+        with (
+            patch("src.classes.esri.http_client.get", side_effect=get),
+            patch("src.classes.esri.http_client.post", side_effect=post),
+        ):
+            (features,) = fetch_esri_features(["https://a/0"])
+
+        self.assertListEqual(pages, [[1, 2, 3], [1, 2, 3]])
+        self.assertListEqual(
+            [feature["properties"]["objectid"] for feature in features], [1, 2, 3]
+        )
+
+    @patch("src.classes.esri.dump_esri_features")
+    def test_falls_back_to_esri_dumper_when_a_page_stays_short(self, mock_dump):
+        get, post, pages = fake_esri_layer(list(range(1, 4)), short_pages=3)
+        mock_dump.return_value = [{"type": "Feature"}]
+
+        with (
+            patch("src.classes.esri.http_client.get", side_effect=get),
+            patch("src.classes.esri.http_client.post", side_effect=post),
+        ):
+            features_by_url = fetch_esri_features(["https://a/0"])
+
+        self.assertEqual(len(pages), 3)
+        mock_dump.assert_called_once_with("https://a/0", None)
+        self.assertListEqual(features_by_url, [[{"type": "Feature"}]])
+
+    @patch("src.classes.esri.dump_esri_features")
+    def test_falls_back_to_esri_dumper(self, mock_dump):
+        get, post, _ = fake_esri_layer([1, 2], supports_ids=False)
+        mock_dump.return_value = [{"type": "Feature"}]
+
+        with (
+            patch("src.classes.esri.http_client.get", side_effect=get),
+            patch("src.classes.esri.http_client.post", side_effect=post),
+        ):
+            features_by_url = fetch_esri_features(["https://a/0"], {"where": "x = 1"})
+
+        mock_dump.assert_called_once_with("https://a/0", {"where": "x = 1"})
+        self.assertListEqual(features_by_url, [[{"type": "Feature"}]])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+
+import geopandas as gpd
+import numpy as np
+from shapely.geometry import box
+
+from src.classes.parcel_adjacency import ParcelAdjacency
+from src.config.config import USE_CRS
+
+
+def parcel_grid(size: int) -> gpd.GeoDataFrame:
+    """A size x size grid of unit parcels."""
+    return gpd.GeoDataFrame(
+        {
+            "opa_id": [f"{i:02d}{j:02d}" for i in range(size) for j in range(size)],
+            "geometry": [
+                box(i, j, i + 1, j + 1) for i in range(size) for j in range(size)
+            ],
+        },
+        crs=USE_CRS,
+    )
+
+
+class TestParcelAdjacency(unittest.TestCase):
+    def test_queen_neighbors(self):
+        adjacency = ParcelAdjacency.build(parcel_grid(3))
+
+        self.assertListEqual(
+            sorted(adjacency.neighbors("0000")), ["0001", "0100", "0101"]
+        )
+        self.assertEqual(len(adjacency.neighbors("0101")), 8)
+
+    def test_incremental_update_matches_full_build(self):
+        parcels = parcel_grid(5)
+        previous = ParcelAdjacency.build(parcels)
+
+        # Parcel 0202 is split, 0404 is dropped and a new parcel is added off the grid
+        updated = parcels[~parcels["opa_id"].isin(["0202", "0404"])]
+        updated = gpd.GeoDataFrame(
+            {
+                "opa_id": ["0202", "9999", *updated["opa_id"]],
+                "geometry": [box(2, 2, 2.5, 3), box(5, 0, 6, 1), *updated.geometry],
+            },
+            crs=USE_CRS,
+        )
+
+        incremental = ParcelAdjacency.build(updated, previous=previous)
+        full = ParcelAdjacency.build(updated)
+
+        np.testing.assert_array_equal(incremental.opa_ids, full.opa_ids)
+        self.assertEqual((incremental.matrix != full.matrix).nnz, 0)
+        self.assertNotIn("0302", incremental.neighbors("0202"))
+        self.assertListEqual(sorted(incremental.neighbors("9999")), ["0400", "0401"])
+
+    def test_refresh_saves_and_loads(self):
+        parcels = parcel_grid(4)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "parcel_adjacency.npz")
+            saved = ParcelAdjacency.refresh(parcels, path)
+            loaded = ParcelAdjacency.load(path)
+
+        np.testing.assert_array_equal(loaded.opa_ids, saved.opa_ids)
+        np.testing.assert_array_equal(loaded.hashes, saved.hashes)
+        self.assertEqual((loaded.matrix != saved.matrix).nnz, 0)
+
+    def test_subgraph_keeps_the_given_order(self):
+        adjacency = ParcelAdjacency.build(parcel_grid(3))
+
+        subgraph = adjacency.subgraph(["0202", "0000", "0001"])
+
+        np.testing.assert_array_equal(
+            subgraph.toarray(),
+            [[False, False, False], [False, False, True], [False, True, False]],
+        )
+        with self.assertRaises(KeyError):
+            adjacency.subgraph(["0000", "9999"])
+
+
+if __name__ == "__main__":
+    unittest.main()
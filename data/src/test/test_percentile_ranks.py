@@ -0,0 +1,30 @@
+import unittest
+
+import mapclassify
+import numpy as np
+
+from src.utilities import PERCENTILE_LABELS, percentile_ranks
+
+
+class TestPercentileRanks(unittest.TestCase):
+    def test_matches_mapclassify_percentiles(self):
+        rng = np.random.default_rng(0)
+        for values in [
+            rng.lognormal(size=5000),
+            np.round(rng.normal(size=1001), 1),
+            np.concatenate([np.zeros(600), rng.random(400)]),
+            np.full(20, 2.5),
+        ]:
+            expected = mapclassify.Percentiles(values, pct=list(range(101))).yb
+
+            np.testing.assert_array_equal(percentile_ranks(values), expected)
+
+    def test_labels(self):
+        self.assertEqual(PERCENTILE_LABELS[1], "1st Percentile")
+        self.assertEqual(PERCENTILE_LABELS[12], "12th Percentile")
+        self.assertEqual(PERCENTILE_LABELS[23], "23rd Percentile")
+        self.assertEqual(PERCENTILE_LABELS[100], "100th Percentile")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import unittest
+
+import geopandas as gpd
+from shapely.geometry import Point
+
+from src.classes.service_scheduler import ServiceScheduler
+from src.config.config import USE_CRS
+from src.validation.base import ValidationResult
+
+# Stub services with docstrings in the same format as the data_utils services
+
+
+def stub_vacant(input_gdf):
+    """
+    Marks every other property as vacant.
+
+    Columns added:
+        vacant (bool): Whether the property is vacant.
+
+    Columns referenced:
+        opa_id
+    """
+    input_gdf["vacant"] = [i % 2 == 0 for i in range(len(input_gdf))]
+    return input_gdf, {
+        "input": ValidationResult(True),
+        "output": ValidationResult(True),
+    }
+
+
+def stub_district(input_gdf):
+    """
+    Assigns a district to each property and drops properties outside the city.
+
+    Columns added:
+        district (str): The district of the property.
+
+    Columns referenced:
+        opa_id, geometry
+    """
+    input_gdf = input_gdf[input_gdf["opa_id"] != "4"].copy()
+    input_gdf["district"] = "1"
+    return input_gdf, {
+        "input": ValidationResult(True),
+        "output": ValidationResult(True),
+    }
+
+
+def stub_gardens(input_gdf):
+    """
+    Marks the first property as not vacant.
+
+    Columns updated:
+        vacant: Updated to False for gardens.
+
+    Columns referenced:
+        opa_id, vacant
+    """
+    input_gdf.loc[input_gdf["opa_id"] == "1", "vacant"] = False
+    return input_gdf, {
+        "input": ValidationResult(True),
+        "output": ValidationResult(True),
+    }
+
+
+def stub_access(input_gdf):
+    """
+    Assigns an access process to vacant properties.
+
+    Columns added:
+        access_process (str): The access process.
+
+    Columns referenced:
+        opa_id, vacant, district
+    """
+    input_gdf["access_process"] = input_gdf["vacant"].map(
+        {True: "Buy Property", False: None}
+    )
+    return input_gdf, {
+        "input": ValidationResult(True),
+        "output": ValidationResult(True),
+    }
+
+
+def stub_undocumented(input_gdf):
+    """
+    A service without any column documentation.
+    """
+    return input_gdf, {
+        "input": ValidationResult(True),
+        "output": ValidationResult(True),
+    }
+
+
+SERVICES = [stub_vacant, stub_district, stub_gardens, stub_access]
+
+
+def run_service(service, gdf):
+    return service(gdf)
+
+
+class TestServiceScheduler(unittest.TestCase):
+    def setUp(self):
+        self.gdf = gpd.GeoDataFrame(
+            {
+                "opa_id": ["1", "2", "3", "4"],
+                "geometry": [Point(i, i) for i in range(4)],
+            },
+            crs=USE_CRS,
+        )
+
+    def test_dependencies_from_docstrings(self):
+        scheduler = ServiceScheduler(SERVICES, max_workers=4)
+        self.assertEqual(scheduler.nodes["stub_vacant"].dependencies, set())
+        self.assertEqual(scheduler.nodes["stub_district"].dependencies, set())
+        self.assertEqual(scheduler.nodes["stub_gardens"].dependencies, {"stub_vacant"})
+        self.assertEqual(
+            scheduler.nodes["stub_access"].dependencies,
+            {"stub_vacant", "stub_district", "stub_gardens"},
+        )
+        self.assertEqual(
+            scheduler.waves(),
+            [["stub_vacant", "stub_district"], ["stub_gardens"], ["stub_access"]],
+        )
+
+    def test_undocumented_service_is_a_barrier(self):
+        scheduler = ServiceScheduler(
+            [stub_vacant, stub_undocumented, stub_district], max_workers=4
+        )
+        self.assertEqual(
+            scheduler.nodes["stub_undocumented"].dependencies, {"stub_vacant"}
+        )
+        self.assertIn(
+            "stub_undocumented", scheduler.nodes["stub_district"].dependencies
+        )
+
+    def test_concurrent_run_matches_sequential_run(self):
+        sequential = ServiceScheduler(SERVICES, max_workers=1).run(
+            self.gdf.copy(), run_service
+        )
+        concurrent = ServiceScheduler(SERVICES, max_workers=4).run(
+            self.gdf.copy(), run_service
+        )
+
+        self.assertIsInstance(concurrent, gpd.GeoDataFrame)
+        self.assertEqual(concurrent.crs, USE_CRS)
+        self.assertListEqual(list(concurrent["opa_id"]), ["1", "2", "3"])
+        for col in ["vacant", "district", "access_process"]:
+            self.assertListEqual(
+                list(concurrent[col]), list(sequential[col]), f"Mismatch in {col}"
+            )
+        self.assertListEqual(list(concurrent["vacant"]), [False, False, True])
+
+    def test_on_complete_called_for_every_service(self):
+        completed = []
+        ServiceScheduler(SERVICES, max_workers=4).run(
+            self.gdf.copy(),
+            run_service,
+            lambda name, dataset, validation: completed.append(name),
+        )
+        self.assertCountEqual(completed, [service.__name__ for service in SERVICES])
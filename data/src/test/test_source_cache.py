@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import geopandas as gpd
+import pandas as pd
+
+from src.classes.loaders import CartoLoader, EsriLoader
+from src.classes.source_cache import SourceCacheManifest
+from src.config.config import USE_CRS
+
+
+class TestSourceCacheManifest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.temp_dir.name
+        self.manifest = SourceCacheManifest(self.directory)
+        self.gdf = gpd.GeoDataFrame(
+            {
+                "opa_id": ["1", "2", "3"],
+                "market_value": [100.0, 200.0, None],
+                "sale_date": pd.to_datetime(["2020-01-01", "2021-06-15", None]),
+                "geometry": gpd.points_from_xy([0, 1, 2], [0, 1, 2]),
+            },
+            crs=USE_CRS,
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def cache(self, table_name: str, cache_key: str) -> str:
+        file_name = f"{table_name}_{cache_key[:16]}.parquet"
+        self.gdf.to_parquet(os.path.join(self.directory, file_name), index=False)
+        self.manifest.record(cache_key, table_name, file_name, self.gdf)
+        return file_name
+
+    def test_cache_key_depends_on_loader_parameters(self):
+        loader = CartoLoader(name="Test Table", carto_queries="SELECT * FROM a")
+        same = CartoLoader(name="Test Table", carto_queries=["SELECT * FROM a"])
+        other_query = CartoLoader(name="Test Table", carto_queries="SELECT * FROM b")
+        other_cols = CartoLoader(
+            name="Test Table", carto_queries="SELECT * FROM a", cols=["opa_id"]
+        )
+        other_type = EsriLoader(name="Test Table", esri_urls=["SELECT * FROM a"])
+
+        self.assertEqual(loader.cache_key, same.cache_key)
+        for other in [other_query, other_cols, other_type]:
+            self.assertNotEqual(loader.cache_key, other.cache_key)
+
+    def test_record_and_load(self):
+        cache_key = SourceCacheManifest.cache_key({"name": "test_table"})
+        self.cache("test_table", cache_key)
+
+        entry = self.manifest.lookup(cache_key)
+        self.assertEqual(entry["row_count"], 3)
+        self.assertListEqual(
+            list(entry["schema"]), ["opa_id", "market_value", "sale_date", "geometry"]
+        )
+
+        gdf = self.manifest.load(cache_key)
+        self.assertListEqual(list(gdf["opa_id"]), ["1", "2", "3"])
+        self.assertIsNone(self.manifest.load("unknown"))
+
+    def test_load_rejects_file_not_matching_manifest(self):
+        cache_key = SourceCacheManifest.cache_key({"name": "test_table"})
+        file_name = self.cache("test_table", cache_key)
+        self.gdf.head(1).to_parquet(os.path.join(self.directory, file_name))
+
+        self.assertIsNone(self.manifest.load(cache_key))
+
+    def test_is_fresh(self):
+        fetched_at = datetime.now(timezone.utc) - timedelta(hours=30)
+        entry = {"fetched_at": fetched_at.isoformat()}
+
+        self.assertFalse(SourceCacheManifest.is_fresh(entry, 20))
+        self.assertTrue(SourceCacheManifest.is_fresh(entry, 24 * 7))
+
+    def test_record_evicts_stale_files(self):
+        old_key = SourceCacheManifest.cache_key({"query": "old"})
+        new_key = SourceCacheManifest.cache_key({"query": "new"})
+        old_file = self.cache("test_table", old_key)
+        legacy_file = "test_table_2024_01_01_new.parquet"
+        other_table_file = self.cache("test_table_extra", old_key)
+        self.gdf.to_parquet(os.path.join(self.directory, legacy_file))
+
+        new_file = self.cache("test_table", new_key)
+
+        files = os.listdir(self.directory)
+        self.assertIn(new_file, files)
+        self.assertIn(other_table_file, files)
+        self.assertNotIn(old_file, files)
+        self.assertNotIn(legacy_file, files)
+
+        with open(os.path.join(self.directory, SourceCacheManifest.MANIFEST_FILE)) as f:
+            entries = json.load(f)
+        self.assertListEqual(
+            sorted(entry["table_name"] for entry in entries.values()),
+            ["test_table", "test_table_extra"],
+        )
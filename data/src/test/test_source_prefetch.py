@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import geopandas as gpd
+
+from src.classes.loaders import BaseLoader, EsriLoader
+from src.classes.source_cache import SourceCacheManifest
+from src.classes.source_prefetch import (
+    SOURCE_LOADERS,
+    prefetch_sources,
+    register_source_loader,
+)
+
+
+class TestSourcePrefetch(unittest.TestCase):
+    def setUp(self):
+        self.registered = dict(SOURCE_LOADERS)
+        SOURCE_LOADERS.clear()
+
+    def tearDown(self):
+        SOURCE_LOADERS.clear()
+        SOURCE_LOADERS.update(self.registered)
+        BaseLoader.fetched_cache_keys.clear()
+
+    def test_register_source_loader(self):
+        @register_source_loader("test_service")
+        def test_loader():
+            return EsriLoader(name="Test Source", esri_urls=["Test"])
+
+        self.assertListEqual(SOURCE_LOADERS["test_service"], [test_loader])
+        self.assertEqual(test_loader().table_name, "test_source")
+
+    def test_prefetch_fetches_each_source_once(self):
+        loader = MagicMock(table_name="test_source")
+        loader.name = "Test Source"
+        register_source_loader("first_service")(lambda: loader)
+        register_source_loader("second_service")(lambda: loader)
+
+        errors = prefetch_sources(max_workers=2)
+
+        self.assertDictEqual(errors, {})
+        loader.prefetch.assert_called_once()
+
+    def test_prefetch_returns_errors(self):
+        loader = MagicMock(table_name="test_source")
+        loader.name = "Test Source"
+        loader.prefetch.side_effect = ValueError("Service unavailable")
+        register_source_loader("test_service")(lambda: loader)
+
+        errors = prefetch_sources(["test_service", "unregistered"], max_workers=2)
+
+        self.assertListEqual(list(errors), ["Test Source"])
+        self.assertIsInstance(errors["Test Source"], ValueError)
+
+    @patch("src.classes.loaders.FORCE_RELOAD", True)
+    def test_prefetched_source_read_from_cache(self):
+        gdf = gpd.GeoDataFrame(
+            {"opa_id": ["123"], "geometry": gpd.points_from_xy([0], [0])}
+        )
+        loader = EsriLoader(name="Test Source", esri_urls=["Test"])
+
+        with tempfile.TemporaryDirectory() as directory:
+            loader.file_manager = MagicMock()
+            loader.file_manager.source_cache = SourceCacheManifest(directory)
+            loader.file_manager.save_gdf.side_effect = (
+                lambda gdf, file_label, *args: gdf.to_parquet(
+                    os.path.join(directory, f"{file_label}.parquet")
+                )
+            )
+
+            with patch.object(EsriLoader, "load_data", return_value=gdf) as load_data:
+                loader.prefetch()
+                cached_gdf, _ = loader.load_or_fetch()
+                load_data.assert_called_once()
+
+        self.assertIn(loader.cache_key, BaseLoader.fetched_cache_keys)
+        self.assertListEqual(list(cached_gdf["opa_id"]), ["123"])
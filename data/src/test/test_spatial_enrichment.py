@@ -0,0 +1,155 @@
+import unittest
+
+import geopandas as gpd
+import pandas as pd
+from shapely.geometry import Point, box
+
+from src.config.config import USE_CRS
+from src.utilities import (
+    assign_nearest,
+    spatial_enrich,
+    spatial_join,
+)
+
+
+class TestSpatialEnrichment(unittest.TestCase):
+    def setUp(self):
+        # Parcel 3 straddles both districts, with most of its area in district B
+        self.parcels = gpd.GeoDataFrame(
+            {
+                "opa_id": ["1", "2", "3", "4"],
+                "geometry": [
+                    box(0, 0, 1, 1),
+                    box(11, 0, 12, 1),
+                    box(9, 0, 13, 1),
+                    box(30, 30, 31, 31),
+                ],
+            },
+            crs=USE_CRS,
+        )
+        self.districts = gpd.GeoDataFrame(
+            {
+                "district": ["A", "B"],
+                "council_member": ["Smith", "Jones"],
+                "geometry": [box(0, 0, 10, 10), box(10, 0, 20, 10)],
+            },
+            crs=USE_CRS,
+        )
+
+    def test_first_matches_spatial_join_deduplicated(self):
+        expected = spatial_join(self.parcels.copy(), self.districts).drop_duplicates(
+            subset=["opa_id"], keep="first"
+        )
+
+        enriched = spatial_enrich(self.parcels, self.districts, ["district"])
+
+        self.assertListEqual(list(enriched["opa_id"]), ["1", "2", "3", "4"])
+        self.assertListEqual(
+            list(enriched["district"].fillna("")),
+            list(expected["district"].fillna("")),
+        )
+        self.assertNotIn("council_member", enriched.columns)
+
+    def test_joins_on_opa_id_without_changing_the_input(self):
+        parcels = self.parcels.iloc[::-1].reset_index(drop=True)
+        parcels["district"] = "stale"
+
+        enriched = spatial_enrich(
+            parcels, self.districts, ["district", "council_member"]
+        )
+
+        self.assertIsInstance(enriched, gpd.GeoDataFrame)
+        self.assertListEqual(
+            list(enriched.columns), ["opa_id", "geometry", "district", "council_member"]
+        )
+        self.assertListEqual(list(enriched["opa_id"]), ["4", "3", "2", "1"])
+        self.assertListEqual(list(enriched["district"].fillna("")), ["", "A", "B", "A"])
+        self.assertListEqual(list(parcels.columns), ["opa_id", "geometry", "district"])
+        self.assertListEqual(list(parcels["district"]), ["stale"] * 4)
+
+    def test_largest_overlap(self):
+        enriched = spatial_enrich(
+            self.parcels, self.districts, ["district"], policy="largest_overlap"
+        )
+
+        self.assertListEqual(list(enriched["district"][:3]), ["A", "B", "B"])
+
+    def test_aggregate(self):
+        enriched = spatial_enrich(
+            self.parcels,
+            self.districts,
+            {"district": "|".join, "council_member": "count"},
+            policy="aggregate",
+        )
+
+        self.assertListEqual(list(enriched["district"][:3]), ["A", "B", "A|B"])
+        self.assertListEqual(list(enriched["council_member"][:3]), [1, 1, 2])
+        self.assertTrue(pd.isna(enriched.loc[3, "district"]))
+
+    def test_within_predicate_and_crs(self):
+        points = gpd.GeoDataFrame(
+            {"opa_id": ["1", "2"], "geometry": [Point(5, 5), Point(50, 50)]},
+            crs=USE_CRS,
+        )
+        districts = self.districts.to_crs("EPSG:4326")
+
+        enriched = spatial_enrich(points, districts, ["district"], predicate="within")
+
+        self.assertEqual(enriched.loc[0, "district"], "A")
+        self.assertTrue(pd.isna(enriched.loc[1, "district"]))
+
+    def test_rejects_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            spatial_enrich(self.parcels, self.districts, ["district"], policy="last")
+
+
+class TestAssignNearest(unittest.TestCase):
+    def setUp(self):
+        self.districts = gpd.GeoDataFrame(
+            {
+                "district": ["A", "B"],
+                "geometry": [box(0, 0, 10, 10), box(20, 0, 30, 10)],
+            },
+            crs=USE_CRS,
+        )
+        # Outside both districts: near A, near B, equidistant, far from both, inside B
+        self.points = gpd.GeoDataFrame(
+            {
+                "opa_id": ["1", "2", "3", "4", "5"],
+                "district": [None, None, None, None, "B"],
+                "geometry": [
+                    Point(11, 5),
+                    Point(18, 5),
+                    Point(15, 5),
+                    Point(15, 500),
+                    Point(25, 5),
+                ],
+            },
+            crs=USE_CRS,
+        )
+
+    def test_matches_row_wise_nearest(self):
+        expected = [
+            self.districts.loc[
+                self.districts.geometry.distance(geometry).idxmin(), "district"
+            ]
+            for geometry in self.points.geometry
+        ]
+
+        result = assign_nearest(self.points, self.districts, "district")
+
+        self.assertListEqual(list(result["district"][:4]), expected[:4])
+        self.assertEqual(result.loc[4, "district"], "B")
+        self.assertEqual(self.points["district"].isna().sum(), 4)
+
+    def test_max_distance(self):
+        result = assign_nearest(
+            self.points.copy(), self.districts, "district", max_distance=100
+        )
+
+        self.assertListEqual(list(result["district"][:3]), ["A", "B", "A"])
+        self.assertIsNone(result.loc[3, "district"])
+
+
+if __name__ == "__main__":
+    unittest.main()
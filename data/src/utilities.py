@@ -1,7 +1,10 @@
 import time
 from functools import wraps
+from typing import Callable, Dict, List, Sequence
 
 import geopandas as gpd
+import numpy as np
+import pandas as pd
 
 from src.config.config import get_logger
 
@@ -88,6 +91,281 @@ def spatial_join(
     return joined
 
 
+# The predicate to query the parcel tree with so that each (layer feature, parcel) match
+# means `parcel <predicate> feature`
+INVERSE_PREDICATES = {
+    "intersects": "intersects",
+    "within": "contains",
+    "contains": "within",
+    "covered_by": "covers",
+    "covers": "covered_by",
+    "overlaps": "overlaps",
+    "touches": "touches",
+    "crosses": "crosses",
+}
+
+ENRICHMENT_POLICIES = ("first", "largest_overlap", "aggregate")
+
+
+def match_layer(
+    input_gdf: gpd.GeoDataFrame,
+    layer_gdf: gpd.GeoDataFrame,
+    predicate: str = "intersects",
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Find the features of an overlay layer that match each parcel, with one bulk query of
+    the spatial index of the parcels (built once per GeoDataFrame and cached by geopandas).
+
+    Args:
+        input_gdf (GeoDataFrame): The parcels.
+        layer_gdf (GeoDataFrame): The overlay layer, in the same CRS as the parcels.
+        predicate (str): The relationship a parcel must have with a feature, e.g. "within".
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The positions of the matching parcels and features,
+        sorted by parcel and then by feature.
+    """
+    if predicate not in INVERSE_PREDICATES:
+        raise ValueError(f"Unsupported spatial predicate: {predicate}")
+    if input_gdf.empty or layer_gdf.empty:
+        return np.array([], dtype=int), np.array([], dtype=int)
+
+    layer_positions, parcel_positions = input_gdf.sindex.query(
+        layer_gdf.geometry.values, predicate=INVERSE_PREDICATES[predicate]
+    )
+    order = np.lexsort((layer_positions, parcel_positions))
+    return parcel_positions[order], layer_positions[order]
+
+
+def spatial_enrich(
+    input_gdf: gpd.GeoDataFrame,
+    layer_gdf: gpd.GeoDataFrame,
+    columns: List[str] | Dict[str, str | Callable],
+    predicate: str = "intersects",
+    policy: str = "first",
+) -> gpd.GeoDataFrame:
+    """
+    Join the attributes of the overlay layer features that match each parcel to the parcels
+    on opa_id, keeping one row per parcel. Parcels without a match get nulls.
+
+    A parcel can match several features, e.g. overlapping RCO boundaries or a parcel
+    straddling two districts. The policy decides what the parcel gets:
+        "first": the attributes of the first matching feature in layer order, as a left
+            spatial join followed by dropping duplicate opa_ids would.
+        "largest_overlap": the attributes of the feature covering most of the parcel's area,
+            falling back to layer order for points and ties.
+        "aggregate": the attributes of all matching features, combined per column by the
+            aggregations given in `columns` (anything accepted by pandas' groupby agg).
+
+    Args:
+        input_gdf (GeoDataFrame): The parcels, with an opa_id column.
+        layer_gdf (GeoDataFrame): The overlay layer, in the same CRS as the parcels.
+        columns (List[str] | Dict[str, str | Callable]): The layer columns to join, or for
+            the "aggregate" policy, a mapping of each column to its aggregation.
+        predicate (str): The relationship a parcel must have with a feature.
+        policy (str): How to resolve parcels that match several features.
+
+    Returns:
+        GeoDataFrame: A new GeoDataFrame with the parcels and the requested columns, which
+        replace any columns of the same name. The input GeoDataFrame is left unchanged.
+    """
+    performance_logger = get_logger("performance")
+    start_time = time.time()
+
+    positions = _enrichment_by_position(
+        input_gdf, layer_gdf, columns, predicate, policy
+    )
+    enrichment = positions.reset_index(drop=True)
+    enrichment.insert(0, "opa_id", input_gdf["opa_id"].to_numpy()[positions.index])
+    enrichment = enrichment.dropna(subset=["opa_id"]).drop_duplicates(subset=["opa_id"])
+
+    parcels = input_gdf.drop(columns=[col for col in columns if col in input_gdf])
+    joined = parcels.merge(enrichment, how="left", on="opa_id")
+    joined = gpd.GeoDataFrame(joined, geometry="geometry", crs=input_gdf.crs)
+
+    performance_logger.info(
+        f"Spatial enrichment ({predicate}, {policy}) took {time.time() - start_time:.2f}s "
+        f"({len(enrichment)}/{len(input_gdf)} parcels matched)"
+    )
+    return joined
+
+
+def _enrichment_by_position(
+    input_gdf: gpd.GeoDataFrame,
+    layer_gdf: gpd.GeoDataFrame,
+    columns: List[str] | Dict[str, str | Callable],
+    predicate: str,
+    policy: str,
+) -> pd.DataFrame:
+    """
+    The resolved attributes of the matching features, indexed by parcel position.
+    """
+    if policy not in ENRICHMENT_POLICIES:
+        raise ValueError(f"Unknown enrichment policy: {policy}")
+    if policy == "aggregate" and not isinstance(columns, dict):
+        raise ValueError("The aggregate policy needs an aggregation for each column")
+
+    if layer_gdf.crs != input_gdf.crs:
+        layer_gdf = layer_gdf.to_crs(input_gdf.crs)
+    parcel_positions, layer_positions = match_layer(input_gdf, layer_gdf, predicate)
+
+    column_names = list(columns)
+    matches = layer_gdf[column_names].iloc[layer_positions].reset_index(drop=True)
+    matches.index = parcel_positions
+
+    multiple = int(pd.Index(parcel_positions).duplicated().sum())
+    if multiple:
+        get_logger("data_quality").info(
+            f"{multiple} extra matches resolved with the {policy} policy"
+        )
+
+    if policy == "aggregate":
+        return matches.groupby(level=0, sort=True).agg(columns)
+
+    if policy == "largest_overlap" and len(matches):
+        overlap = (
+            input_gdf.geometry.values[parcel_positions]
+            .intersection(layer_gdf.geometry.values[layer_positions])
+            .area
+        )
+        order = np.lexsort((layer_positions, -overlap, parcel_positions))
+        matches = matches.iloc[order]
+
+    return matches[~matches.index.duplicated(keep="first")]
+
+
+def assign_nearest(
+    input_gdf: gpd.GeoDataFrame,
+    layer_gdf: gpd.GeoDataFrame,
+    column: str,
+    max_distance: float | None = None,
+) -> gpd.GeoDataFrame:
+    """
+    Fill the missing values of a column from the nearest feature of a layer, e.g. for parcels
+    just outside every district boundary. All the missing rows are resolved with one nearest
+    query of the layer's spatial index. When several features are equally near, the first one
+    in layer order is used.
+
+    Args:
+        input_gdf (GeoDataFrame): The parcels, with `column` already joined from the layer.
+        layer_gdf (GeoDataFrame): The layer the column came from.
+        column (str): The column to fill, present in both GeoDataFrames.
+        max_distance (float | None): Leave parcels farther than this from every feature
+            (in CRS units) missing. Unbounded if None.
+
+    Returns:
+        GeoDataFrame: A new GeoDataFrame with the column filled. The input GeoDataFrame
+        is left unchanged.
+    """
+    data_quality_logger = get_logger("data_quality")
+
+    missing = np.flatnonzero(input_gdf[column].isna().to_numpy())
+    if len(missing) == 0 or layer_gdf.empty:
+        return input_gdf
+
+    if layer_gdf.crs != input_gdf.crs:
+        layer_gdf = layer_gdf.to_crs(input_gdf.crs)
+
+    (query_positions, layer_positions), distances = layer_gdf.sindex.nearest(
+        input_gdf.geometry.values[missing],
+        return_all=True,
+        max_distance=max_distance,
+        return_distance=True,
+    )
+    order = np.lexsort((layer_positions, query_positions))
+    query_positions, layer_positions, distances = (
+        query_positions[order],
+        layer_positions[order],
+        distances[order],
+    )
+    first = np.r_[True, query_positions[1:] != query_positions[:-1]]
+    query_positions, layer_positions, distances = (
+        query_positions[first],
+        layer_positions[first],
+        distances[first],
+    )
+
+    values = input_gdf[column].copy()
+    if values.dtype != layer_gdf[column].dtype:
+        values = values.astype(object)
+    values.iloc[missing[query_positions]] = layer_gdf[column].to_numpy()[
+        layer_positions
+    ]
+    input_gdf = input_gdf.assign(**{column: values})
+
+    message = f"Assigned {len(query_positions)}/{len(missing)} missing {column} values to the nearest feature"
+    if len(distances):
+        message += (
+            f" (distance min {distances.min():.1f}, median {np.median(distances):.1f}, "
+            f"max {distances.max():.1f})"
+        )
+    data_quality_logger.info(message)
+
+    return input_gdf
+
+
+def label_percentile(value: float) -> str:
+    """
+    Converts a percentile value into a human-readable string.
+
+    Args:
+        value (float): The percentile value.
+
+    Returns:
+        str: The formatted percentile string (e.g., '1st Percentile').
+    """
+    # Handle special cases: 11th, 12th, 13th (and 111th, 112th, 113th, etc.)
+    if value % 100 in [11, 12, 13]:
+        return f"{value}th Percentile"
+    elif value % 10 == 1:
+        return f"{value}st Percentile"
+    elif value % 10 == 2:
+        return f"{value}nd Percentile"
+    elif value % 10 == 3:
+        return f"{value}rd Percentile"
+    else:
+        return f"{value}th Percentile"
+
+
+# The label of each percentile, indexed by the percentile
+PERCENTILE_LABELS = np.array([label_percentile(p) for p in range(101)], dtype=object)
+
+
+def percentile_ranks(
+    values: Sequence[float], pct: Sequence[float] = range(101)
+) -> np.ndarray:
+    """
+    The percentile bucket of each value, as mapclassify.Percentiles(values, pct).yb: the
+    index of the first of the values' percentiles `pct` that is at least the value.
+
+    The percentiles are interpolated like scipy.stats.scoreatpercentile, from a single
+    sort, and the values are bucketed with one binary search each instead of one pass over
+    all the values per bucket.
+
+    Args:
+        values (Sequence[float]): The values to rank, without missing values.
+        pct (Sequence[float]): The percentiles bounding the buckets, between 0 and 100.
+
+    Returns:
+        np.ndarray: The bucket of each value, between 0 and len(pct) - 1.
+    """
+    values = np.asarray(values, dtype=float).ravel()
+    sorted_values = np.sort(values)
+    if len(sorted_values) == 0:
+        return np.zeros(0, dtype=int)
+
+    index = np.asarray(pct, dtype=float) / 100.0 * (len(sorted_values) - 1)
+    lower = index.astype(int)
+    upper = np.minimum(lower + 1, len(sorted_values) - 1)
+    lower_weight, upper_weight = (lower + 1) - index, index - lower
+    interpolated = (
+        sorted_values[lower] * lower_weight + sorted_values[upper] * upper_weight
+    ) / (lower_weight + upper_weight)
+    bins = np.where(lower == index, sorted_values[lower], interpolated)
+
+    return np.searchsorted(bins, values, side="left")
+
+
 def timing_decorator(func):
     """
     A decorator that measures the execution time of a function.
@@ -0,0 +1,30 @@
+import geopandas as gpd
+
+from .base import BaseValidator, ValidationResult
+from .drug_crimes import DrugCrimesOutputValidator
+from .gun_crimes import GunCrimesOutputValidator
+from .li_complaints import LIComplaintsOutputValidator
+
+
+class IncidentDensitiesOutputValidator(BaseValidator):
+    """
+    Validator for the batched KDE outputs of incident_densities.
+
+    Runs the validator of each KDE layer (gun crimes, drug crimes and L&I complaints)
+    against the output and collects all of their errors.
+    """
+
+    layer_validators = (
+        LIComplaintsOutputValidator,
+        GunCrimesOutputValidator,
+        DrugCrimesOutputValidator,
+    )
+
+    def validate(
+        self, gdf: gpd.GeoDataFrame, check_stats: bool = True
+    ) -> ValidationResult:
+        errors = []
+        for validator_cls in self.layer_validators:
+            errors.extend(validator_cls().validate(gdf, check_stats=check_stats).errors)
+        self.errors = errors
+        return ValidationResult(success=not errors, errors=errors.copy())
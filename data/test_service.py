@@ -25,6 +25,7 @@ from src.data_utils import (
     drug_crimes,
     gun_crimes,
     imm_dang_buildings,
+    incident_densities,
     li_complaints,
     li_violations,
     nbhoods,
@@ -60,6 +61,7 @@ SERVICES = {
     "tree_canopy": tree_canopy,
     "gun_crimes": gun_crimes,
     "drug_crimes": drug_crimes,
+    "incident_densities": incident_densities,
     "delinquencies": delinquencies,
     "unsafe_buildings": unsafe_buildings,
     "imm_dang_buildings": imm_dang_buildings,